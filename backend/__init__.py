@@ -0,0 +1,3 @@
+"""
+FPL Agent backend - JSON HTTP API over the fpl_agent library.
+"""
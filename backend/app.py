@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Flask JSON API for FPL Agent
+
+Serves player predictions from player_summary, the optimal squad and
+transfer recommendations as compact JSON. The service stays warm between
+requests:
+
+- SQLite connections come from a small pool instead of being opened per request
+- The squad optimizer is built once and refreshed (warm started) when the
+  data generation changes; its result is cached per generation
+- The transfer optimizer keeps its candidate pool and memoized searches
+
+Player lists are returned column-wise ({"columns": [...], "rows": [[...], ...]})
+to keep payloads small.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import math
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from flask import Flask, jsonify, request
+from werkzeug.serving import WSGIRequestHandler
+
+from fpl_agent import FPLDatabase, FPLTransferOptimizer
+from fpl_agent.memo import memo_stats
+from fpl_agent.validation import POSITIONS
+
+DB_PATH = "/workspaces/FPL_agent/data/fpl_agent.db"
+PLAYER_COLUMNS = ['id', 'name', 'position', 'team', 'team_name', 'cost', 'price', 'predicted_points']
+SQUAD_COLUMNS = ['id', 'name', 'position', 'team', 'cost', 'price', 'predicted_points', 'is_starter']
+PLAYERS_LIMIT = 50
+PLAYERS_MAX_LIMIT = 1000
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared by request threads."""
+    
+    def __init__(self, db_path: str, size: int = 4):
+        """
+        Open the pool's connections.
+        
+        Args:
+            db_path: Path to the SQLite database
+            size: Number of connections (default: 4)
+        """
+        self._connections = queue.Queue()
+        for _ in range(size):
+            self._connections.put(sqlite3.connect(db_path, check_same_thread=False))
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, waiting if all are in use."""
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            conn.rollback()  # Never hand on an open transaction
+            self._connections.put(conn)
+    
+    def close(self) -> None:
+        """Close all idle connections."""
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+def to_json(value):
+    """Convert results (numpy scalars, DataFrames, NaN) to JSON-serializable values."""
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, pd.DataFrame):
+        return frame_payload(value, list(value.columns))
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def frame_payload(df: pd.DataFrame, columns: List[str]) -> Dict:
+    """Column-wise JSON payload of a DataFrame's columns."""
+    columns = [column for column in columns if column in df]
+    return {
+        'columns': columns,
+        'rows': [to_json(list(row)) for row in df[columns].itertuples(index=False, name=None)]
+    }
+
+
+class FPLService:
+    """Warm state shared by all requests: connection pool and optimizer sessions."""
+    
+    def __init__(self, db_path: str, num_weeks: int = 3, pool_size: int = 4):
+        """
+        Initialize the service and make sure player_summary matches the horizon.
+        
+        Args:
+            db_path: Path to the SQLite database
+            num_weeks: Number of upcoming weeks predictions are summed over (default: 3)
+            pool_size: Number of pooled SQLite connections (default: 4)
+        """
+        self.db_path = db_path
+        self.num_weeks = num_weeks
+        self.db = FPLDatabase(db_path)
+        self.db.load_player_data(num_weeks=num_weeks)  # Builds player_summary if stale
+        self.pool = ConnectionPool(db_path, size=pool_size)
+        self.transfer_optimizer = FPLTransferOptimizer(db_path)
+        self.squad_optimizer = None  # Built on the first squad request (imports OR-Tools)
+        self._squad_result = None  # (generation, payload)
+        self._squad_lock = threading.Lock()
+        self._transfer_lock = threading.Lock()
+    
+    def generation(self) -> int:
+        """Current data generation, read over a pooled connection."""
+        with self.pool.connection() as conn:
+            try:
+                row = conn.execute("SELECT generation FROM data_generation WHERE id = 1").fetchone()
+            except sqlite3.OperationalError:
+                return 0  # Table not created yet
+        return row[0] if row else 0
+    
+    def _read_summary(self, query: str, params: tuple) -> List[tuple]:
+        """Rows of a player_summary query (selecting num_weeks last) for the service's horizon.
+        
+        Each row carries the horizon it was summed over, read in the same
+        statement, so the rows always match num_weeks. If another process
+        rebuilt the table for a different horizon, it is rebuilt for ours and
+        read again. The horizon does not change which players exist, so an
+        empty result needs no check.
+        
+        Returns:
+            The rows without the num_weeks column
+        """
+        for _ in range(2):
+            with self.pool.connection() as conn:
+                rows = conn.execute(query, params).fetchall()
+            stored = {row[-1] for row in rows}
+            if stored <= {self.num_weeks}:
+                return [row[:-1] for row in rows]
+            print(f"player_summary holds {sorted(stored)} weeks, rebuilding for {self.num_weeks}...")
+            self.db.load_player_data(num_weeks=self.num_weeks)
+        raise RuntimeError(f"player_summary keeps being rebuilt for another horizon than {self.num_weeks} weeks")
+    
+    def players(self, position: str = None, team: int = None, limit: int = PLAYERS_LIMIT) -> Dict:
+        """Players from player_summary by predicted points, optionally filtered."""
+        rows = self._read_summary("""
+            SELECT player_id, name, position, team, team_name, cost, price, predicted_points, num_weeks
+            FROM player_summary
+            WHERE (? IS NULL OR position = ?) AND (? IS NULL OR team = ?)
+            ORDER BY predicted_points DESC, player_id
+            LIMIT ?
+        """, (position, position, team, team, limit))
+        return {'columns': PLAYER_COLUMNS, 'rows': [list(row) for row in rows], 'num_weeks': self.num_weeks}
+    
+    def player(self, player_id: int) -> Dict:
+        """One player from player_summary, or None if unknown."""
+        rows = self._read_summary("""
+            SELECT player_id, name, position, team, team_name, cost, price, predicted_points, num_weeks
+            FROM player_summary
+            WHERE player_id = ?
+        """, (player_id,))
+        return dict(zip(PLAYER_COLUMNS, rows[0])) if rows else None
+    
+    def optimal_squad(self) -> Dict:
+        """Optimal squad for the current data, solved at most once per data generation."""
+        with self._squad_lock:
+            generation = self.generation()
+            if self._squad_result is not None and self._squad_result[0] == generation:
+                return self._squad_result[1]
+            
+            if self.squad_optimizer is None:
+                from fpl_agent.optimizer import FPLSquadOptimizer
+                self.squad_optimizer = FPLSquadOptimizer(self.db_path, num_weeks=self.num_weeks)
+            else:
+                self.squad_optimizer.refresh()
+            results = self.squad_optimizer.solve()
+            
+            squad = results['squad'].copy()
+            squad['is_starter'] = squad['id'].isin(results['starting_xi']['id'])
+            payload = to_json({
+                'squad': frame_payload(squad, SQUAD_COLUMNS),
+                'total_predicted_points': results['total_predicted_points'],
+                'total_cost': results['total_cost'],
+                'bench_cost': results['bench_cost'],
+                'solve_time': results['solve_time'],
+                'generation': generation,
+                'num_weeks': self.num_weeks
+            })
+            self._squad_result = (generation, payload)
+            return payload
+    
+    def transfers(self, team_json: Dict, k: int = 1, top_n: int = 5) -> Dict:
+        """Best single transfers (k=1) or top_n plans of k transfers for a team."""
+        with self._transfer_lock:
+            if k == 1:
+                results = self.transfer_optimizer.find_best_transfer(team_json, num_weeks=self.num_weeks)
+            else:
+                results = self.transfer_optimizer.find_best_transfers(
+                    team_json, k=k, num_weeks=self.num_weeks, top_n=top_n
+                )
+        return to_json(results)
+
+
+def create_app(db_path: str = DB_PATH, num_weeks: int = 3, pool_size: int = 4) -> Flask:
+    """
+    Build the API app with a warm FPLService.
+    
+    Args:
+        db_path: Path to the SQLite database
+        num_weeks: Number of upcoming weeks predictions are summed over (default: 3)
+        pool_size: Number of pooled SQLite connections (default: 4)
+    
+    Returns:
+        The Flask app; the service is available as app.config['FPL_SERVICE']
+    """
+    app = Flask(__name__)
+    app.json.compact = True
+    app.json.sort_keys = False
+    service = FPLService(db_path, num_weeks=num_weeks, pool_size=pool_size)
+    app.config['FPL_SERVICE'] = service
+    
+    try:
+        from flask_cors import CORS
+    except ImportError:
+        CORS = None  # The frontend can still be served from the same origin
+    if CORS is not None:
+        CORS(app)
+    
+    @app.errorhandler(ValueError)
+    def bad_request(error):
+        return jsonify({'error': str(error)}), 400
+    
+    @app.route('/api/health')
+    def health():
+        return jsonify({'status': 'ok', 'generation': service.generation(), 'num_weeks': service.num_weeks})
+    
+    @app.route('/api/players')
+    def players():
+        position = request.args.get('position')
+        if position is not None and position not in POSITIONS:
+            raise ValueError(f"position must be one of {', '.join(POSITIONS)}")
+        team = request.args.get('team', type=int)
+        limit = request.args.get('limit', PLAYERS_LIMIT, type=int)
+        if not 1 <= limit <= PLAYERS_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {PLAYERS_MAX_LIMIT}")
+        return jsonify(service.players(position=position, team=team, limit=limit))
+    
+    @app.route('/api/players/<int:player_id>')
+    def player(player_id):
+        result = service.player(player_id)
+        if result is None:
+            return jsonify({'error': f"Player {player_id} not found"}), 404
+        return jsonify(result)
+    
+    @app.route('/api/squad/optimal')
+    def optimal_squad():
+        return jsonify(service.optimal_squad())
+    
+    @app.route('/api/transfers', methods=['POST'])
+    def transfers():
+        team_json = request.get_json(silent=True)
+        if not isinstance(team_json, dict) or 'team' not in team_json:
+            raise ValueError("Request body must be team JSON with a 'team' list")
+        k = request.args.get('k', 1, type=int)
+        top_n = request.args.get('top_n', 5, type=int)
+        if k < 1 or top_n < 1:
+            raise ValueError("k and top_n must be at least 1")
+        return jsonify(service.transfers(team_json, k=k, top_n=top_n))
+    
+    @app.route('/api/stats')
+    def stats():
+        return jsonify(memo_stats())
+    
+    return app
+
+
+def main():
+    """Run the API server."""
+    parser = argparse.ArgumentParser(description='Run the FPL Agent JSON API')
+    parser.add_argument('--db', default=DB_PATH, help='Path to the SQLite database')
+    parser.add_argument('--host', default='0.0.0.0', help='Host to bind (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on (default: 5000)')
+    parser.add_argument(
+        '--weeks',
+        type=int,
+        default=3,
+        help='Number of weeks to consider for predictions (default: 3)'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=4,
+        help='Number of pooled SQLite connections (default: 4)'
+    )
+    parser.add_argument('--debug', action='store_true', help='Run in debug mode')
+    args = parser.parse_args()
+    
+    app = create_app(args.db, num_weeks=args.weeks, pool_size=args.pool_size)
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'  # Keep-alive: clients reuse their connections
+    print(f"Starting FPL Agent API with {args.weeks} weeks of predictions on {args.host}:{args.port}...")
+    app.run(debug=args.debug, host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,43 @@
 """
 FPL Agent - Fantasy Premier League optimization toolkit.
+
+Classes are imported on first access, so importing the package does not pull
+in the solver (OR-Tools) or the pipeline's modelling dependencies until they
+are used.
 """
 
-from .api_client import FPLAPIClient
-from .database import FPLDatabase
-from .validation import FPLValidator
-from .optimizer import FPLSquadOptimizer
-from .transfers import FPLTransferOptimizer
-from .formatting import FPLFormatter
-from .pipeline import (
-    FPLDataPipeline,
-    HistoricDataLoader,
-    TeamValuationCalculator,
-    PlayerMatchContextBuilder,
-    PointsPredictor,
-    FinalPredictionsGenerator
-)
-
-__all__ = [
-    'FPLAPIClient',
-    'FPLDatabase', 
-    'FPLValidator',
-    'FPLSquadOptimizer',
-    'FPLTransferOptimizer',
-    'FPLFormatter',
-    'FPLDataPipeline',
-    'HistoricDataLoader',
-    'TeamValuationCalculator',
-    'PlayerMatchContextBuilder',
-    'PointsPredictor',
-    'FinalPredictionsGenerator'
-]
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    'FPLAPIClient': '.api_client',
+    'FPLDatabase': '.database',
+    'CurrentTeamRepository': '.current_team',
+    'FPLValidator': '.validation',
+    'FPLSquadOptimizer': '.optimizer',
+    'FPLTransferOptimizer': '.transfers',
+    'FPLTransferPlanner': '.planner',
+    'FPLFormatter': '.formatting',
+    'FPLJobQueue': '.jobs',
+    'SquadMemo': '.memo',
+    'FPLDataPipeline': '.pipeline',
+    'HistoricDataLoader': '.pipeline',
+    'TeamValuationCalculator': '.pipeline',
+    'PlayerMatchContextBuilder': '.pipeline',
+    'PointsPredictor': '.pipeline',
+    'FinalPredictionsGenerator': '.pipeline'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import an exported class from its module on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,609 @@
+"""
+Walk-forward backtesting for the points prediction models.
+
+Match history is read from player_match_context once and kept as column arrays
+sorted by gameweek, so the training set for any cutoff is a prefix slice found
+with a binary search. Moving the cutoff forward only touches the rows that were
+added:
+
+- Position models are ordinary least squares fits, updated from running
+  sufficient statistics (ZᵀZ, Zᵀy) per position.
+- Player models are refit only for players who gained matches since the
+  previous cutoff; everyone else's training data, and therefore model, is
+  unchanged.
+
+Each test gameweek is then predicted as one batch from per-model coefficient
+tables instead of row by row through PointsPredictor.predict.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import itertools
+import numpy as np
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from .database import FPLDatabase
+from .features import FEATURE_NAMES, FEATURE_VERSION, build_features
+from .pipeline import VariancePenalizedRegression, blend_predictions
+
+
+class MatchHistory:
+    """Player match context and team valuations as gameweek-sorted column arrays.
+    
+    Every attribute is a plain (numeric or fixed-width string) NumPy array, so
+    the whole history can be written to .npy files once and memory-mapped
+    read-only by worker processes.
+    """
+    
+    ARRAYS = (
+        'season', 'gw', 'element', 'name', 'team', 'opponent', 'was_home', 'total_points',
+        'team_attack', 'team_defense', 'opp_attack', 'opp_defense',
+        'team_names', 'team_code', 'opponent_code', 'positions', 'position_code', 'has_position',
+        'val_gw', 'val_team_code', 'val_attack', 'val_defense',
+        'trainable', 'X', 'player_ids', 'player_code'
+    )
+    
+    def __init__(self, db: FPLDatabase):
+        self.db = db
+        self._load()
+    
+    @classmethod
+    def open(cls, directory: str, mmap_mode: str = 'r') -> 'MatchHistory':
+        """Open a history previously written with save(), memory-mapping its arrays."""
+        history = cls.__new__(cls)
+        history.db = None
+        directory = Path(directory)
+        for attr in cls.ARRAYS:
+            setattr(history, attr, np.load(directory / f"{attr}.npy", mmap_mode=mmap_mode))
+        return history
+    
+    def save(self, directory: str) -> None:
+        """Write every column array to directory as .npy files."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for attr in self.ARRAYS:
+            np.save(directory / f"{attr}.npy", getattr(self, attr))
+    
+    def _load(self):
+        """Read player_match_context and team_fixture_valuations in one pass each."""
+        with self.db.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT pmc.season, pmc.gw, pmc.element, pmc.name, pmc.team, pmc.opponent_team,
+                       pmc.was_home, pmc.total_points,
+                       pmc.team_attack_value, pmc.team_defense_value,
+                       pmc.opponent_attack_value, pmc.opponent_defense_value,
+                       e.element_type_name
+                FROM player_match_context pmc
+                LEFT JOIN elements e ON pmc.element = e.id
+                ORDER BY pmc.gw, pmc.id
+            """).fetchall()
+            valuations = conn.execute("""
+                SELECT gw, team, attack_value, defense_value
+                FROM team_fixture_valuations
+                ORDER BY gw, id
+            """).fetchall()
+        
+        (season, gw, element, name, team, opponent, was_home, total_points,
+         team_attack, team_defense, opp_attack, opp_defense, position) = (
+            list(column) for column in zip(*rows)) if rows else ([],) * 13
+        
+        self.season = np.asarray(season, dtype=str)
+        self.gw = np.asarray(gw, dtype=np.int64)
+        self.element = np.asarray(element, dtype=np.int64)
+        self.name = np.asarray(name, dtype=str)
+        self.team = np.asarray(team, dtype=str)
+        self.opponent = np.asarray(opponent, dtype=str)
+        self.was_home = np.asarray(was_home, dtype=float)
+        self.total_points = np.asarray(total_points, dtype=float)
+        self.team_attack = np.asarray(team_attack, dtype=float)
+        self.team_defense = np.asarray(team_defense, dtype=float)
+        self.opp_attack = np.asarray(opp_attack, dtype=float)
+        self.opp_defense = np.asarray(opp_defense, dtype=float)
+        
+        # Integer codes for teams (shared by matches and valuations) and positions
+        val_gw, val_team, val_attack, val_defense = (
+            list(column) for column in zip(*valuations)) if valuations else ([],) * 4
+        self.team_names, team_codes = np.unique(
+            np.asarray(list(team) + list(opponent) + list(val_team), dtype=str), return_inverse=True)
+        n_rows = len(self.gw)
+        self.team_code = team_codes[:n_rows]
+        self.opponent_code = team_codes[n_rows:2 * n_rows]
+        
+        self.positions, position_codes = np.unique(
+            np.asarray([p if p is not None else '' for p in position], dtype=str), return_inverse=True)
+        self.position_code = position_codes.astype(np.int64)
+        has_position = self.positions != ''
+        self.has_position = has_position[self.position_code] if n_rows else np.zeros(0, dtype=bool)
+        
+        self.val_gw = np.asarray(val_gw, dtype=np.int64)
+        self.val_team_code = team_codes[2 * n_rows:]
+        self.val_attack = np.asarray(val_attack, dtype=float)
+        self.val_defense = np.asarray(val_defense, dtype=float)
+        
+        # Same filters as PointsPredictor.load_training_data
+        self.trainable = (
+            self.has_position
+            & ~np.isnan(self.team_attack) & ~np.isnan(self.team_defense)
+            & ~np.isnan(self.opp_attack) & ~np.isnan(self.opp_defense)
+            & ~np.isnan(self.was_home) & ~np.isnan(self.total_points)
+        )
+        self.X = build_features(self.team_attack, self.team_defense,
+                                self.opp_attack, self.opp_defense, self.was_home) \
+            if n_rows else np.zeros((0, len(FEATURE_NAMES)))
+        
+        # Dense player codes for coefficient tables
+        self.player_ids, self.player_code = np.unique(self.element, return_inverse=True)
+    
+    def __len__(self):
+        return len(self.gw)
+    
+    def rows_up_to(self, gw: int) -> int:
+        """Number of leading rows with gameweek <= gw."""
+        return int(np.searchsorted(self.gw, gw, side='right'))
+    
+    def team_valuations_up_to(self, gw: int):
+        """Average attack/defense per team over valuations with gameweek <= gw.
+        
+        Returns:
+            (attack, defense, available) arrays indexed by team code
+        """
+        end = int(np.searchsorted(self.val_gw, gw, side='right'))
+        n_teams = len(self.team_names)
+        codes = self.val_team_code[:end]
+        counts = np.bincount(codes, minlength=n_teams)
+        available = counts > 0
+        safe_counts = np.maximum(counts, 1)
+        attack = np.bincount(codes, weights=self.val_attack[:end], minlength=n_teams) / safe_counts
+        defense = np.bincount(codes, weights=self.val_defense[:end], minlength=n_teams) / safe_counts
+        return attack, defense, available
+    
+    def gameweek_inputs(self, test_gw: int, season: str, cutoff: int):
+        """Rows of test_gw and the team valuations known at the training cutoff.
+        
+        Teams without valuations up to the cutoff fall back to the values
+        stored on the match.
+        
+        Returns:
+            (rows, team_attack, team_defense, opp_attack, opp_defense)
+        """
+        start = int(np.searchsorted(self.gw, test_gw, side='left'))
+        rows = np.arange(start, self.rows_up_to(test_gw))
+        rows = rows[self.season[rows] == season]
+        
+        attack, defense, available = self.team_valuations_up_to(cutoff)
+        team = self.team_code[rows]
+        opponent = self.opponent_code[rows]
+        return (
+            rows,
+            np.where(available[team], attack[team], self.team_attack[rows]),
+            np.where(available[team], defense[team], self.team_defense[rows]),
+            np.where(available[opponent], attack[opponent], self.opp_attack[rows]),
+            np.where(available[opponent], defense[opponent], self.opp_defense[rows])
+        )
+
+
+class WalkForwardBacktest:
+    """Incrementally trained hierarchical model evaluated one gameweek at a time.
+    
+    Mirrors PointsPredictor: position-level OLS models, player-level
+    variance-penalized models, blended with player_weight.
+    """
+    
+    def __init__(self, history: MatchHistory, player_weight: float = 0.75, lambda_penalty: float = 1.0,
+                 min_samples: int = 5, position_min_samples: int = 20):
+        self.history = history
+        self.player_weight = player_weight
+        self.lambda_penalty = lambda_penalty
+        self.min_samples = min_samples
+        self.position_min_samples = position_min_samples
+        
+        n_features = history.X.shape[1] + 1
+        n_positions = len(history.positions)
+        n_players = len(history.player_ids)
+        
+        # Position sufficient statistics over Z = [1, X]
+        self._pos_ZtZ = np.zeros((n_positions, n_features, n_features))
+        self._pos_Zty = np.zeros((n_positions, n_features))
+        self._pos_n = np.zeros(n_positions, dtype=np.int64)
+        self.position_coef = np.full((n_positions, n_features), np.nan)
+        
+        # Player models as raw-feature coefficients; NaN row = no model
+        self.player_coef = np.full((n_players, n_features), np.nan)
+        
+        # Trainable rows grouped by player, each group in gameweek order
+        train_rows = np.flatnonzero(history.trainable)
+        order = np.argsort(history.player_code[train_rows], kind='stable')
+        grouped = train_rows[order]
+        bounds = np.searchsorted(history.player_code[grouped], np.arange(n_players + 1))
+        self._player_rows = [grouped[bounds[i]:bounds[i + 1]] for i in range(n_players)]
+        self._player_counts = np.zeros(n_players, dtype=np.int64)
+        
+        self.cutoff = None
+        self._end = 0
+    
+    @property
+    def n_position_models(self) -> int:
+        return int(np.sum(~np.isnan(self.position_coef[:, 0])))
+    
+    @property
+    def n_player_models(self) -> int:
+        return int(np.sum(~np.isnan(self.player_coef[:, 0])))
+    
+    def advance_to(self, cutoff: int) -> int:
+        """Extend the training window to include all matches up to cutoff.
+        
+        Returns:
+            Number of player models refit
+        """
+        if self.cutoff is not None and cutoff < self.cutoff:
+            raise ValueError(f"Cannot move walk-forward cutoff back from GW {self.cutoff} to GW {cutoff}")
+        
+        history = self.history
+        end = history.rows_up_to(cutoff)
+        new_rows = np.arange(self._end, end)
+        new_rows = new_rows[history.trainable[new_rows]]
+        self._end = end
+        self.cutoff = cutoff
+        
+        if len(new_rows) == 0:
+            return 0
+        
+        # Level 1: fold new rows into position sufficient statistics and re-solve
+        Z = np.empty((len(new_rows), history.X.shape[1] + 1))
+        Z[:, 0] = 1.0
+        Z[:, 1:] = history.X[new_rows]
+        y = history.total_points[new_rows]
+        positions = history.position_code[new_rows]
+        for position in np.unique(positions):
+            mask = positions == position
+            Zp = Z[mask]
+            self._pos_ZtZ[position] += Zp.T @ Zp
+            self._pos_Zty[position] += Zp.T @ y[mask]
+            self._pos_n[position] += int(mask.sum())
+            if self._pos_n[position] >= self.position_min_samples:
+                self.position_coef[position] = np.linalg.lstsq(
+                    self._pos_ZtZ[position], self._pos_Zty[position], rcond=None)[0]
+        
+        # Level 2: refit only players whose training data changed
+        players = history.player_code[new_rows]
+        self._player_counts += np.bincount(players, minlength=len(self._player_counts))
+        refit = 0
+        for player in np.unique(players):
+            rows = self._player_rows[player][:self._player_counts[player]]
+            if len(rows) < self.min_samples:
+                continue
+            self.player_coef[player] = self._fit_player(history.X[rows], history.total_points[rows])
+            refit += 1
+        
+        return refit
+    
+    def _fit_player(self, X, y) -> np.ndarray:
+        """Fit a player model as in PointsPredictor.train_model, returning raw-feature coefficients.
+        
+        Standardization is done in NumPy (same statistics as StandardScaler)
+        to avoid per-player estimator overhead, then folded into the weights.
+        """
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        X_scaled = (X - mean) / scale
+        
+        model = VariancePenalizedRegression(lambda_penalty=self.lambda_penalty)
+        model.fit(X_scaled, y, VariancePenalizedRegression.local_variance(X_scaled, y))
+        
+        weights = model.coef_ / scale
+        return np.concatenate(([model.intercept_ - mean @ weights], weights))
+    
+    def predict_gameweek(self, test_gw: int, season: str):
+        """Train on everything before test_gw and predict all of its matches in one batch.
+        
+        Team valuations are averaged over gameweeks up to the training cutoff;
+        teams without valuations fall back to the values stored on the match.
+        
+        Returns:
+            Dict of column arrays (element, name, team, opponent, was_home,
+            predicted_points, actual_points, error), or None if no model is
+            available yet
+        """
+        self.advance_to(test_gw - 1)
+        if self.n_position_models == 0 and self.n_player_models == 0:
+            return None
+        
+        history = self.history
+        rows, team_attack, team_defense, opp_attack, opp_defense = history.gameweek_inputs(
+            test_gw, season, self.cutoff
+        )
+        X = build_features(team_attack, team_defense, opp_attack, opp_defense, history.was_home[rows]) \
+            if len(rows) else np.zeros((0, history.X.shape[1]))
+        
+        # Row-wise dot products with gathered coefficients (NaN where no model)
+        player_coef = self.player_coef[history.player_code[rows]]
+        player_prediction = player_coef[:, 0] + np.einsum('ij,ij->i', X, player_coef[:, 1:])
+        position_coef = self.position_coef[history.position_code[rows]]
+        position_prediction = position_coef[:, 0] + np.einsum('ij,ij->i', X, position_coef[:, 1:])
+        position_prediction[~history.has_position[rows]] = np.nan
+        
+        predicted = blend_predictions(player_prediction, position_prediction, self.player_weight)
+        actual = history.total_points[rows]
+        
+        return {
+            'element': history.element[rows],
+            'name': history.name[rows],
+            'team': history.team[rows],
+            'opponent': history.opponent[rows],
+            'was_home': history.was_home[rows],
+            'position': history.positions[history.position_code[rows]],
+            'predicted_points': predicted,
+            'actual_points': actual,
+            'error': predicted - actual
+        }
+
+
+def _group_summary(codes: np.ndarray, n_groups: int, predicted: np.ndarray,
+                   actual: np.ndarray, abs_error: np.ndarray, sq_error: np.ndarray) -> Dict[str, np.ndarray]:
+    """Count, MAE, RMSE and mean predicted/actual per group code via bincount."""
+    counts = np.bincount(codes, minlength=n_groups)
+    safe_counts = np.maximum(counts, 1)
+    return {
+        'n': counts,
+        'mae': np.bincount(codes, weights=abs_error, minlength=n_groups) / safe_counts,
+        'rmse': np.sqrt(np.bincount(codes, weights=sq_error, minlength=n_groups) / safe_counts),
+        'avg_pred': np.bincount(codes, weights=predicted, minlength=n_groups) / safe_counts,
+        'avg_actual': np.bincount(codes, weights=actual, minlength=n_groups) / safe_counts
+    }
+
+
+def compute_validation_metrics(predictions: Dict[str, np.ndarray], n_extremes: int = 5) -> Dict:
+    """Overall, per-gameweek and per-position error metrics in one pass over prediction arrays.
+    
+    Args:
+        predictions: Column arrays as returned by WalkForwardBacktest.predict_gameweek,
+            concatenated across gameweeks, plus a 'test_gw' column
+        n_extremes: Number of best and worst individual predictions to keep
+    
+    Returns:
+        JSON-serializable dict with 'overall', 'by_gameweek', 'by_position',
+        'best' and 'worst'
+    """
+    predicted = np.asarray(predictions['predicted_points'], dtype=float)
+    actual = np.asarray(predictions['actual_points'], dtype=float)
+    error = predicted - actual
+    abs_error = np.abs(error)
+    sq_error = error * error
+    n = len(error)
+    
+    overall = _group_summary(np.zeros(n, dtype=np.int64), 1, predicted, actual, abs_error, sq_error)
+    gameweeks, gw_codes = np.unique(np.asarray(predictions['test_gw']), return_inverse=True)
+    by_gw = _group_summary(gw_codes, len(gameweeks), predicted, actual, abs_error, sq_error)
+    positions, position_codes = np.unique(np.asarray(predictions['position'], dtype=str), return_inverse=True)
+    by_position = _group_summary(position_codes, len(positions), predicted, actual, abs_error, sq_error)
+    
+    def _rows(summary, labels, key):
+        return [
+            {key: label, **{stat: summary[stat][i].item() for stat in summary}}
+            for i, label in enumerate(labels)
+        ]
+    
+    def _extreme_rows(indices):
+        return [
+            {
+                'name': str(predictions['name'][i]),
+                'team': str(predictions['team'][i]),
+                'gw': int(predictions['test_gw'][i]),
+                'predicted': float(predicted[i]),
+                'actual': int(actual[i]),
+                'abs_error': float(abs_error[i])
+            }
+            for i in indices
+        ]
+    
+    # Partial selection of the extremes, then order just those few rows
+    k = min(n_extremes, n)
+    if k:
+        best = np.argpartition(abs_error, k - 1)[:k]
+        best = best[np.lexsort((best, abs_error[best]))]
+        worst = np.argpartition(-abs_error, k - 1)[:k]
+        worst = worst[np.lexsort((worst, -abs_error[worst]))]
+    else:
+        best = worst = np.zeros(0, dtype=np.int64)
+    
+    return {
+        'overall': _rows(overall, ['all'], 'scope')[0] if n else
+                   {'scope': 'all', 'n': 0, 'mae': 0.0, 'rmse': 0.0, 'avg_pred': 0.0, 'avg_actual': 0.0},
+        'by_gameweek': _rows(by_gw, gameweeks.tolist(), 'gw'),
+        'by_position': _rows(by_position, positions.tolist(), 'position'),
+        'best': _extreme_rows(best),
+        'worst': _extreme_rows(worst)
+    }
+
+
+def expand_grid(grid: Dict[str, list]) -> List[Dict]:
+    """Cartesian product of hyperparameter values as a list of config dicts.
+    
+    Args:
+        grid: Mapping of WalkForwardBacktest keyword (player_weight,
+            lambda_penalty, min_samples, ...) to candidate values
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+# Per-process history, memory-mapped once by the pool initializer
+_worker_history = None
+
+
+def _init_grid_worker(directory: str):
+    """Pool initializer: memory-map the shared history read-only."""
+    global _worker_history
+    _worker_history = MatchHistory.open(directory)
+
+
+def _run_grid_task(task):
+    """Walk one config forward through its test gameweeks, scoring each one.
+    
+    The engine is created once, so each gameweek only folds in the matches
+    added since the previous one (see WalkForwardBacktest.advance_to).
+    
+    Returns:
+        One (config_id, test_gw, predictions, sum |error|, sum error²) row per gameweek
+    """
+    config_id, config, test_gws, season = task
+    engine = WalkForwardBacktest(_worker_history, **config)
+    rows = []
+    for test_gw in test_gws:
+        predictions = engine.predict_gameweek(test_gw, season)
+        if predictions is None or len(predictions['error']) == 0:
+            rows.append((config_id, test_gw, 0, 0.0, 0.0))
+            continue
+        error = predictions['error']
+        rows.append((config_id, test_gw, len(error), float(np.abs(error).sum()), float(np.square(error).sum())))
+    return rows
+
+
+def run_backtest_grid(history: MatchHistory, configs: List[Dict], test_gws: List[int],
+                      season: str, max_workers: int = None) -> Dict:
+    """Backtest every config over test_gws across a process pool.
+    
+    Each task is one config walked forward through all test gameweeks in
+    order, so training stays incremental and a grid costs one pass over the
+    history per config. The history is written once to a temporary directory
+    of .npy files which each worker memory-maps read-only, so workers share
+    the page cache instead of receiving a pickled copy per task.
+    
+    Args:
+        history: Loaded match history
+        configs: WalkForwardBacktest keyword dicts (see expand_grid)
+        test_gws: Gameweeks to predict; each is trained on all earlier gameweeks
+        season: Season of the test matches
+        max_workers: Pool size (default: CPU count); 1 runs in-process
+    
+    Returns:
+        Dict with 'runs' (one row per config and gameweek) and 'summary'
+        (one row per config with pooled MAE/RMSE, sorted by MAE)
+    """
+    global _worker_history
+    
+    test_gws = sorted(test_gws)
+    tasks = [(config_id, config, test_gws, season) for config_id, config in enumerate(configs)]
+    max_workers = max_workers or os.cpu_count() or 1
+    
+    with tempfile.TemporaryDirectory(prefix='fpl_backtest_') as directory:
+        history.save(directory)
+        if max_workers == 1:
+            _init_grid_worker(directory)
+            try:
+                task_rows = [_run_grid_task(task) for task in tasks]
+            finally:
+                _worker_history = None
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_grid_worker,
+                                     initargs=(directory,)) as pool:
+                task_rows = list(pool.map(_run_grid_task, tasks))
+    results = [row for rows in task_rows for row in rows]
+    
+    config_ids, _, counts, abs_sums, sq_sums = (np.asarray(column) for column in zip(*results)) \
+        if results else (np.zeros(0, dtype=int),) * 5
+    
+    runs = []
+    for config_id, test_gw, n, abs_sum, sq_sum in results:
+        runs.append({
+            'config_id': config_id,
+            **configs[config_id],
+            'test_gw': test_gw,
+            'predictions': n,
+            'mae': abs_sum / n if n else None,
+            'rmse': float(np.sqrt(sq_sum / n)) if n else None
+        })
+    
+    # Pool errors across gameweeks per config (weighted by prediction count)
+    n_configs = len(configs)
+    total = np.bincount(config_ids, weights=counts, minlength=n_configs)
+    total_abs = np.bincount(config_ids, weights=abs_sums, minlength=n_configs)
+    total_sq = np.bincount(config_ids, weights=sq_sums, minlength=n_configs)
+    safe_total = np.maximum(total, 1)
+    
+    summary = [
+        {
+            'config_id': config_id,
+            **configs[config_id],
+            'predictions': int(total[config_id]),
+            'mae': float(total_abs[config_id] / safe_total[config_id]),
+            'rmse': float(np.sqrt(total_sq[config_id] / safe_total[config_id]))
+        }
+        for config_id in range(n_configs) if total[config_id] > 0
+    ]
+    summary.sort(key=lambda row: (row['mae'], row['rmse']))
+    
+    return {'runs': runs, 'summary': summary}
+
+
+def training_data_hash(player_data: Dict, position_data: Dict) -> str:
+    """Content hash of PointsPredictor.load_training_data output.
+    
+    Any change to the matches, valuations or positions behind a training
+    cutoff changes the hash, so snapshots keyed on it cannot go stale.
+    """
+    digest = hashlib.sha256()
+    for element in sorted(player_data):
+        data = player_data[element]
+        digest.update(f"{element}:{data['position']}:{len(data['y'])}".encode())
+        digest.update(np.ascontiguousarray(data['X']).tobytes())
+        digest.update(np.ascontiguousarray(data['y']).tobytes())
+    for position in sorted(position_data):
+        digest.update(f"{position}:{len(position_data[position]['y'])}".encode())
+    return digest.hexdigest()
+
+
+class ModelSnapshotCache:
+    """Opt-in on-disk cache of trained PointsPredictor models for backtests.
+    
+    Snapshots are keyed by (training cutoff, config hash, data hash), so a
+    snapshot is only reused when the same hyperparameters are trained on
+    exactly the same data. Saving a snapshot removes older ones for the same
+    cutoff and config, which were trained on data that has since changed.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def config_hash(config: Dict) -> str:
+        """Stable hash of the hyperparameters and feature layout used for training."""
+        payload = json.dumps({'config': config or {}, 'feature_version': FEATURE_VERSION}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+    
+    def _path(self, cutoff: int, config: Dict, data_hash: str) -> Path:
+        return self.directory / f"gw{cutoff}_{self.config_hash(config)}_{data_hash[:16]}.pkl"
+    
+    def load(self, cutoff: int, config: Dict, data_hash: str):
+        """Return the saved {'players', 'positions'} models, or None on a miss."""
+        path = self._path(cutoff, config, data_hash)
+        if not path.exists():
+            self.misses += 1
+            return None
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+        self.hits += 1
+        return snapshot
+    
+    def save(self, cutoff: int, config: Dict, data_hash: str, players: Dict, positions: Dict) -> Path:
+        """Save trained models and drop stale snapshots for the same cutoff and config."""
+        path = self._path(cutoff, config, data_hash)
+        for stale in self.directory.glob(f"gw{cutoff}_{self.config_hash(config)}_*.pkl"):
+            if stale != path:
+                stale.unlink()
+        
+        # Write then rename so an interrupted run never leaves a truncated snapshot
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'players': players, 'positions': positions, 'feature_version': FEATURE_VERSION}, f)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,201 @@
+"""
+Bulk analysis of many squads (league rivals, client teams).
+
+The candidate pool is loaded once for the whole batch. Squad rules and
+lineups are checked for all squads at once on (n_squads, 15) arrays of pool
+rows, and the best single transfer of every valid squad is searched across
+a process pool whose workers receive the candidate pool once, through the
+pool initializer. Results are column arrays (one per field), written to
+.npz or .csv.
+"""
+
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from .transfers import CandidatePool, FPLTransferOptimizer
+from .validation import (
+    FPLValidator, BUDGET_TENTHS, POSITIONS, SQUAD_SIZE, SQUAD_REQUIREMENTS, VIOLATION_SQUAD_SIZE
+)
+
+# Position of each slot once a valid squad's players are sorted by position
+SLOT_POSITIONS = np.repeat(np.array(POSITIONS), [SQUAD_REQUIREMENTS[pos] for pos in POSITIONS])
+
+# Output columns of analyze_squads, in order
+RESULT_COLUMNS = (
+    'entry', 'valid', 'violations', 'error', 'squad_cost', 'saved_xi_points', 'best_xi_points', 'lineup_gain',
+    'transfer_out_id', 'transfer_out_name', 'transfer_in_id', 'transfer_in_name', 'transfer_cost_change',
+    'transfer_points_gain', 'new_xi_points'
+)
+
+
+def load_squads(path: str) -> List[Dict]:
+    """Read squads from a file.
+    
+    Accepts JSON Lines (one team JSON per line) or a JSON file holding a list
+    of team JSONs or {"squads": [...]}. Team JSON is the current_team_json
+    format ({"team": [{"position": ..., "players": [{"id": ...}, ...]}]});
+    an optional "entry" key labels the squad in the results.
+    """
+    text = Path(path).read_text()
+    if Path(path).suffix == '.jsonl':
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    return data['squads'] if isinstance(data, dict) else data
+
+
+def write_columns(columns: Dict[str, np.ndarray], path: str) -> None:
+    """Write result columns to .npz (one array per column) or .csv."""
+    if Path(path).suffix == '.csv':
+        pd.DataFrame(columns).to_csv(path, index=False)
+    else:
+        np.savez_compressed(path, **columns)
+
+
+# Per-process candidate pool and optimizer, set once by the pool initializer
+_worker_pool = None
+_worker_optimizer = None
+
+
+def _init_transfer_worker(db_path: str, pool: CandidatePool):
+    """Pool initializer: keep the batch's candidate pool for every task."""
+    global _worker_pool, _worker_optimizer
+    _worker_pool = pool
+    _worker_optimizer = FPLTransferOptimizer(db_path)
+
+
+def _best_transfer_chunk(task):
+    """Best single transfer of each squad in a chunk.
+    
+    Returns:
+        List of (squad index, out pool row, in pool row, points gain); squads
+        without a feasible transfer are left out
+    """
+    indices, squad_rows, current_points, budgets = task
+    results = []
+    for index, rows, points, budget in zip(indices, squad_rows, current_points, budgets):
+        squad = _worker_pool.players.iloc[rows]
+        transfers = _worker_optimizer._rank_single_transfers(squad, points, budget, _worker_pool, top_k=1)
+        if transfers:
+            transfer = transfers[0]
+            results.append((index, _worker_pool.row_of[transfer['out']['id']],
+                            _worker_pool.row_of[transfer['in']['id']], float(transfer['points_gain'])))
+    return results
+
+
+def analyze_squads(db_path: str, squads: List[Dict], num_weeks: int = 3, max_workers: int = None,
+                   chunk_size: int = 64) -> Dict:
+    """Check, score and find the best transfer for many squads against one candidate pool.
+    
+    Args:
+        db_path: Path to the SQLite database
+        squads: Team JSONs (see load_squads)
+        num_weeks: Number of weeks to sum predictions over (default: 3)
+        max_workers: Pool size for the transfer searches (default: CPU count); 1 runs in-process
+        chunk_size: Squads per worker task (default: 64)
+    
+    Returns:
+        Dict with 'columns' (RESULT_COLUMNS -> array of length n_squads),
+        'elapsed' (seconds) and 'squads_per_second'
+    """
+    global _worker_pool, _worker_optimizer
+    
+    start = time.perf_counter()
+    optimizer = FPLTransferOptimizer(db_path)
+    pool = optimizer.candidate_pool(num_weeks)
+    n_squads = len(squads)
+    pool_codes = pd.Categorical(pool.players['position'], categories=POSITIONS).codes.astype(np.int64)
+    pool_names = pool.players['name'].to_numpy(dtype=object)
+    
+    entry = np.array([str(squad.get('entry', index)) for index, squad in enumerate(squads)], dtype=str)
+    error = [''] * n_squads
+    violations = np.zeros(n_squads, dtype=np.int64)
+    rows = np.zeros((n_squads, SQUAD_SIZE), dtype=np.int64)
+    starters = np.zeros((n_squads, SQUAD_SIZE), dtype=bool)
+    complete = np.zeros(n_squads, dtype=bool)
+    
+    # Pool rows and starter flags per squad (squads that are not 15 known players are flagged here)
+    for index, squad in enumerate(squads):
+        players = [player for group in squad.get('team', []) for player in group['players']]
+        unknown = [player['id'] for player in players if player['id'] not in pool.row_of]
+        if unknown:
+            error[index] = f"Player IDs not found in database: {sorted(unknown)}"
+        elif len(players) != SQUAD_SIZE:
+            violations[index] = VIOLATION_SQUAD_SIZE
+        else:
+            rows[index] = [pool.row_of[player['id']] for player in players]
+            starters[index] = [player.get('is_starter', True) for player in players]
+            complete[index] = True
+    
+    # Sort each squad's slots by position, then check every squad's rules in one call
+    order = np.argsort(pool_codes[rows], axis=1, kind='stable')
+    rows = np.take_along_axis(rows, order, axis=1)
+    starters = np.take_along_axis(starters, order, axis=1)
+    if complete.any():
+        violations[complete] = FPLValidator.constraint_violations(
+            pool_codes[rows[complete]], pool.clubs[rows[complete]], pool.costs[rows[complete]]
+        )
+    valid = complete & (violations == 0)
+    
+    # Lineups: saved XI against the best XI, for all valid squads at once
+    points = pool.points[rows]
+    squad_cost = pool.costs[rows].sum(axis=1)
+    saved_xi_points = np.where(valid, (points * starters).sum(axis=1), np.nan)
+    best_xi_points = np.full(n_squads, np.nan)
+    if valid.any():
+        best_xi_points[valid] = FPLValidator.best_xi_points(points[valid], SLOT_POSITIONS)
+    
+    # Best single transfer per valid squad, in chunks across the process pool
+    valid_indices = np.flatnonzero(valid)
+    tasks = [
+        (chunk, rows[chunk], best_xi_points[chunk], BUDGET_TENTHS - squad_cost[chunk])
+        for chunk in np.array_split(valid_indices, max(1, -(-len(valid_indices) // chunk_size)))
+        if len(chunk)
+    ]
+    max_workers = min(max_workers or os.cpu_count() or 1, max(1, len(tasks)))
+    if max_workers == 1:
+        _init_transfer_worker(db_path, pool)
+        try:
+            chunk_results = [_best_transfer_chunk(task) for task in tasks]
+        finally:
+            _worker_pool = _worker_optimizer = None
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_transfer_worker,
+                                 initargs=(db_path, pool)) as executor:
+            chunk_results = list(executor.map(_best_transfer_chunk, tasks))
+    
+    out_row = np.full(n_squads, -1, dtype=np.int64)
+    in_row = np.full(n_squads, -1, dtype=np.int64)
+    points_gain = np.full(n_squads, np.nan)
+    for index, out_pool_row, in_pool_row, gain in (result for chunk in chunk_results for result in chunk):
+        out_row[index], in_row[index], points_gain[index] = out_pool_row, in_pool_row, gain
+    has_transfer = out_row >= 0
+    
+    columns = {
+        'entry': entry,
+        'valid': valid,
+        'violations': violations,
+        'error': np.array(error, dtype=str),
+        'squad_cost': np.where(complete, squad_cost / 10, np.nan),
+        'saved_xi_points': saved_xi_points,
+        'best_xi_points': best_xi_points,
+        'lineup_gain': best_xi_points - saved_xi_points,
+        'transfer_out_id': np.where(has_transfer, pool.ids[out_row], -1),
+        'transfer_out_name': np.where(has_transfer, pool_names[out_row], '').astype(str),
+        'transfer_in_id': np.where(has_transfer, pool.ids[in_row], -1),
+        'transfer_in_name': np.where(has_transfer, pool_names[in_row], '').astype(str),
+        'transfer_cost_change': np.where(has_transfer, (pool.costs[in_row] - pool.costs[out_row]) / 10, np.nan),
+        'transfer_points_gain': points_gain,
+        'new_xi_points': best_xi_points + points_gain
+    }
+    elapsed = time.perf_counter() - start
+    return {
+        'columns': columns,
+        'elapsed': elapsed,
+        'squads_per_second': n_squads / elapsed if elapsed > 0 else float('inf')
+    }
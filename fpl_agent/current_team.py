@@ -0,0 +1,268 @@
+"""
+Storage for the user's saved squad.
+
+Every save is a snapshot: one row in current_team_snapshots (keyed by save
+time) plus one row per player in current_team_players, written with a single
+executemany in one transaction. Nothing is dropped or overwritten, so past
+squads stay available. Views give the read side:
+
+- current_team: players of the latest snapshot (same columns as the old table,
+  plus cost in tenths of £1m and snapshot_id)
+- current_team_totals: squad cost and starting XI points per snapshot
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+
+from .database import FPLDatabase
+
+# Columns written per player; team_df must provide id, name, position, team,
+# cost (or price), predicted_points and is_starter
+PLAYER_COLUMNS = ['player_id', 'player_name', 'position', 'team_id', 'team_name', 'cost', 'predicted_points', 'is_starter']
+
+
+class CurrentTeamRepository:
+    """Save and load the user's squad as timestamped snapshots."""
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the repository.
+        
+        Args:
+            db_path: Path to the SQLite database
+        """
+        self.db = FPLDatabase(db_path)
+    
+    def ensure_schema(self, conn: sqlite3.Connection) -> None:
+        """Create the snapshot tables and views, migrating a legacy current_team table."""
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS current_team_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                saved_at TIMESTAMP NOT NULL,
+                source TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS current_team_players (
+                snapshot_id INTEGER NOT NULL REFERENCES current_team_snapshots(id),
+                player_id INTEGER NOT NULL,
+                player_name TEXT,
+                position TEXT,
+                team_id INTEGER,
+                team_name TEXT,
+                cost INTEGER,
+                predicted_points REAL,
+                is_starter BOOLEAN,
+                PRIMARY KEY (snapshot_id, player_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_current_team_snapshots_saved_at
+            ON current_team_snapshots(saved_at)
+        """)
+        
+        # Before snapshots, current_team was a table rewritten on every save
+        cursor.execute("SELECT type FROM sqlite_master WHERE name = 'current_team'")
+        row = cursor.fetchone()
+        if row is not None and row[0] == 'table':
+            self._migrate_legacy_table(cursor)
+        
+        cursor.execute("""
+            CREATE VIEW IF NOT EXISTS current_team AS
+            SELECT p.player_id, p.player_name, p.position, p.team_id, p.team_name,
+                   p.cost, p.cost / 10.0 AS price, p.predicted_points, p.is_starter,
+                   s.saved_at, p.snapshot_id
+            FROM current_team_players p
+            JOIN current_team_snapshots s ON s.id = p.snapshot_id
+            WHERE p.snapshot_id = (SELECT MAX(id) FROM current_team_snapshots)
+        """)
+        cursor.execute("""
+            CREATE VIEW IF NOT EXISTS current_team_totals AS
+            SELECT s.id AS snapshot_id, s.saved_at, s.source,
+                   COUNT(p.player_id) AS players,
+                   COALESCE(SUM(p.cost), 0) / 10.0 AS team_cost,
+                   COALESCE(SUM(CASE WHEN p.is_starter THEN p.predicted_points ELSE 0 END), 0) AS team_points
+            FROM current_team_snapshots s
+            LEFT JOIN current_team_players p ON p.snapshot_id = s.id
+            GROUP BY s.id
+        """)
+    
+    @staticmethod
+    def _migrate_legacy_table(cursor: sqlite3.Cursor) -> None:
+        """Move the rows of a legacy current_team table into a snapshot, then drop it."""
+        legacy = cursor.execute("""
+            SELECT player_id, player_name, position, team_id, team_name, price, predicted_points,
+                   is_starter, saved_at
+            FROM current_team
+        """).fetchall()
+        if legacy:
+            saved_at = max((row[8] for row in legacy if row[8] is not None), default=None)
+            cursor.execute(
+                "INSERT INTO current_team_snapshots (saved_at, source) VALUES (?, ?)",
+                (saved_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'legacy')
+            )
+            snapshot_id = cursor.lastrowid
+            cursor.executemany(f"""
+                INSERT OR REPLACE INTO current_team_players (snapshot_id, {', '.join(PLAYER_COLUMNS)})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (snapshot_id, player_id, name, position, team_id, team_name,
+                 None if price is None else int(round(price * 10)), points, is_starter)
+                for player_id, name, position, team_id, team_name, price, points, is_starter, _ in legacy
+            ])
+        cursor.execute("DROP TABLE current_team")
+        print(f"Migrated legacy current_team table ({len(legacy)} players) to snapshots")
+    
+    def save(self, team_df: pd.DataFrame, source: str = None, saved_at: str = None) -> int:
+        """Save a squad as a new snapshot in one transaction.
+        
+        Args:
+            team_df: Squad with id, name, position, team, cost (or price),
+                predicted_points and is_starter columns; team_name is optional
+            source: Optional label for where the squad came from (e.g. 'optimizer', 'ui')
+            saved_at: Snapshot timestamp (default: now)
+        
+        Returns:
+            The new snapshot id
+        """
+        if 'cost' in team_df:
+            costs = team_df['cost'].astype(int)
+        else:
+            costs = (team_df['price'] * 10).round().astype(int)
+        team_names = team_df['team_name'] if 'team_name' in team_df else pd.Series(None, index=team_df.index)
+        rows = list(zip(
+            team_df['id'].astype(int).tolist(),
+            team_df['name'].tolist(),
+            team_df['position'].tolist(),
+            team_df['team'].astype(int).tolist(),
+            team_names.tolist(),
+            costs.tolist(),
+            team_df['predicted_points'].astype(float).tolist(),
+            team_df['is_starter'].astype(bool).tolist()
+        ))
+        saved_at = saved_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        with self.db.get_connection() as conn:
+            self.ensure_schema(conn)
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO current_team_snapshots (saved_at, source) VALUES (?, ?)",
+                (saved_at, source)
+            )
+            snapshot_id = cursor.lastrowid
+            cursor.executemany(f"""
+                INSERT INTO current_team_players (snapshot_id, {', '.join(PLAYER_COLUMNS)})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(snapshot_id,) + row for row in rows])
+            conn.commit()
+        
+        return snapshot_id
+    
+    def load(self, snapshot_id: Optional[int] = None) -> pd.DataFrame:
+        """Players of a snapshot (default: the latest), ordered by position and starters first.
+        
+        Returns:
+            DataFrame with the current_team view columns; empty if nothing was saved
+        """
+        with self.db.get_connection() as conn:
+            self.ensure_schema(conn)
+            if snapshot_id is None:
+                return pd.read_sql_query("""
+                    SELECT * FROM current_team
+                    ORDER BY
+                        CASE position WHEN 'GK' THEN 1 WHEN 'DEF' THEN 2 WHEN 'MID' THEN 3 WHEN 'FWD' THEN 4 END,
+                        is_starter DESC
+                """, conn)
+            return pd.read_sql_query("""
+                SELECT p.player_id, p.player_name, p.position, p.team_id, p.team_name,
+                       p.cost, p.cost / 10.0 AS price, p.predicted_points, p.is_starter,
+                       s.saved_at, p.snapshot_id
+                FROM current_team_players p
+                JOIN current_team_snapshots s ON s.id = p.snapshot_id
+                WHERE p.snapshot_id = ?
+                ORDER BY
+                    CASE p.position WHEN 'GK' THEN 1 WHEN 'DEF' THEN 2 WHEN 'MID' THEN 3 WHEN 'FWD' THEN 4 END,
+                    p.is_starter DESC
+            """, conn, params=(snapshot_id,))
+    
+    def history(self, limit: int = None) -> pd.DataFrame:
+        """Saved snapshots with their totals, newest first."""
+        query = "SELECT * FROM current_team_totals ORDER BY snapshot_id DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self.db.get_connection() as conn:
+            self.ensure_schema(conn)
+            return pd.read_sql_query(query, conn)
+    
+    def totals(self, snapshot_id: Optional[int] = None) -> Dict:
+        """Cost and starting XI points of a snapshot (default: the latest); empty dict if none."""
+        with self.db.get_connection() as conn:
+            self.ensure_schema(conn)
+            row = conn.execute("""
+                SELECT snapshot_id, saved_at, source, players, team_cost, team_points
+                FROM current_team_totals
+                WHERE snapshot_id = COALESCE(?, (SELECT MAX(id) FROM current_team_snapshots))
+            """, (snapshot_id,)).fetchone()
+        if row is None:
+            return {}
+        return dict(zip(['snapshot_id', 'saved_at', 'source', 'players', 'team_cost', 'team_points'], row))
+    
+    def refresh_latest_data(self) -> int:
+        """Update cost and predicted points of the latest snapshot from the latest data.
+        
+        Points are the next gameweek's final_predictions, or ep_this from
+        elements when there are no predictions yet. Values are read with one
+        join and written with one executemany; totals follow from the view.
+        
+        Returns:
+            Number of players updated
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('current_team', 'current_team_snapshots')")
+            if cursor.fetchone() is None:
+                return 0  # Nothing saved yet
+            self.ensure_schema(conn)
+            
+            next_gw = None
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='final_predictions'")
+            if cursor.fetchone() is not None:
+                cursor.execute("""
+                    SELECT MIN(gameweek)
+                    FROM final_predictions
+                    WHERE gameweek >= (
+                        SELECT COALESCE(MAX(event), 1) FROM fixtures WHERE finished = 1
+                    ) + 1
+                """)
+                next_gw = cursor.fetchone()[0]
+            
+            if next_gw is None:
+                # No predictions available - use ep_this fallback
+                updates = cursor.execute("""
+                    SELECT e.now_cost, e.ep_this, p.snapshot_id, p.player_id
+                    FROM current_team_players p
+                    JOIN elements e ON e.id = p.player_id
+                    WHERE p.snapshot_id = (SELECT MAX(id) FROM current_team_snapshots)
+                """).fetchall()
+            else:
+                updates = cursor.execute("""
+                    SELECT e.now_cost, MAX(fp.predicted_points), p.snapshot_id, p.player_id
+                    FROM current_team_players p
+                    JOIN elements e ON e.id = p.player_id
+                    LEFT JOIN final_predictions fp ON fp.player_id = p.player_id AND fp.gameweek = ?
+                    WHERE p.snapshot_id = (SELECT MAX(id) FROM current_team_snapshots)
+                    GROUP BY p.snapshot_id, p.player_id
+                """, (next_gw,)).fetchall()
+            
+            cursor.executemany("""
+                UPDATE current_team_players
+                SET cost = ?, predicted_points = ?
+                WHERE snapshot_id = ? AND player_id = ?
+            """, updates)
+            conn.commit()
+        
+        return len(updates)
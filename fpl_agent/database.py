@@ -7,8 +7,11 @@ Tables:
 - fixtures: Fixture data from FPL API
 - final_predictions: Weekly prediction data for all players by gameweek
 - player_summary: Aggregated player data with summed predictions for next N weeks (main query table)
-- current_team: User's saved team configuration
+- player_leaderboard: Top players per position for a few fixed horizons, materialized with the predictions
+- current_team_snapshots / current_team_players: User's saved squads, one snapshot per save
+  (current_team and current_team_totals are views; see current_team.py)
 - player_gameweek_history: Historical gameweek performance data
+- data_generation: Counter bumped whenever source data changes (used to invalidate caches)
 """
 
 import sqlite3
@@ -16,6 +19,51 @@ import pandas as pd
 from pathlib import Path
 from typing import Dict, List
 
+# Horizons (in weeks) materialized in player_leaderboard, and players kept per position
+LEADERBOARD_HORIZONS = (1, 3, 5)
+LEADERBOARD_TOP_K = 20
+
+# Top players per position over the next N gameweeks in one query (params: num_weeks, top_k;
+# a NULL top_k keeps every player).
+# Points are summed like populate_player_summary; ties are broken by player id.
+TOP_PERFORMERS_QUERY = """
+    WITH next_gameweeks AS (
+        SELECT DISTINCT gameweek
+        FROM final_predictions
+        WHERE gameweek >= (
+            SELECT COALESCE(MAX(event), 1) + 1 FROM fixtures WHERE finished = 1
+        )
+        ORDER BY gameweek
+        LIMIT ?
+    ),
+    player_points AS (
+        SELECT 
+            e.id as player_id,
+            e.web_name as name,
+            e.element_type_name as position,
+            t.name as team_name,
+            e.now_cost as cost,
+            COALESCE(SUM(fp.predicted_points), 0.0) as predicted_points
+        FROM elements e
+        JOIN teams t ON e.team = t.id
+        LEFT JOIN final_predictions fp 
+            ON e.id = fp.player_id 
+            AND fp.gameweek IN (SELECT gameweek FROM next_gameweeks)
+        WHERE e.can_select = 1 
+        AND e.now_cost > 0
+        GROUP BY e.id, e.web_name, e.element_type_name, t.name, e.now_cost
+    ),
+    ranked AS (
+        SELECT 
+            *,
+            ROW_NUMBER() OVER (PARTITION BY position ORDER BY predicted_points DESC, player_id) as rank
+        FROM player_points
+    )
+    SELECT position, rank, player_id, name, team_name, cost, predicted_points
+    FROM ranked
+    WHERE rank <= COALESCE(?, rank)
+"""
+
 
 class FPLDatabase:
     """Database handler for FPL data."""
@@ -28,6 +76,55 @@ class FPLDatabase:
         """Get database connection."""
         return sqlite3.connect(self.db_path)
     
+    def get_data_generation(self, conn: sqlite3.Connection = None) -> int:
+        """Current data generation (0 if source data has never been written).
+        
+        Args:
+            conn: Open connection to read within (sees its uncommitted bumps)
+        """
+        if conn is None:
+            with self.get_connection() as conn:
+                return self.get_data_generation(conn)
+        
+        try:
+            row = conn.execute("SELECT generation FROM data_generation WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            return 0  # Table not created yet
+        return row[0] if row else 0
+    
+    def bump_data_generation(self, conn: sqlite3.Connection = None) -> int:
+        """Mark the source data (elements, fixtures, predictions) as changed.
+        
+        Caches built from player data compare their generation against this
+        counter to know when to reload.
+        
+        Args:
+            conn: Open connection to bump within (committed by the caller)
+        
+        Returns:
+            The new generation
+        """
+        if conn is None:
+            with self.get_connection() as conn:
+                generation = self.bump_data_generation(conn)
+                conn.commit()
+            return generation
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS data_generation (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                generation INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            INSERT INTO data_generation (id, generation) VALUES (1, 1)
+            ON CONFLICT(id) DO UPDATE SET
+                generation = generation + 1,
+                updated_at = CURRENT_TIMESTAMP
+        """)
+        return conn.execute("SELECT generation FROM data_generation WHERE id = 1").fetchone()[0]
+    
     def load_player_data(self, gameweek: int = None, num_weeks: int = 1) -> pd.DataFrame:
         """Load player data from player_summary table.
         
@@ -40,7 +137,9 @@ class FPLDatabase:
             num_weeks: Number of weeks to sum predictions for (default: 1)
             
         Returns:
-            DataFrame with player data and predicted points (summed over num_weeks)
+            DataFrame with player data and predicted points (summed over num_weeks).
+            cost is the price in integer tenths of £1m (used for budget arithmetic);
+            price is the same value in £m for display.
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -62,6 +161,11 @@ class FPLDatabase:
                 result = cursor.fetchone()
                 if not result or result[0] != num_weeks:
                     needs_refresh = True
+                
+                # Tables created before prices were stored as integer tenths
+                columns = {row[1] for row in cursor.execute("PRAGMA table_info(player_summary)")}
+                if 'cost' not in columns:
+                    needs_refresh = True
             else:
                 needs_refresh = True
             
@@ -79,6 +183,7 @@ class FPLDatabase:
                     name,
                     position,
                     team,
+                    cost,
                     price,
                     predicted_points
                 FROM player_summary
@@ -89,6 +194,35 @@ class FPLDatabase:
         
         return df
     
+    def load_gameweek_predictions(self, num_weeks: int = 1) -> pd.DataFrame:
+        """Load per-gameweek predicted points for the next N gameweeks.
+        
+        Args:
+            num_weeks: Number of upcoming gameweeks (default: 1)
+        
+        Returns:
+            DataFrame with player_id, gameweek and predicted_points (summed over
+            fixtures, so double gameweeks count twice)
+        """
+        query = """
+            WITH next_gameweeks AS (
+                SELECT DISTINCT gameweek
+                FROM final_predictions
+                WHERE gameweek >= (
+                    SELECT COALESCE(MAX(event), 1) + 1 FROM fixtures WHERE finished = 1
+                )
+                ORDER BY gameweek
+                LIMIT ?
+            )
+            SELECT player_id, gameweek, SUM(predicted_points) as predicted_points
+            FROM final_predictions
+            WHERE gameweek IN (SELECT gameweek FROM next_gameweeks)
+            GROUP BY player_id, gameweek
+            ORDER BY gameweek, player_id
+        """
+        with self.get_connection() as conn:
+            return pd.read_sql_query(query, conn, params=(num_weeks,))
+    
     def create_elements_table(self) -> None:
         """Create elements table with all API fields."""
         with self.get_connection() as conn:
@@ -263,6 +397,7 @@ class FPLDatabase:
                     )
                 """, self._extract_element_data(element, element_type_map, team_map))
             
+            self.bump_data_generation(conn)
             conn.commit()
     
     def _extract_element_data(self, element: Dict, element_type_map: Dict, team_map: Dict) -> tuple:
@@ -394,80 +529,9 @@ class FPLDatabase:
             return None
     
     def update_current_team_with_latest_data(self) -> None:
-        """Update current_team table with latest price and predicted points from final_predictions table."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if current_team table exists
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='current_team'
-            """)
-            if cursor.fetchone() is None:
-                # Table doesn't exist - skip update
-                return
-            
-            # Check if final_predictions table exists
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='final_predictions'
-            """)
-            has_predictions = cursor.fetchone() is not None
-            
-            if not has_predictions:
-                # Table doesn't exist yet - use ep_this fallback
-                cursor.execute("""
-                    UPDATE current_team 
-                    SET 
-                        price = (SELECT now_cost / 10.0 FROM elements WHERE elements.id = current_team.player_id),
-                        predicted_points = (SELECT ep_this FROM elements WHERE elements.id = current_team.player_id)
-                    WHERE player_id IN (SELECT id FROM elements)
-                """)
-            else:
-                # Get the next upcoming gameweek
-                cursor.execute("""
-                    SELECT MIN(gameweek) 
-                    FROM final_predictions
-                    WHERE gameweek >= (
-                        SELECT COALESCE(MAX(event), 1) FROM fixtures WHERE finished = 1
-                    ) + 1
-                """)
-                next_gw = cursor.fetchone()[0]
-                
-                if next_gw is None:
-                    # Fallback to ep_this if no predictions available
-                    cursor.execute("""
-                        UPDATE current_team 
-                        SET 
-                            price = (SELECT now_cost / 10.0 FROM elements WHERE elements.id = current_team.player_id),
-                            predicted_points = (SELECT ep_this FROM elements WHERE elements.id = current_team.player_id)
-                        WHERE player_id IN (SELECT id FROM elements)
-                    """)
-                else:
-                    # Update price and predicted_points for existing current_team players
-                    cursor.execute("""
-                        UPDATE current_team 
-                        SET 
-                            price = (SELECT now_cost / 10.0 FROM elements WHERE elements.id = current_team.player_id),
-                            predicted_points = (
-                                SELECT predicted_points 
-                                FROM final_predictions 
-                                WHERE final_predictions.player_id = current_team.player_id 
-                                AND final_predictions.gameweek = ?
-                                LIMIT 1
-                            )
-                        WHERE player_id IN (SELECT id FROM elements)
-                    """, (next_gw,))
-            
-            # Recalculate and update team_cost and team_points for all records
-            cursor.execute("""
-                UPDATE current_team 
-                SET 
-                    team_cost = (SELECT SUM(price) FROM current_team),
-                    team_points = (SELECT SUM(predicted_points) FROM current_team WHERE is_starter = 1)
-            """)
-            
-            conn.commit()
+        """Update the saved squad with latest price and predicted points (see CurrentTeamRepository)."""
+        from .current_team import CurrentTeamRepository
+        CurrentTeamRepository(str(self.db_path)).refresh_latest_data()
     
     def create_teams_table(self) -> None:
         """Create teams table with all fields from teams.csv."""
@@ -626,6 +690,7 @@ class FPLDatabase:
                     fixture['pulse_id']
                 ))
             
+            self.bump_data_generation(conn)
             conn.commit()
     
     def create_player_gameweek_history_table(self) -> None:
@@ -762,55 +827,101 @@ class FPLDatabase:
         with self.get_connection() as conn:
             return pd.read_sql_query(query, conn, params=params)
     
-    def load_top_performers_for_weeks(self, num_weeks: int = 3) -> pd.DataFrame:
-        """Load top performers for the next N weeks from player_summary table.
+    def load_top_performers_for_weeks(self, num_weeks: int = 3, top_n: int = None) -> pd.DataFrame:
+        """Load players for the next N weeks, optionally only the top_n per position.
+        
+        Reads player_leaderboard when it holds this horizon for the current
+        data generation and at least top_n players per position. Otherwise
+        ranks all players in a single windowed query over final_predictions.
+        Either way player_summary is neither read nor rebuilt.
         
-        Note: Requires player_summary table to be populated with the correct num_weeks.
+        Args:
+            num_weeks: Number of weeks to sum predictions over (default: 3)
+            top_n: Players per position (default: None, every player)
+        
+        Returns:
+            DataFrame with name, position, team (name) and predicted_points,
+            ordered by predicted points
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            generation = self.get_data_generation(conn)
+            try:
+                stored = conn.execute("""
+                    SELECT generation, top_k FROM player_leaderboard WHERE num_weeks = ? LIMIT 1
+                """, (num_weeks,)).fetchone()
+            except sqlite3.OperationalError:
+                stored = None  # Table not created yet
             
-            # Check if player_summary exists and has correct num_weeks
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='player_summary'
-            """)
-            
-            table_exists = cursor.fetchone() is not None
-            needs_refresh = False
-            
-            if table_exists:
-                cursor.execute("""
-                    SELECT DISTINCT num_weeks FROM player_summary LIMIT 1
-                """)
-                result = cursor.fetchone()
-                if not result or result[0] != num_weeks:
-                    needs_refresh = True
+            if stored is not None and stored[0] == generation and top_n is not None and top_n <= stored[1]:
+                query = """
+                    SELECT name, position, team_name as team, predicted_points
+                    FROM player_leaderboard
+                    WHERE num_weeks = ? AND rank <= ?
+                    ORDER BY predicted_points DESC, player_id
+                """
             else:
-                needs_refresh = True
-            
-            # Create/refresh table if needed
-            if needs_refresh:
-                print(f"Refreshing player_summary table with {num_weeks} weeks of predictions...")
-                self.create_player_summary_table()
-                count = self.populate_player_summary(num_weeks)
-                print(f"Populated player_summary with {count} players")
+                query = f"""
+                    SELECT name, position, team_name as team, predicted_points
+                    FROM ({TOP_PERFORMERS_QUERY})
+                    ORDER BY predicted_points DESC, player_id
+                """
             
-            # Query from player_summary
-            query = """
-                SELECT 
-                    name,
-                    position,
-                    team_name as team,
-                    predicted_points
-                FROM player_summary
-                ORDER BY predicted_points DESC
-            """
-            
-            df = pd.read_sql_query(query, conn)
+            df = pd.read_sql_query(query, conn, params=(num_weeks, top_n))
         
         return df
     
+    def populate_leaderboard(self, conn: sqlite3.Connection = None, horizons=LEADERBOARD_HORIZONS,
+                             top_k: int = LEADERBOARD_TOP_K) -> int:
+        """Materialize the top_k players per position for each horizon in player_leaderboard.
+        
+        Rows are tagged with the current data generation, so
+        load_top_performers_for_weeks ignores them once source data changes.
+        
+        Args:
+            conn: Open connection to write within (committed by the caller)
+            horizons: Numbers of weeks to rank players over (default: LEADERBOARD_HORIZONS)
+            top_k: Players kept per position and horizon (default: LEADERBOARD_TOP_K)
+        
+        Returns:
+            Number of rows written
+        """
+        if conn is None:
+            with self.get_connection() as conn:
+                count = self.populate_leaderboard(conn, horizons, top_k)
+                conn.commit()
+            return count
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS player_leaderboard (
+                num_weeks INTEGER NOT NULL,
+                position TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                player_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                team_name TEXT NOT NULL,
+                cost INTEGER NOT NULL,
+                predicted_points REAL NOT NULL,
+                top_k INTEGER NOT NULL,
+                generation INTEGER NOT NULL,
+                PRIMARY KEY (num_weeks, position, rank)
+            )
+        """)
+        conn.execute("DELETE FROM player_leaderboard")
+        
+        generation = self.get_data_generation(conn)
+        count = 0
+        for num_weeks in horizons:
+            cursor = conn.execute(f"""
+                INSERT INTO player_leaderboard (
+                    num_weeks, position, rank, player_id, name, team_name, cost,
+                    predicted_points, top_k, generation
+                )
+                SELECT ?, position, rank, player_id, name, team_name, cost, predicted_points, ?, ?
+                FROM ({TOP_PERFORMERS_QUERY})
+            """, (num_weeks, top_k, generation, num_weeks, top_k))
+            count += cursor.rowcount
+        return count
+    
     def create_player_summary_table(self) -> None:
         """Create player_summary table for quick access to player data with summed predictions."""
         with self.get_connection() as conn:
@@ -827,6 +938,7 @@ class FPLDatabase:
                     position TEXT NOT NULL,
                     team INTEGER NOT NULL,
                     team_name TEXT NOT NULL,
+                    cost INTEGER NOT NULL,
                     price REAL NOT NULL,
                     predicted_points REAL NOT NULL,
                     num_weeks INTEGER NOT NULL,
@@ -853,57 +965,66 @@ class FPLDatabase:
             
             conn.commit()
     
-    def populate_player_summary(self, num_weeks: int = 3) -> int:
+    def populate_player_summary(self, num_weeks: int = 3, conn: sqlite3.Connection = None) -> int:
         """Populate player_summary table with summed predictions for next N weeks.
         
+        Bumps the data generation in the same transaction, so generation-keyed
+        caches only reload once the new summary is visible.
+        
         Args:
             num_weeks: Number of weeks to sum predictions for (default: 3)
+            conn: Open connection to write within (committed by the caller)
             
         Returns:
             Number of players inserted
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Clear existing data
-            cursor.execute("DELETE FROM player_summary")
-            
-            # Insert aggregated player data
-            cursor.execute("""
-                INSERT INTO player_summary (
-                    player_id, name, position, team, team_name, price, 
-                    predicted_points, num_weeks
-                )
-                WITH next_gameweeks AS (
-                    SELECT DISTINCT gameweek
-                    FROM final_predictions
-                    WHERE gameweek >= (
-                        SELECT COALESCE(MAX(event), 1) + 1 FROM fixtures WHERE finished = 1
-                    )
-                    ORDER BY gameweek
-                    LIMIT ?
+        if conn is None:
+            with self.get_connection() as conn:
+                count = self.populate_player_summary(num_weeks, conn)
+                conn.commit()
+            return count
+        
+        cursor = conn.cursor()
+        
+        # Clear existing data
+        cursor.execute("DELETE FROM player_summary")
+        
+        # Insert aggregated player data
+        cursor.execute("""
+            INSERT INTO player_summary (
+                player_id, name, position, team, team_name, cost, price,
+                predicted_points, num_weeks
+            )
+            WITH next_gameweeks AS (
+                SELECT DISTINCT gameweek
+                FROM final_predictions
+                WHERE gameweek >= (
+                    SELECT COALESCE(MAX(event), 1) + 1 FROM fixtures WHERE finished = 1
                 )
-                SELECT 
-                    e.id as player_id,
-                    e.web_name as name,
-                    e.element_type_name as position,
-                    e.team,
-                    t.name as team_name,
-                    e.now_cost / 10.0 as price,
-                    COALESCE(SUM(fp.predicted_points), 0.0) as predicted_points,
-                    ? as num_weeks
-                FROM elements e
-                JOIN teams t ON e.team = t.id
-                LEFT JOIN final_predictions fp 
-                    ON e.id = fp.player_id 
-                    AND fp.gameweek IN (SELECT gameweek FROM next_gameweeks)
-                WHERE e.can_select = 1 
-                AND e.now_cost > 0
-                GROUP BY e.id, e.web_name, e.element_type_name, e.team, t.name, e.now_cost
-                ORDER BY e.id
-            """, (num_weeks, num_weeks))
-            
-            count = cursor.rowcount
-            conn.commit()
-            
-            return count
\ No newline at end of file
+                ORDER BY gameweek
+                LIMIT ?
+            )
+            SELECT 
+                e.id as player_id,
+                e.web_name as name,
+                e.element_type_name as position,
+                e.team,
+                t.name as team_name,
+                e.now_cost as cost,
+                e.now_cost / 10.0 as price,
+                COALESCE(SUM(fp.predicted_points), 0.0) as predicted_points,
+                ? as num_weeks
+            FROM elements e
+            JOIN teams t ON e.team = t.id
+            LEFT JOIN final_predictions fp 
+                ON e.id = fp.player_id 
+                AND fp.gameweek IN (SELECT gameweek FROM next_gameweeks)
+            WHERE e.can_select = 1 
+            AND e.now_cost > 0
+            GROUP BY e.id, e.web_name, e.element_type_name, e.team, t.name, e.now_cost
+            ORDER BY e.id
+        """, (num_weeks, num_weeks))
+        
+        count = cursor.rowcount
+        self.bump_data_generation(conn)
+        return count
@@ -0,0 +1,42 @@
+"""
+Feature extraction shared by model training, validation and inference.
+
+All code paths that feed the points models build their feature matrix here so
+that training and prediction always agree on the feature layout. Bump
+FEATURE_VERSION whenever the layout changes; saved models record the version
+they were trained with and are rejected on mismatch.
+"""
+
+import numpy as np
+
+FEATURE_VERSION = 1
+FEATURE_NAMES = ('attack_advantage', 'defense_advantage', 'was_home')
+
+
+def build_features(team_attack, team_defense, opp_attack, opp_defense, was_home) -> np.ndarray:
+    """Build the differential feature matrix from column arrays.
+    
+    Scalars are accepted as well and produce a single-row matrix.
+    
+    Args:
+        team_attack: Own team attack valuation(s)
+        team_defense: Own team defense valuation(s)
+        opp_attack: Opponent attack valuation(s)
+        opp_defense: Opponent defense valuation(s)
+        was_home: Home flag(s) (bool or 0/1)
+    
+    Returns:
+        Array of shape (n_samples, len(FEATURE_NAMES)) with columns:
+        [attack_advantage, defense_advantage, was_home]
+    """
+    team_attack = np.atleast_1d(np.asarray(team_attack, dtype=float))
+    team_defense = np.atleast_1d(np.asarray(team_defense, dtype=float))
+    opp_attack = np.atleast_1d(np.asarray(opp_attack, dtype=float))
+    opp_defense = np.atleast_1d(np.asarray(opp_defense, dtype=float))
+    was_home = np.atleast_1d(np.asarray(was_home, dtype=float))
+    
+    features = np.empty((len(team_attack), len(FEATURE_NAMES)))
+    np.subtract(team_attack, opp_defense, out=features[:, 0])  # Our attack vs their defense
+    np.subtract(team_defense, opp_attack, out=features[:, 1])  # Our defense vs their attack
+    features[:, 2] = was_home
+    return features
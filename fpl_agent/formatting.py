@@ -1,69 +1,164 @@
 """
 Formatting utilities for displaying FPL results.
+
+Squads and player lists are rendered from plain record tuples with
+precompiled line templates, and written to any file-like object (anything
+with write()). The format_* methods return the same text as a string; the
+write_* methods stream it, so batch reports over thousands of squads never
+build DataFrames or hold the whole report in memory.
 """
 
-from typing import Dict
+import io
+from typing import Callable, Dict, Iterable, List, TextIO, Tuple
+from .memo import SquadMemo
+from .validation import POSITIONS
+
+# Squad records are tuples of these fields
+SQUAD_RECORD_FIELDS = ('name', 'position', 'team', 'price', 'predicted_points', 'is_starter')
+
+# Line templates (every line ends with a newline)
+_PLAYER_LINE = "  {:20} (Team {:2}) £{:4.1f}m  {:5.2f}pts\n"
+_POSITION_HEADER = "\n{} ({}):\n"
+_POSITION_TOTAL = "{}: {} players, £{:.1f}m, {:.2f}pts\n"
+_REPORT_SQUAD_HEADER = "\n{} | XI {:.2f}pts | squad £{:.1f}m | bench £{:.1f}m\n"
+_REPORT_PLAYER_LINE = "  {:5} {:3} {:20} (Team {:2}) £{:4.1f}m  {:5.2f}pts\n"
+_TOP_PERFORMER_LINE = "  {} ({}) - {:.2f} pts\n"
+
+# Formatted output by result kind and the result's squad_key
+_FORMAT_MEMO = SquadMemo('formatted_output', maxsize=256)
+
+
+def _render(write: Callable[[TextIO], None]) -> str:
+    """Text written by a write_* method, without the final newline."""
+    buffer = io.StringIO()
+    write(buffer)
+    return buffer.getvalue()[:-1]
 
 
 class FPLFormatter:
     """Formatter for FPL results and recommendations."""
     
+    @staticmethod
+    def _memoized(kind: str, result: Dict, render: Callable[[Dict], str]) -> str:
+        """Render a result, reusing the output for results that carry a squad_key.
+        
+        Memoized transfer searches tag their results with a squad_key that
+        identifies the squad, data generation and search parameters, so equal
+        keys mean equal output.
+        """
+        if 'squad_key' not in result:
+            return render(result)
+        return _FORMAT_MEMO.get_or_compute((kind, result['squad_key']), lambda: render(result))
+    
+    @staticmethod
+    def squad_records(results: Dict) -> List[Tuple]:
+        """Squad records (see SQUAD_RECORD_FIELDS) from optimizer results, in squad order."""
+        squad = results['squad']
+        starters = set(results['starting_xi']['id'].tolist())
+        return [
+            (name, position, team, price, points, player_id in starters)
+            for player_id, name, position, team, price, points in zip(
+                squad['id'].tolist(), squad['name'].tolist(), squad['position'].tolist(),
+                squad['team'].tolist(), squad['price'].tolist(), squad['predicted_points'].tolist()
+            )
+        ]
+    
     @staticmethod
     def format_squad_results(results: Dict) -> str:
         """Format the optimization results for display."""
-        output = []
-        output.append("=" * 60)
-        output.append("FPL SQUAD OPTIMIZATION RESULTS")
-        output.append("=" * 60)
+        records = FPLFormatter.squad_records(results)
+        return _render(lambda out: FPLFormatter.write_squad_results(out, results, records))
+    
+    @staticmethod
+    def write_squad_results(out: TextIO, summary: Dict, records: Iterable[Tuple]) -> None:
+        """Write one squad's optimization results to a file-like object.
+        
+        Args:
+            out: Destination with a write() method
+            summary: objective_value, epsilon, total_predicted_points, total_cost and bench_cost
+            records: Squad records (see SQUAD_RECORD_FIELDS)
+        """
+        squad = {pos: [] for pos in POSITIONS}
+        starters = {pos: [] for pos in POSITIONS}
+        bench = {pos: [] for pos in POSITIONS}
+        for record in records:
+            squad[record[1]].append(record)
+            (starters if record[5] else bench)[record[1]].append(record)
+        
+        lines = [
+            "=" * 60 + "\n",
+            "FPL SQUAD OPTIMIZATION RESULTS\n",
+            "=" * 60 + "\n",
+            f"\nOBJECTIVE VALUE: {summary['objective_value']:.6f}\n",
+            f"EPSILON (bench penalty): {summary['epsilon']}\n",
+            f"TOTAL PREDICTED POINTS (Starting XI): {summary['total_predicted_points']:.2f}\n",
+            f"TOTAL SQUAD COST: £{summary['total_cost']:.1f}m\n",
+            f"BENCH COST: £{summary['bench_cost']:.1f}m\n"
+        ]
         
-        # Summary
-        output.append(f"\nOBJECTIVE VALUE: {results['objective_value']:.6f}")
-        output.append(f"EPSILON (bench penalty): {results['epsilon']}")
-        output.append(f"TOTAL PREDICTED POINTS (Starting XI): {results['total_predicted_points']:.2f}")
-        output.append(f"TOTAL SQUAD COST: £{results['total_cost']:.1f}m")
-        output.append(f"BENCH COST: £{results['bench_cost']:.1f}m")
-        
-        # Starting XI
-        output.append(f"\n{'='*30} STARTING XI {'='*30}")
-        start_by_pos = results['starting_xi'].groupby('position')
-        for pos in ['GK', 'DEF', 'MID', 'FWD']:
-            if pos in start_by_pos.groups:
-                players = start_by_pos.get_group(pos)
-                output.append(f"\n{pos} ({len(players)}):")
-                for _, player in players.iterrows():
-                    output.append(
-                        f"  {player['name']:20} (Team {player['team']:2}) "
-                        f"£{player['price']:4.1f}m  {player['predicted_points']:5.2f}pts"
-                    )
-        
-        # Bench
-        output.append(f"\n{'='*35} BENCH {'='*35}")
-        bench_by_pos = results['bench'].groupby('position')
-        for pos in ['GK', 'DEF', 'MID', 'FWD']:
-            if pos in bench_by_pos.groups:
-                players = bench_by_pos.get_group(pos)
-                output.append(f"\n{pos} ({len(players)}):")
-                for _, player in players.iterrows():
-                    output.append(
-                        f"  {player['name']:20} (Team {player['team']:2}) "
-                        f"£{player['price']:4.1f}m  {player['predicted_points']:5.2f}pts"
-                    )
+        for title, groups in ((f"{'='*30} STARTING XI {'='*30}", starters), (f"{'='*35} BENCH {'='*35}", bench)):
+            lines.append(f"\n{title}\n")
+            for pos in POSITIONS:
+                players = groups[pos]
+                if players:
+                    lines.append(_POSITION_HEADER.format(pos, len(players)))
+                    lines.extend(_PLAYER_LINE.format(name, team, price, points)
+                                 for name, _, team, price, points, _ in players)
         
         # Full squad summary
-        output.append(f"\n{'='*25} FULL SQUAD SUMMARY {'='*25}")
-        squad_by_pos = results['squad'].groupby('position')
-        for pos in ['GK', 'DEF', 'MID', 'FWD']:
-            if pos in squad_by_pos.groups:
-                players = squad_by_pos.get_group(pos)
-                total_cost = players['price'].sum()
-                total_points = players['predicted_points'].sum()
-                output.append(f"{pos}: {len(players)} players, £{total_cost:.1f}m, {total_points:.2f}pts")
+        lines.append(f"\n{'='*25} FULL SQUAD SUMMARY {'='*25}\n")
+        for pos in POSITIONS:
+            players = squad[pos]
+            if players:
+                lines.append(_POSITION_TOTAL.format(
+                    pos, len(players), sum(record[3] for record in players), sum(record[4] for record in players)
+                ))
         
-        return "\n".join(output)
+        out.write("".join(lines))
+    
+    @staticmethod
+    def write_squad_report(out: TextIO, squads: Iterable[Tuple[str, Iterable[Tuple]]]) -> int:
+        """Stream a compact report of many squads, one block per squad.
+        
+        Each block has the squad's label, starting XI points and squad and bench
+        cost, then one line per player (starters first, by position). Blocks
+        are written as they are rendered, so squads can come from a generator.
+        
+        Args:
+            out: Destination with a write() method
+            squads: (label, squad records) pairs; records as in SQUAD_RECORD_FIELDS
+        
+        Returns:
+            Number of squads written
+        """
+        rank = {pos: i for i, pos in enumerate(POSITIONS)}
+        count = 0
+        for label, records in squads:
+            records = sorted(records, key=lambda record: (not record[5], rank[record[1]]))
+            xi_points = squad_cost = bench_cost = 0.0
+            for _, _, _, price, points, is_starter in records:
+                squad_cost += price
+                if is_starter:
+                    xi_points += points
+                else:
+                    bench_cost += price
+            lines = [_REPORT_SQUAD_HEADER.format(label, xi_points, squad_cost, bench_cost)]
+            lines.extend(
+                _REPORT_PLAYER_LINE.format('XI' if is_starter else 'BENCH', position, name, team, price, points)
+                for name, position, team, price, points, is_starter in records
+            )
+            out.write("".join(lines))
+            count += 1
+        return count
     
     @staticmethod
     def format_transfer_recommendation(result: Dict) -> str:
         """Format the transfer recommendation for display."""
+        return FPLFormatter._memoized('transfer', result, FPLFormatter._format_transfer_recommendation)
+    
+    @staticmethod
+    def _format_transfer_recommendation(result: Dict) -> str:
+        """Uncached format_transfer_recommendation."""
         output = []
         output.append("=" * 60)
         output.append("FPL TRANSFER RECOMMENDATION")
@@ -76,7 +171,7 @@ class FPLFormatter:
             output.append("\n🚫 NO TRANSFER RECOMMENDED")
             output.append("Your current team is already optimal or no beneficial transfers available within budget.")
         else:
-            transfer = result['best_transfer']
+            transfer = result['best_transfers'][0]
             output.append(f"\n✅ RECOMMENDED TRANSFER")
             output.append(f"OUT: {transfer['out']['name']} ({transfer['out']['position']}) - Team {transfer['out']['team']}")
             output.append(f"     £{transfer['out']['price']:.1f}m, {transfer['out']['predicted_points']:.2f} pts")
@@ -91,20 +186,95 @@ class FPLFormatter:
         return "\n".join(output)
     
     @staticmethod
-    def format_top_performers(df, positions=['GK', 'DEF', 'MID', 'FWD'], top_n=3, weeks=1) -> str:
-        """Format top performers by position."""
-        period = f"Next {weeks} Weeks" if weeks > 1 else "This Week"
+    def format_multi_transfer_recommendation(result: Dict) -> str:
+        """Format the best k-transfer plans for display."""
+        return FPLFormatter._memoized('multi_transfer', result, FPLFormatter._format_multi_transfer_recommendation)
+    
+    @staticmethod
+    def _format_multi_transfer_recommendation(result: Dict) -> str:
+        """Uncached format_multi_transfer_recommendation."""
+        output = []
+        output.append("=" * 60)
+        output.append(f"FPL {result['k']}-TRANSFER RECOMMENDATIONS")
+        output.append("=" * 60)
+        
+        output.append(f"Current Team Points: {result['current_team_points']:.2f}")
+        output.append(f"Current Team Cost: £{result['current_team_cost']:.1f}m")
+        
+        if result['no_transfer_recommended']:
+            output.append(f"\n🚫 NO {result['k']}-TRANSFER PLAN AVAILABLE")
+            output.append("No combination of transfers fits the budget and team limits.")
+            return "\n".join(output)
+        
+        for rank, plan in enumerate(result['best_plans'], start=1):
+            output.append(f"\n#{rank}: 📈 {plan['points_gain']:+.2f} pts, 💰 £{plan['cost_change']:+.1f}m "
+                          f"(new total {plan['new_total_points']:.2f} pts, £{plan['new_total_cost']:.1f}m)")
+            for transfer in plan['transfers']:
+                output.append(f"  OUT: {transfer['out']['name']} ({transfer['out']['position']}) "
+                              f"£{transfer['out']['price']:.1f}m, {transfer['out']['predicted_points']:.2f} pts")
+                output.append(f"  IN:  {transfer['in']['name']} ({transfer['in']['position']}) "
+                              f"£{transfer['in']['price']:.1f}m, {transfer['in']['predicted_points']:.2f} pts")
+        
+        return "\n".join(output)
+    
+    @staticmethod
+    def format_transfer_plan(plan: Dict) -> str:
+        """Format a multi-gameweek transfer plan for display."""
         output = []
-        output.append(f"Top {top_n} Performers by Position ({period})")
-        output.append("=" * 50)
+        output.append("=" * 60)
+        output.append("FPL TRANSFER PLAN")
+        output.append("=" * 60)
+        
+        output.append(f"Gameweeks: {plan['gameweeks'][0]}-{plan['gameweeks'][-1]} ({plan['mode']})")
+        output.append(f"Total Predicted Points (Starting XI): {plan['total_predicted_points']:.2f}")
+        output.append(f"Hit Cost: -{plan['total_hit_cost']:.0f} pts")
+        output.append(f"Net Points: {plan['net_points']:.2f}")
+        output.append(f"Solve Time: {plan['solve_time']:.1f}s")
+        
+        for week in plan['weeks']:
+            output.append(f"\n{'='*25} GW {week['gameweek']} {'='*25}")
+            output.append(f"Free transfers: {week['free_transfers']}, hits: {week['hits']}, "
+                          f"bank: £{week['bank']:.1f}m, XI points: {week['predicted_points']:.2f}")
+            if not week['transfers_in']:
+                output.append("  Roll transfer (no changes)")
+            for out_player, in_player in zip(week['transfers_out'], week['transfers_in']):
+                output.append(
+                    f"  OUT: {out_player['name']:20} ({out_player['position']}) £{out_player['price']:4.1f}m  "
+                    f"IN: {in_player['name']:20} ({in_player['position']}) £{in_player['price']:4.1f}m  "
+                    f"{in_player['predicted_points']:5.2f}pts"
+                )
+        
+        return "\n".join(output)
+    
+    @staticmethod
+    def format_top_performers(df, positions=['GK', 'DEF', 'MID', 'FWD'], top_n=3, weeks=1) -> str:
+        """Format top performers by position (df ordered by predicted points)."""
+        records = zip(df['name'].tolist(), df['position'].tolist(), df['team'].tolist(),
+                      df['predicted_points'].tolist())
+        return _render(lambda out: FPLFormatter.write_top_performers(out, records, positions, top_n, weeks))
+    
+    @staticmethod
+    def write_top_performers(out: TextIO, records: Iterable[Tuple], positions=POSITIONS, top_n: int = 3,
+                             weeks: int = 1) -> None:
+        """Write the top_n players per position from (name, position, team, predicted_points) records.
+        
+        Records must be ordered by predicted points; each position keeps its
+        first top_n records in one pass.
+        """
+        by_position = {pos: [] for pos in positions}
+        for record in records:
+            players = by_position.get(record[1])
+            if players is not None and len(players) < top_n:
+                players.append(record)
         
+        period = f"Next {weeks} Weeks" if weeks > 1 else "This Week"
+        lines = [f"Top {top_n} Performers by Position ({period})\n", "=" * 50 + "\n"]
         for pos in positions:
-            pos_df = df[df['position'] == pos].head(top_n)
-            if not pos_df.empty:
-                output.append(f"\n{pos}:")
-                for _, player in pos_df.iterrows():
-                    output.append(f"  {player['name']} ({player['team']}) - {player['predicted_points']:.2f} pts")
+            if by_position[pos]:
+                lines.append(f"\n{pos}:\n")
+                lines.extend(_TOP_PERFORMER_LINE.format(name, team, points)
+                             for name, _, team, points in by_position[pos])
             else:
-                output.append(f"\n{pos}: No data available")
+                lines.append(f"\n{pos}: No data available\n")
         
-        return "\n".join(output)
\ No newline at end of file
+        out.write("".join(lines))
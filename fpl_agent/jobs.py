@@ -0,0 +1,179 @@
+"""
+Background jobs for long-running optimizations.
+
+Squad solves and transfer searches run in a local process pool so callers
+(e.g. the Dash UI) can submit work, get a job id back right away and poll for
+the result. Job ids are derived from the request, so identical requests share
+one job and finished results are served from a cache.
+"""
+
+import hashlib
+import importlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from .memo import squad_hash
+
+# Job states reported by FPLJobQueue.status
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_UNKNOWN = 'unknown'
+
+# Optimizers kept alive inside each worker process, so later jobs reuse
+# loaded player data and warm start from the previous solve
+_worker_optimizers = {}
+
+
+def optimize_squad(db_path: str, num_weeks: int, epsilon: float = 0.001,
+                   optimizer: str = 'fpl_agent.optimizer:FPLSquadOptimizer', module_dir: Optional[str] = None) -> Dict:
+    """Worker: solve for the optimal squad.
+    
+    The optimizer class is passed by import path and imported in the worker,
+    so the submitting process never has to import the solver.
+    
+    Args:
+        db_path: Path to the SQLite database
+        num_weeks: Number of upcoming weeks to sum predictions over
+        epsilon: Weight for bench cost penalty
+        optimizer: 'module:Class' of FPLSquadOptimizer or a subclass with the same constructor
+        module_dir: Directory to add to sys.path before importing the optimizer
+    
+    Returns:
+        The optimizer's solve() results
+    """
+    key = (optimizer, db_path, num_weeks, epsilon)
+    squad_optimizer = _worker_optimizers.get(key)
+    if squad_optimizer is None:
+        if module_dir and module_dir not in sys.path:
+            sys.path.insert(0, module_dir)
+        module_name, class_name = optimizer.split(':')
+        optimizer_class = getattr(importlib.import_module(module_name), class_name)
+        squad_optimizer = _worker_optimizers[key] = optimizer_class(db_path, epsilon=epsilon, num_weeks=num_weeks)
+    else:
+        squad_optimizer.refresh()
+    return squad_optimizer.solve()
+
+
+def search_transfers(db_path: str, team_json: Dict, num_weeks: int) -> Dict:
+    """Worker: find the best single transfers for a team.
+    
+    Returns:
+        FPLTransferOptimizer.find_best_transfer results
+    """
+    from .transfers import FPLTransferOptimizer
+    
+    key = (FPLTransferOptimizer, db_path)
+    optimizer = _worker_optimizers.get(key)
+    if optimizer is None:
+        optimizer = _worker_optimizers[key] = FPLTransferOptimizer(db_path)
+    return optimizer.find_best_transfer(team_json, num_weeks=num_weeks)
+
+
+class FPLJobQueue:
+    """Process-pool job queue with request deduplication and a result cache."""
+    
+    def __init__(self, max_workers: int = 2, max_results: int = 32):
+        """
+        Initialize the job queue. Worker processes start on the first submit.
+        
+        Args:
+            max_workers: Number of worker processes (default: 2)
+            max_results: Number of finished results kept in the cache (default: 32)
+        """
+        self.max_workers = max_workers
+        self.max_results = max_results
+        self._executor = None
+        self._lock = threading.Lock()
+        self._futures = {}  # job_id -> Future of a running job
+        self._results = OrderedDict()  # job_id -> result, least recently used first
+        self._errors = {}  # job_id -> error message of a failed job
+    
+    @staticmethod
+    def team_hash(team_json: Dict) -> str:
+        """Stable hash of a team's players, independent of their order and starter flags."""
+        return squad_hash(team_json)
+    
+    @staticmethod
+    def make_job_id(kind: str, **params) -> str:
+        """Job id for a request: identical kind and parameters give the same id."""
+        payload = json.dumps([kind, params], sort_keys=True, default=str)
+        return f"{kind}-{hashlib.sha1(payload.encode()).hexdigest()[:16]}"
+    
+    def submit(self, job_id: str, func, *args) -> str:
+        """Run func(*args) in the pool under job_id, unless that job is already running or cached.
+        
+        Args:
+            job_id: Id from make_job_id
+            func: Picklable module-level function (e.g. optimize_squad)
+            *args: Picklable arguments for func
+        
+        Returns:
+            The job id
+        """
+        with self._lock:
+            if job_id in self._results:
+                self._results.move_to_end(job_id)
+                return job_id
+            if job_id in self._futures:
+                return job_id
+            self._errors.pop(job_id, None)  # Retry failed jobs
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self._executor.submit(func, *args)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda done: self._finish(job_id, done))
+        return job_id
+    
+    def _finish(self, job_id: str, future) -> None:
+        """Move a finished job into the result cache or the error table."""
+        with self._lock:
+            if self._futures.get(job_id) is not future:
+                return
+            del self._futures[job_id]
+            error = future.exception()
+            if error is not None:
+                self._errors[job_id] = f"{type(error).__name__}: {error}"
+                if isinstance(error, BrokenProcessPool):
+                    self._executor = None  # A worker died; start a fresh pool on the next submit
+                return
+            self._results[job_id] = future.result()
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+    
+    def status(self, job_id: str) -> str:
+        """State of a job: JOB_RUNNING, JOB_DONE, JOB_FAILED or JOB_UNKNOWN."""
+        with self._lock:
+            if job_id in self._results:
+                return JOB_DONE
+            if job_id in self._futures:
+                return JOB_RUNNING
+            if job_id in self._errors:
+                return JOB_FAILED
+            return JOB_UNKNOWN
+    
+    def result(self, job_id: str):
+        """Result of a finished job.
+        
+        Raises:
+            RuntimeError: If the job failed, is still running or is unknown
+        """
+        with self._lock:
+            if job_id in self._results:
+                self._results.move_to_end(job_id)
+                return self._results[job_id]
+            if job_id in self._errors:
+                raise RuntimeError(f"Job {job_id} failed: {self._errors[job_id]}")
+        raise RuntimeError(f"Job {job_id} has no result yet (status: {self.status(job_id)})")
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes, waiting for running jobs."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,105 @@
+"""
+Memoization of squad-level results.
+
+Results that depend only on a squad and the prediction data (team points,
+transfer searches, formatted output) are cached in small LRU caches keyed by
+a canonical squad hash plus the data generation, so showing or optimizing the
+same squad again is near-instant. Each cache counts hits and misses;
+memo_stats() reports all of them.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Union
+
+import pandas as pd
+
+# Every SquadMemo by name, for memo_stats()
+_MEMOS = {}
+
+
+def squad_hash(team: Union[Dict, pd.DataFrame]) -> str:
+    """Canonical hash of a squad, independent of player order.
+    
+    Team JSON is hashed on player id, name and team (what a transfer search
+    reads). A DataFrame is hashed on id plus its is_starter and
+    predicted_points columns when present, so two frames with the same
+    players but different lineups or points do not collide.
+    """
+    if isinstance(team, pd.DataFrame):
+        columns = [column for column in ('id', 'is_starter', 'predicted_points') if column in team]
+        players = sorted(zip(*(team[column].tolist() for column in columns)))
+        payload = [columns, players]
+    else:
+        payload = sorted(
+            (player['id'], player.get('name'), player.get('team'))
+            for position_data in team.get('team', [])
+            for player in position_data['players']
+        )
+    return hashlib.sha1(json.dumps(payload, default=float).encode()).hexdigest()
+
+
+def memo_key(*parts) -> str:
+    """Compact key for a result from its identifying parts (kind, db path, squad hash, generation, ...)."""
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class SquadMemo:
+    """Thread-safe LRU cache with hit/miss counters."""
+    
+    def __init__(self, name: str, maxsize: int = 128):
+        """
+        Initialize the cache and register it for memo_stats().
+        
+        Args:
+            name: Name reported by memo_stats()
+            maxsize: Number of entries kept (least recently used are evicted first)
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        _MEMOS[name] = self
+    
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        """Cached value for key, computing and storing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self) -> Dict:
+        """Hits, misses, hit rate and size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+
+def memo_stats() -> Dict[str, Dict]:
+    """Stats of every squad-level cache, by name."""
+    return {name: memo.stats() for name, memo in _MEMOS.items()}
@@ -9,12 +9,13 @@ import pickle
 from io import StringIO
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error
-from scipy.optimize import minimize
 
 from .database import FPLDatabase
+from .features import FEATURE_VERSION, build_features
 
 
 class VariancePenalizedRegression:
@@ -34,6 +35,11 @@ class VariancePenalizedRegression:
     def fit(self, X, y, local_variance):
         """Fit model with variance penalty.
         
+        The loss is quadratic in the parameters, so the minimizer is found exactly
+        from the weighted normal equations:
+            
+            Zᵀ(I + λ·diag(Var_local))Z · θ = Zᵀy,   Z = [1, X]
+        
         Args:
             X: Feature matrix (n_samples, n_features)
             y: Target values (n_samples,)
@@ -41,34 +47,47 @@ class VariancePenalizedRegression:
         """
         n_samples, n_features = X.shape
         
-        # Initial parameters (intercept + coefficients)
-        initial_params = np.zeros(n_features + 1)
-        
-        def loss_function(params):
-            """Custom loss with variance penalty."""
-            intercept = params[0]
-            coef = params[1:]
-            
-            # Predictions
-            y_pred = X @ coef + intercept
-            
-            # Standard MSE loss
-            mse_loss = np.mean((y - y_pred) ** 2)
-            
-            # Variance penalty: λ·Var_local·ŷ²
-            variance_penalty = self.lambda_penalty * np.mean(local_variance * (y_pred ** 2))
-            
-            return mse_loss + variance_penalty
+        # Design matrix with intercept column
+        Z = np.empty((n_samples, n_features + 1))
+        Z[:, 0] = 1.0
+        Z[:, 1:] = X
         
-        # Minimize the loss
-        result = minimize(loss_function, initial_params, method='L-BFGS-B')
+        # Variance penalty: λ·Var_local·ŷ² acts as extra weight on ŷ²
+        weights = 1.0 + self.lambda_penalty * np.asarray(local_variance, dtype=float)
+        A = Z.T @ (Z * weights[:, None])
+        b = Z.T @ y
+        params = np.linalg.lstsq(A, b, rcond=None)[0]
         
         # Store parameters
-        self.intercept_ = result.x[0]
-        self.coef_ = result.x[1:]
+        self.intercept_ = params[0]
+        self.coef_ = params[1:]
         
         return self
     
+    @staticmethod
+    def local_variance(X_scaled, y):
+        """Variance of the target among each sample's nearest neighbours, scaled to [0, 1].
+        
+        Args:
+            X_scaled: Standardized feature matrix (n_samples, n_features)
+            y: Target values (n_samples,)
+        """
+        # Use rolling window approach: for each point, calculate variance of nearby points
+        window_size = min(5, len(y) // 2)  # Use 5 samples or half the data, whichever is smaller
+        
+        # Pairwise squared distances in feature space; each row's nearest samples
+        distances = np.sum((X_scaled[:, None, :] - X_scaled[None, :, :]) ** 2, axis=2)
+        nearest_indices = np.argsort(distances, axis=1)[:, :window_size]
+        
+        # Calculate variance of target values for nearby samples
+        local_variance = np.var(y[nearest_indices], axis=1)
+        
+        # Normalize local variance to [0, 1] range for stability
+        if np.max(local_variance) > 0:
+            local_variance = local_variance / np.max(local_variance)
+        
+        return local_variance
+    
     def predict(self, X):
         """Predict using fitted model."""
         return X @ self.coef_ + self.intercept_
@@ -334,23 +353,32 @@ class PointsPredictor:
     Final prediction = weighted blend of both levels (if both available)
     """
     
-    def __init__(self, db: FPLDatabase, model_path: str = "models/player_points_predictors.pkl", 
-                 player_weight: float = 0.75):
+    def __init__(self, db: FPLDatabase, model_path: Optional[str] = "models/player_points_predictors.pkl", 
+                 player_weight: float = 0.75, lambda_penalty: float = 1.0, min_samples: int = 5):
         self.db = db
-        self.model_path = Path(model_path)
+        # model_path=None keeps models in memory only: nothing is loaded or saved (backtests)
+        self.model_path = Path(model_path) if model_path is not None else None
         self.models = {}  # Player-specific models
         self.position_models = {}  # Position-level models (fallback)
         self.player_weight = player_weight  # Weight for player model (0.75 means 75% player, 25% position)
+        self.lambda_penalty = lambda_penalty  # Variance penalty strength for player models
+        self.min_samples = min_samples  # Minimum matches before a player gets their own model
         self._load_models()
     
     def _load_models(self):
-        """Load existing models if they exist."""
-        if self.model_path.exists():
+        """Load existing models if they exist and match the current feature version."""
+        if self.model_path is not None and self.model_path.exists():
             with open(self.model_path, 'rb') as f:
                 saved_data = pickle.load(f)
                 
                 # Handle new format (dict with 'players' and 'positions')
                 if isinstance(saved_data, dict) and 'players' in saved_data:
+                    # Files saved before versioning used the version 1 feature layout
+                    feature_version = saved_data.get('feature_version', 1)
+                    if feature_version != FEATURE_VERSION:
+                        print(f"  ⚠ Ignoring {self.model_path}: trained with feature version "
+                              f"{feature_version}, expected {FEATURE_VERSION}")
+                        return
                     self.models = saved_data.get('players', {})
                     self.position_models = saved_data.get('positions', {})
                 else:
@@ -358,80 +386,78 @@ class PointsPredictor:
                     self.models = saved_data
                     self.position_models = {}
     
-    def load_training_data(self):
-        """Load player match context data grouped by player and position with differential features."""
+    def load_training_data(self, max_gw: int = None):
+        """Load player match context data grouped by player and position with differential features.
+        
+        Args:
+            max_gw: Only use matches up to and including this gameweek (default: all)
+        """
+        query = """
+            SELECT pmc.element, pmc.name, pmc.team_attack_value, pmc.team_defense_value,
+                   pmc.opponent_attack_value, pmc.opponent_defense_value, pmc.was_home, 
+                   pmc.total_points, e.element_type_name
+            FROM player_match_context pmc
+            JOIN elements e ON pmc.element = e.id
+            WHERE pmc.team_attack_value IS NOT NULL AND pmc.team_defense_value IS NOT NULL
+              AND pmc.opponent_attack_value IS NOT NULL AND pmc.opponent_defense_value IS NOT NULL
+              AND pmc.was_home IS NOT NULL AND pmc.total_points IS NOT NULL
+              AND e.element_type_name IS NOT NULL
+        """
+        params = ()
+        if max_gw is not None:
+            query += " AND pmc.gw <= ?"
+            params = (max_gw,)
+        
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT pmc.element, pmc.name, pmc.team_attack_value, pmc.team_defense_value,
-                       pmc.opponent_attack_value, pmc.opponent_defense_value, pmc.was_home, 
-                       pmc.total_points, e.element_type_name
-                FROM player_match_context pmc
-                JOIN elements e ON pmc.element = e.id
-                WHERE pmc.team_attack_value IS NOT NULL AND pmc.team_defense_value IS NOT NULL
-                  AND pmc.opponent_attack_value IS NOT NULL AND pmc.opponent_defense_value IS NOT NULL
-                  AND pmc.was_home IS NOT NULL AND pmc.total_points IS NOT NULL
-                  AND e.element_type_name IS NOT NULL
-            """)
+            cursor.execute(query, params)
             data = cursor.fetchall()
         
         if not data:
             raise ValueError("No training data found")
         
-        # Group by player and position with differential features
+        elements, names, team_attack, team_defense, opp_attack, opp_defense, was_home, total_points, positions = zip(*data)
+        
+        # Differential features for every row in one pass
+        X = build_features(team_attack, team_defense, opp_attack, opp_defense, was_home)
+        y = np.asarray(total_points, dtype=float)
+        elements = np.asarray(elements)
+        positions = np.asarray(positions)
+        
+        # Group by player (stable sort keeps each player's rows in query order)
         player_data = {}
-        position_data = {}
+        order = np.argsort(elements, kind='stable')
+        unique_elements, starts = np.unique(elements[order], return_index=True)
+        for element, rows in zip(unique_elements, np.split(order, starts[1:])):
+            first = rows[0]
+            player_data[element.item()] = {
+                'name': names[first],
+                'position': str(positions[first]),  # element_type_name (FWD, MID, DEF, GK)
+                'X': X[rows],
+                'y': y[rows],
+                # Standard deviation (variance measure) of player's points
+                'std': np.std(y[rows])
+            }
         
-        for row in data:
-            element = row[0]
-            team_attack = row[2]
-            team_defense = row[3]
-            opp_attack = row[4]
-            opp_defense = row[5]
-            was_home = row[6]
-            total_points = row[7]
-            position = row[8]  # element_type_name (FWD, MID, DEF, GK)
-            
-            # Calculate differential features
-            attack_advantage = team_attack - opp_defense  # Our attack vs their defense
-            defense_advantage = team_defense - opp_attack  # Our defense vs their attack
-            
-            # Group by player
-            if element not in player_data:
-                player_data[element] = {'name': row[1], 'position': position, 'X': [], 'y': []}
-            
-            # Features: [attack_advantage, defense_advantage, was_home]
-            player_data[element]['X'].append([attack_advantage, defense_advantage, was_home])
-            player_data[element]['y'].append(total_points)
-            
-            # Group by position for position-level models
-            if position not in position_data:
-                position_data[position] = {'X': [], 'y': []}
-            position_data[position]['X'].append([attack_advantage, defense_advantage, was_home])
-            position_data[position]['y'].append(total_points)
-        
-        # Convert to numpy arrays and calculate variance
-        for element in player_data:
-            player_data[element]['X'] = np.array(player_data[element]['X'])
-            player_data[element]['y'] = np.array(player_data[element]['y'])
-            # Calculate standard deviation (variance measure) of player's points
-            player_data[element]['std'] = np.std(player_data[element]['y'])
-        
-        for position in position_data:
-            position_data[position]['X'] = np.array(position_data[position]['X'])
-            position_data[position]['y'] = np.array(position_data[position]['y'])
+        # Group by position for position-level models
+        position_data = {}
+        for position in np.unique(positions):
+            rows = np.flatnonzero(positions == position)
+            position_data[str(position)] = {'X': X[rows], 'y': y[rows]}
         
         return player_data, position_data
     
-    def train_model(self, X, y, min_samples=5, use_variance_penalty=True):
+    def train_model(self, X, y, min_samples=None, use_variance_penalty=True):
         """Train regression model with optional variance penalty for a player.
         
         Args:
             X: Feature matrix
             y: Target values (points)
-            min_samples: Minimum samples required
+            min_samples: Minimum samples required (default: self.min_samples)
             use_variance_penalty: If True, use variance-penalized regression
         """
+        if min_samples is None:
+            min_samples = self.min_samples
         if len(X) < min_samples:
             return None
         
@@ -440,25 +466,10 @@ class PointsPredictor:
         X_scaled = scaler.fit_transform(X)
         
         if use_variance_penalty:
-            # Calculate local variance for each sample
-            # Use rolling window approach: for each point, calculate variance of nearby points
-            local_variance = np.zeros(len(y))
-            window_size = min(5, len(y) // 2)  # Use 5 samples or half the data, whichever is smaller
-            
-            for i in range(len(y)):
-                # Get indices of nearby samples (sorted by distance in feature space)
-                distances = np.sum((X_scaled - X_scaled[i]) ** 2, axis=1)
-                nearest_indices = np.argsort(distances)[:window_size]
-                
-                # Calculate variance of target values for nearby samples
-                local_variance[i] = np.var(y[nearest_indices])
-            
-            # Normalize local variance to [0, 1] range for stability
-            if np.max(local_variance) > 0:
-                local_variance = local_variance / np.max(local_variance)
+            local_variance = VariancePenalizedRegression.local_variance(X_scaled, y)
             
             # Train variance-penalized model
-            model = VariancePenalizedRegression(lambda_penalty=1.0)
+            model = VariancePenalizedRegression(lambda_penalty=self.lambda_penalty)
             model.fit(X_scaled, y, local_variance)
         else:
             # Standard linear regression
@@ -547,13 +558,18 @@ class PointsPredictor:
             }
             player_trained += 1
         
-        # Save both models
-        self.model_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.model_path, 'wb') as f:
-            pickle.dump({'players': self.models, 'positions': self.position_models}, f)
-        
         print(f"  ✓ Trained {player_trained} player models (skipped {player_skipped})")
-        print(f"  ✓ Saved to {self.model_path}")
+        
+        # Save both models (in-memory predictors are never persisted)
+        if self.model_path is not None:
+            self.model_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.model_path, 'wb') as f:
+                pickle.dump({
+                    'players': self.models,
+                    'positions': self.position_models,
+                    'feature_version': FEATURE_VERSION
+                }, f)
+            print(f"  ✓ Saved to {self.model_path}")
         return {
             'position_models': position_trained,
             'player_models': player_trained,
@@ -573,9 +589,7 @@ class PointsPredictor:
         not applied post-prediction.
         """
         # Calculate differential features (same as training)
-        attack_advantage = team_attack - opp_defense
-        defense_advantage = team_defense - opp_attack
-        features = np.array([[attack_advantage, defense_advantage, is_home]])
+        features = build_features(team_attack, team_defense, opp_attack, opp_defense, is_home)
         
         # Get player's position from database
         position = None
@@ -619,6 +633,31 @@ class PointsPredictor:
             return 0.0
 
 
+def blend_predictions(player_prediction, position_prediction, player_weight: float) -> np.ndarray:
+    """Vectorized form of the PointsPredictor.predict blending rule.
+    
+    Args:
+        player_prediction: Player-model predictions (NaN where no player model)
+        position_prediction: Position-model predictions (NaN where no position model)
+        player_weight: Weight of the player model when both are available
+    
+    Returns:
+        Blended predictions clipped to [0, 15]; 0 where neither model is available
+    """
+    player_prediction = np.asarray(player_prediction, dtype=float)
+    position_prediction = np.asarray(position_prediction, dtype=float)
+    has_player = ~np.isnan(player_prediction)
+    has_position = ~np.isnan(position_prediction)
+    
+    blended = np.where(
+        has_player & has_position,
+        player_weight * player_prediction + (1 - player_weight) * position_prediction,
+        np.where(has_player, player_prediction, position_prediction)
+    )
+    blended = np.where(has_player | has_position, blended, 0.0)
+    return np.clip(blended, 0, 15)
+
+
 class FinalPredictionsGenerator:
     """Generate predictions for all players in all remaining fixtures."""
     
@@ -751,6 +790,7 @@ class FinalPredictionsGenerator:
                     opponent_attack, opponent_defense, predicted_points
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, predictions)
+            self.db.bump_data_generation(conn)
             conn.commit()
         
         print(f"  ✓ Generated {len(predictions)} predictions")
@@ -829,10 +869,16 @@ class FPLDataPipeline:
         print(f"\n{'='*60}")
         print("STEP 6: Populating player_summary table")
         print(f"{'='*60}")
+        # The summary write bumps the data generation, so the leaderboard is
+        # built in the same transaction to be tagged with the final generation
         self.db.create_player_summary_table()
-        count = self.db.populate_player_summary(num_weeks=3)
-        self.results['player_summary'] = {'players': count, 'num_weeks': 3}
+        with self.db.get_connection() as conn:
+            count = self.db.populate_player_summary(num_weeks=3, conn=conn)
+            leaderboard_rows = self.db.populate_leaderboard(conn)
+            conn.commit()
+        self.results['player_summary'] = {'players': count, 'num_weeks': 3, 'leaderboard_rows': leaderboard_rows}
         print(f"✓ Populated player_summary with {count} players (3 weeks)")
+        print(f"✓ Materialized {leaderboard_rows} leaderboard rows")
         
         # Summary
         end_time = datetime.now()
@@ -0,0 +1,341 @@
+"""
+Multi-gameweek transfer planning using Integer Linear Programming (ILP).
+
+The planner decides which transfers to make in each of the next H gameweeks,
+using the per-gameweek predictions in final_predictions. Every gameweek has its
+own squad and starting XI variables, linked by buy/sell decisions, with:
+
+- Free transfers: one per gameweek, unused ones bank up to MAX_FREE_TRANSFERS
+- Hits: every transfer beyond the free ones costs HIT_COST points
+- Budget: money in the bank carries over between gameweeks (sells add, buys subtract)
+
+Solving all H gameweeks at once gets slow as H grows, so a rolling-horizon mode
+solves a short look-ahead window, commits only its first gameweek and moves on.
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from ortools.linear_solver import pywraplp
+from typing import Dict, List
+from .database import FPLDatabase
+from .validation import (
+    FPLValidator, POSITIONS, SQUAD_SIZE, SQUAD_REQUIREMENTS, MAX_PER_TEAM, BUDGET_TENTHS, STARTING_SIZE,
+    STARTING_LIMITS
+)
+
+HIT_COST = 4.0
+MAX_FREE_TRANSFERS = 5
+
+
+class FPLTransferPlanner:
+    """Multi-period ILP planner for transfers over several gameweeks."""
+    
+    def __init__(self, db_path: str, epsilon: float = 0.001):
+        """
+        Initialize the planner.
+        
+        Args:
+            db_path: Path to the SQLite database
+            epsilon: Weight for bench cost penalty (should be small)
+        """
+        self.db = FPLDatabase(db_path)
+        self.validator = FPLValidator()
+        self.epsilon = epsilon
+        self.players_df = None
+        self.gameweeks = []
+        self.points = None
+    
+    def load_predictions(self, horizon: int):
+        """Load candidate players and their (n_players, horizon) points matrix."""
+        self.players_df = self.db.load_player_data(num_weeks=horizon).reset_index(drop=True)
+        
+        weekly = self.db.load_gameweek_predictions(num_weeks=horizon)
+        self.gameweeks = sorted(weekly['gameweek'].unique().tolist())
+        if not self.gameweeks:
+            raise ValueError("No upcoming gameweek predictions found in final_predictions")
+        
+        # Pivot to a dense matrix aligned with players_df (missing fixtures score 0)
+        rows = pd.Index(self.players_df['id']).get_indexer(weekly['player_id'])
+        cols = np.searchsorted(self.gameweeks, weekly['gameweek'])
+        valid = rows >= 0
+        self.points = np.zeros((len(self.players_df), len(self.gameweeks)))
+        np.add.at(self.points, (rows[valid], cols[valid]), weekly['predicted_points'].to_numpy()[valid])
+        
+        self._index_players()
+        
+        print(f"Loaded {len(self.players_df)} players with predictions for GW {self.gameweeks}")
+    
+    def _index_players(self):
+        """Precompute costs (integer tenths of £1m) and the position/team index groups for players_df."""
+        self.costs = self.players_df['cost'].to_numpy(dtype=np.int64)
+        self.prices = self.costs / 10.0
+        positions = self.players_df['position'].to_numpy()
+        self.position_groups = [np.flatnonzero(positions == pos) for pos in POSITIONS]
+        team_codes = pd.factorize(self.players_df['team'])[0]
+        self.team_groups = [np.flatnonzero(team_codes == code) for code in range(team_codes.max() + 1)]
+    
+    def restrict_candidates(self, held: np.ndarray, per_position: int) -> np.ndarray:
+        """Keep the current squad plus the best players of each position.
+        
+        Per position, the union of the top per_position players by horizon points
+        and by horizon points per £m is kept. This is a heuristic: plans that
+        need a player outside the pool are not considered, in exchange for a
+        much smaller ILP.
+        
+        Returns:
+            The held mask re-indexed to the restricted players
+        """
+        total = self.points.sum(axis=1)
+        value = total / np.maximum(self.prices, 0.1)
+        keep = held.copy()
+        for group in self.position_groups:
+            for score in (total, value):
+                keep[group[np.argsort(-score[group], kind='stable')[:per_position]]] = True
+        
+        self.players_df = self.players_df[keep].reset_index(drop=True)
+        self.points = self.points[keep]
+        self._index_players()
+        print(f"Restricted to {int(keep.sum())} candidate players")
+        return held[keep]
+    
+    def _solve_window(self, held: np.ndarray, free_transfers: int, bank: int,
+                      points: np.ndarray, time_limit: float = None) -> List[Dict]:
+        """Solve the planning ILP over the gameweeks in points (columns).
+        
+        Args:
+            held: Boolean mask of players in the squad before the first gameweek
+            free_transfers: Free transfers available in the first gameweek
+            bank: Money in the bank before the first gameweek, in tenths of £1m
+            points: Predicted points, shape (n_players, n_weeks)
+            time_limit: Optional solver time limit in seconds
+        
+        Returns:
+            One dict per gameweek with squad/start/buy/sell masks and counters
+            (bank in tenths of £1m)
+        """
+        n_players, n_weeks = points.shape
+        
+        solver = pywraplp.Solver.CreateSolver('SCIP')
+        if not solver:
+            raise RuntimeError("Could not create solver")
+        if time_limit:
+            solver.SetTimeLimit(int(time_limit * 1000))
+        infinity = solver.infinity()
+        objective = solver.Objective()
+        
+        def add_group(variables, indices, lower, upper):
+            constraint = solver.Constraint(lower, upper)
+            for i in indices:
+                constraint.SetCoefficient(variables[i], 1.0)
+            return constraint
+        
+        weeks = []
+        previous_squad = None
+        previous_bank = None
+        previous_free = None
+        previous_buys = None
+        previous_paid = None
+        for t in range(n_weeks):
+            squad = [solver.IntVar(0, 1, f'squad_{i}_{t}') for i in range(n_players)]
+            start = [solver.IntVar(0, 1, f'start_{i}_{t}') for i in range(n_players)]
+            buy = [solver.IntVar(0, 1, f'buy_{i}_{t}') for i in range(n_players)]
+            sell = [solver.IntVar(0, 1, f'sell_{i}_{t}') for i in range(n_players)]
+            paid = solver.IntVar(0, SQUAD_SIZE, f'paid_{t}')  # Transfers beyond the free ones
+            free = solver.IntVar(1, MAX_FREE_TRANSFERS, f'free_{t}')  # Free transfers available
+            bank_var = solver.IntVar(0, infinity, f'bank_{t}')  # Tenths of £1m
+            
+            # Objective: starting XI points, small bench cost penalty, hits
+            week_points = points[:, t]
+            bench_penalty = -self.epsilon * self.prices
+            for i in range(n_players):
+                objective.SetCoefficient(start[i], week_points[i])
+                objective.SetCoefficient(squad[i], bench_penalty[i])
+            objective.SetCoefficient(paid, -HIT_COST)
+            
+            # Squad flow: squad_t = squad_{t-1} + buy_t - sell_t, never buying and selling the same player
+            for i in range(n_players):
+                if previous_squad is None:
+                    flow = solver.Constraint(float(held[i]), float(held[i]))
+                else:
+                    flow = solver.Constraint(0, 0)
+                    flow.SetCoefficient(previous_squad[i], -1)
+                flow.SetCoefficient(squad[i], 1)
+                flow.SetCoefficient(buy[i], -1)
+                flow.SetCoefficient(sell[i], 1)
+                churn = solver.Constraint(-infinity, 1)
+                churn.SetCoefficient(buy[i], 1)
+                churn.SetCoefficient(sell[i], 1)
+            
+            # Bank carry-over: bank_t = bank_{t-1} + sells - buys (never negative)
+            if previous_bank is None:
+                money = solver.Constraint(bank, bank)
+            else:
+                money = solver.Constraint(0, 0)
+                money.SetCoefficient(previous_bank, -1)
+            money.SetCoefficient(bank_var, 1)
+            for i in range(n_players):
+                money.SetCoefficient(sell[i], -int(self.costs[i]))
+                money.SetCoefficient(buy[i], int(self.costs[i]))
+            
+            # Free transfers: buys - paid <= free_t, and only actual buys can be paid for
+            transfers = add_group(buy, range(n_players), -infinity, 0)
+            transfers.SetCoefficient(paid, -1)
+            transfers.SetCoefficient(free, -1)
+            hits = add_group(buy, range(n_players), 0, infinity)
+            hits.SetCoefficient(paid, -1)
+            
+            # Banking: free_t = min(MAX_FREE_TRANSFERS, carry) with carry = free_{t-1} - (buys_{t-1} - paid_{t-1}) + 1.
+            # The carry is at most MAX_FREE_TRANSFERS + 1, so free_t = carry - capped_t, where the binary
+            # capped_t can only be 1 when the carry reaches MAX_FREE_TRANSFERS + 1 (and must be, by free's bound)
+            if previous_free is None:
+                free.SetBounds(free_transfers, free_transfers)
+            else:
+                capped = solver.IntVar(0, 1, f'capped_{t}')
+                banking = add_group(previous_buys, range(n_players), 1, 1)
+                banking.SetCoefficient(free, 1)
+                banking.SetCoefficient(previous_free, -1)
+                banking.SetCoefficient(previous_paid, -1)
+                banking.SetCoefficient(capped, 1)
+                cap = add_group(previous_buys, range(n_players), -infinity, 1)
+                cap.SetCoefficient(previous_free, -1)
+                cap.SetCoefficient(previous_paid, -1)
+                cap.SetCoefficient(capped, MAX_FREE_TRANSFERS + 1)
+            
+            # Lineup and squad structure for this gameweek
+            for i in range(n_players):
+                link = solver.Constraint(-infinity, 0)
+                link.SetCoefficient(start[i], 1)
+                link.SetCoefficient(squad[i], -1)
+            add_group(start, range(n_players), STARTING_SIZE, STARTING_SIZE)
+            for code, pos in enumerate(POSITIONS):
+                group = self.position_groups[code]
+                add_group(squad, group, SQUAD_REQUIREMENTS[pos], SQUAD_REQUIREMENTS[pos])
+                add_group(start, group, *STARTING_LIMITS[pos])
+            for group in self.team_groups:
+                add_group(squad, group, -infinity, MAX_PER_TEAM)
+            
+            weeks.append({'squad': squad, 'start': start, 'buy': buy, 'sell': sell,
+                          'paid': paid, 'free': free, 'bank': bank_var})
+            previous_squad, previous_bank, previous_free = squad, bank_var, free
+            previous_buys, previous_paid = buy, paid
+        
+        objective.SetMaximization()
+        
+        status = solver.Solve()
+        if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            if status == pywraplp.Solver.INFEASIBLE:
+                raise RuntimeError("Problem is infeasible - no valid plan exists")
+            else:
+                raise RuntimeError(f"Solver failed with status: {status}")
+        
+        def mask(variables):
+            return np.array([var.solution_value() > 0.5 for var in variables])
+        
+        return [{
+            'squad': mask(week['squad']),
+            'start': mask(week['start']),
+            'buy': mask(week['buy']),
+            'sell': mask(week['sell']),
+            'hits': int(round(week['paid'].solution_value())),
+            'free_transfers': int(round(week['free'].solution_value())),
+            'bank': int(round(week['bank'].solution_value()))
+        } for week in weeks]
+    
+    def _player_records(self, indices: np.ndarray, t: int) -> List[Dict]:
+        """Player dicts (same fields as transfer suggestions) for one gameweek, in position order."""
+        position_rank = self.players_df['position'].iloc[indices].map(POSITIONS.index).to_numpy()
+        indices = indices[np.argsort(position_rank, kind='stable')]
+        players = self.players_df.iloc[indices]
+        return [{
+            'id': player_id,
+            'name': name,
+            'position': position,
+            'team': team,
+            'price': price,
+            'predicted_points': points
+        } for player_id, name, position, team, price, points in zip(
+            players['id'].tolist(), players['name'].tolist(), players['position'].tolist(),
+            players['team'].tolist(), players['price'].tolist(), self.points[indices, t].tolist()
+        )]
+    
+    def plan(self, current_team_json: Dict, horizon: int = 4, free_transfers: int = 1,
+             bank: int = None, window: int = None, candidates_per_position: int = None,
+             time_limit: float = None) -> Dict:
+        """Plan transfers for the next gameweeks.
+        
+        Args:
+            current_team_json: Current team structure
+            horizon: Number of upcoming gameweeks to plan (default: 4)
+            free_transfers: Free transfers available for the first gameweek (default: 1)
+            bank: Money in the bank in tenths of £1m (default: budget minus current squad cost)
+            window: Rolling-horizon look-ahead in gameweeks; None solves the whole
+                horizon as one ILP
+            candidates_per_position: Restrict the ILP to the current squad plus
+                this many top players per position (default: all players)
+            time_limit: Optional time limit in seconds for each ILP solve
+        
+        Returns:
+            Dict with per-gameweek plans and totals
+        """
+        if not 1 <= free_transfers <= MAX_FREE_TRANSFERS:
+            raise ValueError(f"free_transfers must be between 1 and {MAX_FREE_TRANSFERS}")
+        
+        self.load_predictions(horizon)
+        horizon = len(self.gameweeks)
+        
+        current_team = self.validator.parse_current_team(current_team_json, self.players_df)
+        if not self.validator.validate_team_constraints(current_team):
+            raise ValueError("Current team violates FPL constraints")
+        held = self.players_df['id'].isin(current_team['id']).to_numpy()
+        if bank is None:
+            bank = BUDGET_TENTHS - int(current_team['cost'].sum())
+        if candidates_per_position is not None:
+            held = self.restrict_candidates(held, candidates_per_position)
+        
+        solve_start = time.perf_counter()
+        if window is None or window >= horizon:
+            mode = 'full'
+            decisions = self._solve_window(held, free_transfers, bank, self.points, time_limit)
+        else:
+            # Rolling horizon: plan window gameweeks ahead, keep only the first
+            mode = f'rolling (window={window})'
+            decisions = []
+            state = (held, free_transfers, bank)
+            for t in range(horizon):
+                week = self._solve_window(*state, self.points[:, t:t + window], time_limit)[0]
+                decisions.append(week)
+                banked = week['free_transfers'] - (int(week['buy'].sum()) - week['hits'])
+                state = (week['squad'], min(MAX_FREE_TRANSFERS, banked + 1), week['bank'])
+                print(f"  Planned GW {self.gameweeks[t]} ({t + 1}/{horizon})")
+        solve_time = time.perf_counter() - solve_start
+        
+        weeks = []
+        for t, week in enumerate(decisions):
+            starters = np.flatnonzero(week['start'])
+            squad = np.flatnonzero(week['squad'])
+            week_points = float(self.points[starters, t].sum())
+            weeks.append({
+                'gameweek': self.gameweeks[t],
+                'transfers_out': self._player_records(np.flatnonzero(week['sell']), t),
+                'transfers_in': self._player_records(np.flatnonzero(week['buy']), t),
+                'free_transfers': week['free_transfers'],
+                'hits': week['hits'],
+                'hit_cost': week['hits'] * HIT_COST,
+                'bank': week['bank'] / 10,
+                'squad_ids': self.players_df['id'].iloc[squad].tolist(),
+                'starting_ids': self.players_df['id'].iloc[starters].tolist(),
+                'predicted_points': week_points
+            })
+        
+        total_points = sum(week['predicted_points'] for week in weeks)
+        total_hit_cost = sum(week['hit_cost'] for week in weeks)
+        return {
+            'gameweeks': self.gameweeks,
+            'weeks': weeks,
+            'total_predicted_points': total_points,
+            'total_hit_cost': total_hit_cost,
+            'net_points': total_points - total_hit_cost,
+            'mode': mode,
+            'solve_time': solve_time
+        }
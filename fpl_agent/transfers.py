@@ -2,14 +2,79 @@
 Transfer optimization for suggesting best player transfers.
 """
 
+import copy
+import heapq
+import itertools
+import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Dict, List
 from .database import FPLDatabase
-from .validation import FPLValidator
+from .validation import FPLValidator, BUDGET_TENTHS, MAX_PER_TEAM
+from .memo import SquadMemo, memo_key, squad_hash
+
+# Transfer search results by squad, data generation and search parameters
+_TRANSFER_MEMO = SquadMemo('transfer_search', maxsize=128)
+
+
+class CandidatePool:
+    """Transfer targets for one prediction window, loaded once per data generation.
+    
+    Rows follow player id order. Each position keeps its rows sorted by
+    predicted points (best first) and by cost (cheapest first), so a
+    transfer search only has to mask out the current squad. Costs are
+    integer tenths of £1m, so budget checks are exact.
+    """
+    
+    def __init__(self, players: pd.DataFrame, num_weeks: int, generation: int):
+        """
+        Build the pool.
+        
+        Args:
+            players: Player data as returned by FPLDatabase.load_player_data
+            num_weeks: Number of weeks the predicted points are summed over
+            generation: Data generation the players were loaded at
+        """
+        self.players = players.sort_values('id', kind='stable').reset_index(drop=True)
+        self.num_weeks = num_weeks
+        self.generation = generation
+        
+        self.ids = self.players['id'].to_numpy()
+        self.points = self.players['predicted_points'].to_numpy(dtype=float)
+        self.costs = self.players['cost'].to_numpy(dtype=np.int64)
+        self.clubs = self.players['team'].to_numpy()
+        self.n_clubs = int(self.clubs.max()) + 1 if len(self.clubs) else 0
+        self.row_of = {player_id: row for row, player_id in enumerate(self.ids.tolist())}
+        
+        groups = self.players.groupby('position').indices
+        self.by_points = {position: rows[np.argsort(-self.points[rows], kind='stable')] for position, rows in groups.items()}
+        self.by_cost = {position: rows[np.argsort(self.costs[rows], kind='stable')] for position, rows in groups.items()}
+    
+    def lookup(self, player_ids) -> pd.DataFrame:
+        """Pool rows of the given players (unknown ids are left out)."""
+        rows = [self.row_of[player_id] for player_id in player_ids if player_id in self.row_of]
+        return self.players.iloc[rows]
+    
+    def squad_mask(self, player_ids) -> np.ndarray:
+        """Boolean mask over pool rows marking the given players."""
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[[self.row_of[player_id] for player_id in player_ids if player_id in self.row_of]] = True
+        return mask
+    
+    @staticmethod
+    def first_available(rows: np.ndarray, taken: np.ndarray):
+        """First of the ordered rows that is not taken (None if all are)."""
+        for row in rows.tolist():
+            if not taken[row]:
+                return row
+        return None
 
 
 class FPLTransferOptimizer:
-    """Optimizer for suggesting single player transfers in FPL."""
+    """Optimizer for suggesting single and multiple player transfers in FPL."""
+    
+    # Slot values that force a player into / out of every best XI (see _lineup_terms)
+    FORCE_IN = 1e3
+    FORCE_OUT = -1e6
     
     def __init__(self, db_path: str):
         """
@@ -21,107 +86,400 @@ class FPLTransferOptimizer:
         self.db = FPLDatabase(db_path)
         self.validator = FPLValidator()
         self.players_df = None
-        
+        self._pools = {}  # num_weeks -> CandidatePool
+    
+    def candidate_pool(self, num_weeks: int = 3) -> CandidatePool:
+        """Return the candidate pool for num_weeks, reloading it only when the data changed."""
+        generation = self.db.get_data_generation()
+        pool = self._pools.get(num_weeks)
+        if pool is None or pool.generation != generation:
+            pool = CandidatePool(self.db.load_player_data(num_weeks=num_weeks), num_weeks, generation)
+            self._pools[num_weeks] = pool
+        self.players_df = pool.players
+        return pool
+    
+    def _parse_team(self, current_team_json: Dict, pool: CandidatePool) -> pd.DataFrame:
+        """Parse and validate the current team against the pool rows of its players."""
+        team_ids = [player['id'] for group in current_team_json['team'] for player in group['players']]
+        current_team = self.validator.parse_current_team(current_team_json, pool.lookup(team_ids))
+        if not self.validator.validate_team_constraints(current_team):
+            raise ValueError("Current team violates FPL constraints")
+        return current_team
+    
     def find_best_transfer(self, current_team_json: Dict, num_weeks: int = 3) -> Dict:
         """Find the top 5 best transfers to maximize points.
         
+        Any squad player can be transferred out. Team points are those of the
+        best starting XI, re-picked for every candidate squad, so the gain
+        includes bench promotions and formation changes.
+        
+        Results are memoized per squad and data generation (see memo.py);
+        repeated calls return a copy of the cached result, whose squad_key
+        identifies it for FPLFormatter.
+        
         Args:
             current_team_json: Current team structure
             num_weeks: Number of weeks to consider for predictions (default: 3)
         """
-        # Load all available players first with multi-week predictions
-        self.players_df = self.db.load_player_data(num_weeks=num_weeks)
+        # Shared candidate pool, reloaded only when the data generation changes
+        pool = self.candidate_pool(num_weeks)
+        squad_key = memo_key('transfer', str(self.db.db_path), squad_hash(current_team_json), pool.generation, num_weeks)
+        result = _TRANSFER_MEMO.get_or_compute(
+            squad_key, lambda: self._find_best_transfer(current_team_json, num_weeks, pool, squad_key)
+        )
+        return copy.deepcopy(result)
+    
+    def _find_best_transfer(self, current_team_json: Dict, num_weeks: int, pool: CandidatePool,
+                            squad_key: str) -> Dict:
+        """Uncached find_best_transfer."""
+        current_team = self._parse_team(current_team_json, pool)
         
-        # Parse current team (this now uses the loaded player data)
-        current_team = self.validator.parse_current_team(current_team_json, self.players_df)
+        current_points = self.validator.best_xi_points(current_team['predicted_points'], current_team['position'])
+        current_cost = int(current_team['cost'].sum())  # Tenths of £1m
+        available_budget = BUDGET_TENTHS - current_cost
         
-        # Validate current team
-        if not self.validator.validate_team_constraints(current_team):
-            raise ValueError("Current team violates FPL constraints")
+        print(f"Current team points (best XI, next {num_weeks} weeks): {current_points:.2f}")
+        print(f"Current cost: £{current_cost / 10:.1f}m")
+        print(f"Available budget: £{available_budget / 10:.1f}m")
         
-        current_points = self.validator.calculate_team_points(current_team)
-        current_cost = current_team['price'].sum()
-        available_budget = 100.0 - current_cost
+        # Score all single swaps and keep the top 5 by points gain
+        top_5_transfers = self._rank_single_transfers(current_team, current_points, available_budget, pool, top_k=5)
+        for transfer in top_5_transfers:
+            transfer['new_total_points'] = current_points + transfer['points_gain']
+            transfer['new_total_cost'] = current_cost / 10 + transfer['cost_change']
         
-        print(f"Current team points (next {num_weeks} weeks): {current_points:.2f}")
-        print(f"Current cost: £{current_cost:.1f}m")
-        print(f"Available budget: £{available_budget:.1f}m")
+        return {
+            'current_team_points': current_points,
+            'current_team_cost': current_cost / 10,
+            'best_transfers': top_5_transfers,
+            'no_transfer_recommended': len(top_5_transfers) == 0,
+            'squad_key': squad_key
+        }
+    
+    def _rank_single_transfers(self, current_team: pd.DataFrame, current_points: float,
+                               available_budget: int, pool: CandidatePool, top_k: int = 5) -> List[Dict]:
+        """Score every (squad player out, player in) swap and return the top_k.
         
-        transfers_list = []
+        A swap is feasible when the incoming player is not already in the team,
+        plays the same position (squad position counts stay exact), keeps their
+        club at or under three players and fits the available budget (in
+        tenths of £1m). Each feasible swap is valued by the best XI of the
+        resulting squad. Ties in points gain keep the order of the team rows
+        and player ids.
+        """
+        squad = current_team.reset_index(drop=True)
+        if squad.empty:
+            return []
         
-        # Try removing each player and replacing with a better option
-        for idx, current_player in current_team.iterrows():
-            current_id = current_player['id']
-            current_pos = current_player['position']
-            current_team_name = current_player['team']
-            current_price = current_player['price']
-            current_pred_points = current_player['predicted_points']
-            is_starter = current_player['is_starter']
-            
-            # Skip if not a starter (bench optimization is different)
-            if not is_starter:
+        out_position = squad['position'].to_numpy()
+        out_club = squad['team'].to_numpy()
+        out_cost = squad['cost'].to_numpy(dtype=np.int64)
+        out_points = squad['predicted_points'].to_numpy(dtype=float)
+        in_squad = pool.squad_mask(squad['id'])
+        club_counts = np.bincount(out_club, minlength=pool.n_clubs)
+        
+        # Lineup constants of every slot (see _lineup_terms) in one batch: slot o forced out
+        # (best XI without it) in row o, forced in (best rest of an XI that starts it) in row n + o
+        n = len(squad)
+        forced = np.repeat(out_points[None, :], 2 * n, axis=0)
+        forced[np.arange(n), np.arange(n)] = self.FORCE_OUT
+        forced[n + np.arange(n), np.arange(n)] = self.FORCE_IN
+        constants = self.validator.best_xi_points(forced, out_position)
+        bench_constants, start_constants = constants[:n], constants[n:] - self.FORCE_IN
+        
+        gains, out_rows, in_rows = [], [], []
+        for o, position in enumerate(out_position.tolist()):
+            rows = pool.by_points.get(position)
+            if rows is None:
                 continue
+            clubs = pool.clubs[rows]
+            feasible = (
+                ~in_squad[rows]
+                & (club_counts[clubs] + 1 - (clubs == out_club[o]) <= MAX_PER_TEAM)
+                & (pool.costs[rows] - out_cost[o] <= available_budget)
+            )
+            rows = rows[feasible]
             
-            # Find available replacements (any position, not already in team)
-            available_players = self.players_df[
-                (~self.players_df['id'].isin(current_team['id']))  # Not already in team
-            ].copy()
+            # Best XI with the incoming player in the outgoing slot, for all candidates at once
+            gains.append(np.maximum(bench_constants[o], start_constants[o] + pool.points[rows]) - current_points)
+            out_rows.append(np.full(len(rows), o))
+            in_rows.append(rows)
+        
+        if not gains:
+            return []
+        gains, out_rows, in_rows = np.concatenate(gains), np.concatenate(out_rows), np.concatenate(in_rows)
+        best = np.lexsort((in_rows, out_rows, -gains))[:top_k]
+        
+        transfers = []
+        for out_row, in_row, gain in zip(out_rows[best], in_rows[best], gains[best]):
+            current_player = squad.iloc[out_row]
+            replacement = pool.players.iloc[in_row]
+            transfers.append({
+                'out': self._player_dict(current_player, current_player['position']),
+                'in': self._player_dict(replacement, current_player['position']),
+                'points_gain': gain,
+                'cost_change': (replacement['cost'] - current_player['cost']) / 10
+            })
+        
+        return transfers
+    
+    @staticmethod
+    def _player_dict(player: pd.Series, position: str) -> Dict:
+        """Transfer suggestion fields for one player."""
+        return {
+            'id': player['id'],
+            'name': player['name'],
+            'position': position,
+            'team': player['team'],
+            'price': player['price'],
+            'predicted_points': player['predicted_points']
+        }
+    
+    def find_best_transfers(self, current_team_json: Dict, k: int = 2, num_weeks: int = 3,
+                            top_n: int = 5) -> Dict:
+        """Find the top_n best plans of exactly k transfers.
+        
+        Plans follow the single-transfer rules: squad players are swapped for
+        players of the same position who are not in the team, every club stays
+        at or under three players and the total cost change fits the available
+        budget. Plans are valued by the best XI of the resulting squad.
+        
+        Args:
+            current_team_json: Current team structure
+            k: Number of transfers per plan (default: 2)
+            num_weeks: Number of weeks to consider for predictions (default: 3)
+            top_n: Number of plans to return (default: 5)
+        
+        Results are memoized like find_best_transfer.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        
+        pool = self.candidate_pool(num_weeks)
+        squad_key = memo_key('transfers', str(self.db.db_path), squad_hash(current_team_json), pool.generation,
+                             num_weeks, k, top_n)
+        result = _TRANSFER_MEMO.get_or_compute(
+            squad_key, lambda: self._find_best_transfers(current_team_json, k, num_weeks, top_n, pool, squad_key)
+        )
+        return copy.deepcopy(result)
+    
+    def _find_best_transfers(self, current_team_json: Dict, k: int, num_weeks: int, top_n: int,
+                             pool: CandidatePool, squad_key: str) -> Dict:
+        """Uncached find_best_transfers."""
+        current_team = self._parse_team(current_team_json, pool)
+        
+        current_points = self.validator.best_xi_points(current_team['predicted_points'], current_team['position'])
+        current_cost = int(current_team['cost'].sum())  # Tenths of £1m
+        available_budget = BUDGET_TENTHS - current_cost
+        
+        print(f"Current team points (best XI, next {num_weeks} weeks): {current_points:.2f}")
+        print(f"Searching best {k}-transfer plans...")
+        
+        squad = current_team.reset_index(drop=True)
+        plans = self._search_k_transfers(squad, pool, k, top_n, available_budget)
+        
+        best_plans = []
+        for gain, cost_change, swaps in plans:
+            best_plans.append({
+                'transfers': [{
+                    'out': self._player_dict(squad.iloc[out_row], squad['position'].iloc[out_row]),
+                    'in': self._player_dict(pool.players.iloc[in_row], squad['position'].iloc[out_row])
+                } for out_row, in_row in swaps],
+                'points_gain': gain,
+                'cost_change': cost_change / 10,
+                'new_total_points': current_points + gain,
+                'new_total_cost': (current_cost + cost_change) / 10
+            })
+        
+        return {
+            'current_team_points': current_points,
+            'current_team_cost': current_cost / 10,
+            'k': k,
+            'best_plans': best_plans,
+            'no_transfer_recommended': len(best_plans) == 0,
+            'squad_key': squad_key
+        }
+    
+    def _lineup_terms(self, points: np.ndarray, positions: np.ndarray, slots: List[int]):
+        """Best-XI points of a squad as a function of the points in a few of its slots.
+        
+        Each lineup either starts or benches each slot, so with the other
+        players fixed the best XI is the max over subsets T of the slots of
+        C_T + (points in T), where C_T is the best rest of a lineup that starts
+        exactly T. Each C_T is found by forcing T in and the other slots out.
+        
+        Returns:
+            (masks, constants): masks (2^m, m) marks T, constants (2^m,) holds C_T
+        """
+        masks = np.array(list(itertools.product((0.0, 1.0), repeat=len(slots))))
+        rows = np.repeat(points[None, :], len(masks), axis=0)
+        rows[:, slots] = np.where(masks > 0, self.FORCE_IN, self.FORCE_OUT)
+        constants = self.validator.best_xi_points(rows, positions) - masks.sum(axis=1) * self.FORCE_IN
+        return masks, constants
+    
+    def _search_k_transfers(self, squad: pd.DataFrame, pool: CandidatePool, k: int,
+                            top_n: int, available_budget: int):
+        """Branch-and-bound search over plans of k (squad player out, player in) swaps.
+        
+        Sets of k outgoing players are visited best upper bound first. With the
+        outs removed up front, adding replacements only raises club counts and
+        spends budget, so both checks are exact at every step of the branch.
+        
+        A branch is bounded by the best XI of its squad with every outgoing
+        player not yet replaced given the best points affordable at their
+        position (leaving the cheapest cost for each other open slot). The
+        best XI never drops when a player's points rise, so the bound is valid.
+        Each player's replacements are scored in one batch (see _lineup_terms)
+        in descending points order; the scan stops once even the budget-free
+        bound (which only falls along the scan) cannot beat the current
+        top_n-th plan, and the last out's replacements are scored exactly.
+        Outs of the same position take replacements in increasing rank, so
+        swapping two replacements between them (the same resulting team) is
+        counted once.
+        
+        Costs and budgets are integer tenths of £1m, so budget checks are exact.
+        
+        Returns:
+            List of (points_gain, cost_change in tenths, [(out_row, pool_row), ...]) sorted by gain
+        """
+        if len(squad) < k:
+            return []
+        
+        # Pool rows per position (best points first / cheapest first); squad members count as used
+        in_points, in_cost, in_club = pool.points, pool.costs, pool.clubs
+        by_position, by_cost = pool.by_points, pool.by_cost
+        in_squad = pool.squad_mask(squad['id'])
+        top_points, min_cost = {}, {}
+        for position in by_position:
+            best_row = pool.first_available(by_position[position], in_squad)
+            if best_row is not None:
+                top_points[position] = in_points[best_row]
+                min_cost[position] = int(in_cost[pool.first_available(by_cost[position], in_squad)])
+        
+        out_position = squad['position'].tolist()
+        out_cost = squad['cost'].astype(int).tolist()
+        out_club = squad['team'].tolist()
+        squad_points = squad['predicted_points'].to_numpy(dtype=float)
+        positions = squad['position'].to_numpy()
+        current_points = self.validator.best_xi_points(squad_points, positions)
+        
+        out_sets = [
+            outs for outs in itertools.combinations(range(len(squad)), k)
+            if all(out_position[o] in top_points for o in outs)
+        ]
+        if not out_sets:
+            return []
+        
+        base_club_counts = np.bincount(squad['team'].to_numpy(), minlength=pool.n_clubs)
+        
+        def open_values(open_outs, budgets, club_counts, used):
+            """(n, len(open_outs)) best points the unreplaced outs can bring at each budget.
             
-            # Check budget constraint for each replacement
-            for _, replacement in available_players.iterrows():
-                price_diff = replacement['price'] - current_price
-                
-                # Skip if too expensive
-                if price_diff > available_budget:
-                    continue
-                
-                # Create temporary team with the transfer
-                temp_team = current_team.copy()
-                temp_team.loc[idx, 'id'] = replacement['id']
-                temp_team.loc[idx, 'name'] = replacement['name']
-                temp_team.loc[idx, 'position'] = replacement['position']
-                temp_team.loc[idx, 'team'] = replacement['team']
-                temp_team.loc[idx, 'price'] = replacement['price']
-                temp_team.loc[idx, 'predicted_points'] = replacement['predicted_points']
+            Candidates in clubs that are already full or already brought in are
+            skipped (neither changes back further down a branch), and every other
+            open slot keeps the cheapest cost of its position in reserve.
+            """
+            reserved = sum(min_cost[out_position[r]] for r in open_outs)
+            columns = []
+            for r in open_outs:
+                rows = by_cost[out_position[r]]
+                available = (club_counts[in_club[rows]] < MAX_PER_TEAM) & ~used[rows]
+                best = np.maximum.accumulate(np.where(available, in_points[rows], self.FORCE_OUT))
+                caps = budgets - (reserved - min_cost[out_position[r]])
+                idx = np.searchsorted(in_cost[rows], caps, side='right') - 1
+                columns.append(np.where(idx >= 0, best[np.maximum(idx, 0)], self.FORCE_OUT))
+            return np.column_stack(columns)
+        
+        # Bound of each out set before any replacement is chosen
+        set_budgets = np.array([available_budget + sum(out_cost[o] for o in outs) for outs in out_sets])
+        set_rows = np.repeat(squad_points[None, :], len(out_sets), axis=0)
+        for set_index, outs in enumerate(out_sets):
+            club_counts = base_club_counts.copy()
+            for o in outs:
+                club_counts[out_club[o]] -= 1
+            set_rows[set_index, list(outs)] = open_values(outs, set_budgets[set_index:set_index + 1], club_counts, in_squad)[0]
+        set_bounds = self.validator.best_xi_points(set_rows, positions) - current_points
+        set_order = np.argsort(-set_bounds, kind='stable')
+        
+        heap = []  # Min-heap of (gain, -order, cost_change, swaps) holding the top_n plans
+        order = [0]
+        
+        def threshold():
+            return heap[0][0] if len(heap) == top_n else float('-inf')
+        
+        for set_index in set_order.tolist():
+            if set_bounds[set_index] <= threshold():
+                break  # Sets are sorted by bound, so no later set can do better
+            outs = out_sets[set_index]
+            
+            # Remove all outgoing players before placing replacements
+            club_counts = base_club_counts.copy()
+            for o in outs:
+                club_counts[out_club[o]] -= 1
+            used = in_squad.copy()
+            swaps = []
+            first_ranks = {}  # Position -> lowest rank its next out may take
+            
+            def search(depth, budget_left, masks, constants):
+                # masks/constants: best XI as a function of the points of outs[depth:]
+                o = outs[depth]
+                position = out_position[o]
+                first_rank = first_ranks.get(position, 0)
+                ranked = by_position[position][first_rank:]
+                feasible = ((in_cost[ranked] <= budget_left) & (club_counts[in_club[ranked]] < MAX_PER_TEAM)
+                            & ~used[ranked])
+                half = len(constants) // 2  # Rows without o come first (see _lineup_terms)
                 
-                # Check that team constraints are still met
-                if not self.validator.validate_team_constraints(temp_team):
-                    continue
+                if depth == k - 1:
+                    # Last out: the exact gain of every feasible replacement at once
+                    rows = ranked[feasible]
+                    gains = np.maximum(constants[0], constants[1] + in_points[rows]) - current_points
+                    better = gains > threshold()
+                    spent = available_budget - budget_left
+                    for i, gain in zip(rows[better].tolist(), gains[better].tolist()):
+                        if gain <= threshold():
+                            continue
+                        order[0] += 1
+                        plan = (gain, -order[0], spent + int(in_cost[i]), swaps + [(o, i)])
+                        if len(heap) < top_n:
+                            heapq.heappush(heap, plan)
+                        else:
+                            heapq.heappushpop(heap, plan)
+                    return
                 
-                # Calculate points improvement
-                points_gain = replacement['predicted_points'] - current_pred_points
+                # Budget-free and budget-aware bounds for every replacement of o
+                open_outs = list(outs[depth + 1:])
+                open_best = np.array([top_points[out_position[r]] for r in open_outs])
+                open_tight = open_values(open_outs, budget_left - in_cost[ranked], club_counts, used)
+                loose_values = np.column_stack([in_points[ranked], np.broadcast_to(open_best, open_tight.shape)])
+                tight_values = np.column_stack([in_points[ranked], open_tight])
+                loose_bounds = (constants + loose_values @ masks.T).max(axis=1) - current_points
+                bounds = (constants + tight_values @ masks.T).max(axis=1) - current_points
                 
-                transfer = {
-                    'out': {
-                        'id': current_id,
-                        'name': current_player['name'],
-                        'position': current_pos,
-                        'team': current_team_name,
-                        'price': current_price,
-                        'predicted_points': current_pred_points
-                    },
-                    'in': {
-                        'id': replacement['id'],
-                        'name': replacement['name'],
-                        'position': current_pos,
-                        'team': replacement['team'],
-                        'price': replacement['price'],
-                        'predicted_points': replacement['predicted_points']
-                    },
-                    'points_gain': points_gain,
-                    'cost_change': price_diff,
-                    'new_total_points': current_points + points_gain,
-                    'new_total_cost': current_cost + price_diff
-                }
-                transfers_list.append(transfer)
-        
-        # Sort by points gain in descending order and take top 5
-        transfers_list.sort(key=lambda x: x['points_gain'], reverse=True)
-        top_5_transfers = transfers_list[:5]
+                # Only feasible replacements that can beat the current threshold are branched on;
+                # the threshold only rises while the children are searched, so check it again
+                promising = feasible & (bounds > threshold())
+                for offset in np.flatnonzero(promising).tolist():
+                    if loose_bounds[offset] <= threshold():
+                        break  # Replacements are sorted, so no later one can do better
+                    if bounds[offset] <= threshold():
+                        continue
+                    
+                    i = int(ranked[offset])
+                    used[i] = True
+                    club_counts[in_club[i]] += 1
+                    swaps.append((o, i))
+                    # Later outs of the same position (wherever they sit in outs) only take lower-ranked replacements
+                    first_ranks[position] = first_rank + offset + 1
+                    search(depth + 1, budget_left - int(in_cost[i]),
+                           masks[:half, 1:], np.maximum(constants[:half], constants[half:] + in_points[i]))
+                    swaps.pop()
+                    club_counts[in_club[i]] -= 1
+                    used[i] = False
+                first_ranks[position] = first_rank
+            
+            search(0, int(set_budgets[set_index]), *self._lineup_terms(squad_points, positions, list(outs)))
         
-        return {
-            'current_team_points': current_points,
-            'current_team_cost': current_cost,
-            'best_transfers': top_5_transfers,
-            'no_transfer_recommended': len(top_5_transfers) == 0
-        }
\ No newline at end of file
+        # Highest gain first; ties in discovery order
+        plans = sorted(heap, key=lambda plan: (-plan[0], -plan[1]))
+        return [(gain, cost_change, swaps) for gain, _, cost_change, swaps in plans]
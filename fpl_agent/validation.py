@@ -2,49 +2,172 @@
 Validation utilities for FPL teams and constraints.
 """
 
+import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Dict, List
+from .memo import SquadMemo, squad_hash
+
+# Squad rules: position codes are indexes into POSITIONS, prices are in tenths of £1m
+POSITIONS = ('GK', 'DEF', 'MID', 'FWD')
+SQUAD_SIZE = 15
+SQUAD_REQUIREMENTS = {'GK': 2, 'DEF': 5, 'MID': 5, 'FWD': 3}
+MAX_PER_TEAM = 3
+BUDGET_TENTHS = 1000
+
+# Starting XI size and (min, max) starters per position
+STARTING_SIZE = 11
+STARTING_LIMITS = {'GK': (1, 1), 'DEF': (3, 5), 'MID': (3, 5), 'FWD': (1, 3)}
+
+# Violation bits returned by FPLValidator.constraint_violations
+VIOLATION_SQUAD_SIZE = 1
+VIOLATION_POSITIONS = 2
+VIOLATION_TEAM_LIMIT = 4
+VIOLATION_BUDGET = 8
+VIOLATION_NAMES = {
+    VIOLATION_SQUAD_SIZE: 'squad size',
+    VIOLATION_POSITIONS: 'position counts',
+    VIOLATION_TEAM_LIMIT: 'players per team',
+    VIOLATION_BUDGET: 'budget'
+}
+
+# Starting XI points by squad hash (ids, starters and points, so no generation is needed)
+_TEAM_POINTS_MEMO = SquadMemo('team_points', maxsize=1024)
 
 
 class FPLValidator:
     """Validator for FPL team constraints and rules."""
     
     @staticmethod
-    def validate_team_constraints(team_df: pd.DataFrame) -> bool:
-        """Validate that the team meets FPL constraints."""
-        # Check squad size
-        if len(team_df) != 15:
-            print(f"Invalid squad size: {len(team_df)} (should be 15)")
-            return False
-        
-        # Check position requirements
-        position_counts = team_df['position'].value_counts()
-        required_positions = {'GK': 2, 'DEF': 5, 'MID': 5, 'FWD': 3}
-        
-        for pos, required in required_positions.items():
-            if position_counts.get(pos, 0) != required:
-                print(f"Invalid {pos} count: {position_counts.get(pos, 0)} (should be {required})")
-                return False
-        
-        # Check team limits (max 3 per team)
-        team_counts = team_df['team'].value_counts()
-        if any(count > 3 for count in team_counts):
-            print(f"Too many players from same team: {team_counts[team_counts > 3].to_dict()}")
-            return False
-        
-        # Check budget
-        total_cost = team_df['price'].sum()
-        if total_cost > 100.0:
-            print(f"Budget exceeded: £{total_cost:.1f}m (max £100.0m)")
-            return False
-        
-        return True
+    def encode_team(team_df: pd.DataFrame):
+        """Integer arrays (position codes, team ids, prices in tenths) for a team DataFrame.
+        
+        Prices come from the integer cost column when present. Unknown
+        positions get code -1, so they fail the position check.
+        """
+        codes = pd.Categorical(team_df['position'], categories=POSITIONS).codes.astype(np.int64)
+        teams = team_df['team'].to_numpy(dtype=np.int64)
+        if 'cost' in team_df:
+            prices = team_df['cost'].to_numpy(dtype=np.int64)
+        else:
+            prices = np.rint(team_df['price'].to_numpy(dtype=float) * 10).astype(np.int64)
+        return codes, teams, prices
+    
+    @staticmethod
+    def constraint_violations(position_codes: np.ndarray, team_ids: np.ndarray, prices: np.ndarray,
+                              budget: int = BUDGET_TENTHS):
+        """Bitmask of broken squad rules for one squad or a batch of squads.
+        
+        Quiet and allocation-light, so it can run over thousands of candidate
+        squads in one call. Bits are the VIOLATION_* constants; 0 means valid.
+        
+        Args:
+            position_codes: Position codes (index into POSITIONS), shape (15,) or (n_squads, 15)
+            team_ids: Non-negative team ids, same shape
+            prices: Prices in tenths of £1m, same shape
+            budget: Budget in tenths of £1m (default: 1000)
+        
+        Returns:
+            An int for one squad, or an int array of shape (n_squads,)
+        """
+        codes = np.atleast_2d(np.asarray(position_codes))
+        teams = np.atleast_2d(np.asarray(team_ids, dtype=np.int64))
+        costs = np.atleast_2d(np.asarray(prices, dtype=np.int64))
+        n_squads, n_players = codes.shape
+        violations = np.zeros(n_squads, dtype=np.int64)
+        
+        if n_players != SQUAD_SIZE:
+            violations |= VIOLATION_SQUAD_SIZE
+        
+        required = np.array([SQUAD_REQUIREMENTS[pos] for pos in POSITIONS])
+        position_counts = (codes[:, :, None] == np.arange(len(POSITIONS))).sum(axis=1)
+        violations[(position_counts != required).any(axis=1)] |= VIOLATION_POSITIONS
+        
+        # Per-squad team counts in one bincount by offsetting each squad's team ids
+        if n_players:
+            n_teams = int(teams.max()) + 1
+            offsets = np.arange(n_squads)[:, None] * n_teams
+            team_counts = np.bincount((teams + offsets).ravel(), minlength=n_squads * n_teams)
+            violations[team_counts.reshape(n_squads, n_teams).max(axis=1) > MAX_PER_TEAM] |= VIOLATION_TEAM_LIMIT
+        
+        violations[costs.sum(axis=1) > budget] |= VIOLATION_BUDGET
+        
+        return violations if np.ndim(position_codes) > 1 else int(violations[0])
+    
+    @staticmethod
+    def describe_violations(violations: int) -> List[str]:
+        """Names of the rules set in a violation bitmask."""
+        return [name for bit, name in VIOLATION_NAMES.items() if violations & bit]
+    
+    @staticmethod
+    def validate_team_constraints(team_df: pd.DataFrame, verbose: bool = True) -> bool:
+        """Validate that the team meets FPL constraints.
+        
+        Args:
+            team_df: Team with position, team and price columns
+            verbose: Print the details of any broken rule (default: True)
+        """
+        violations = FPLValidator.constraint_violations(*FPLValidator.encode_team(team_df))
+        if violations and verbose:
+            FPLValidator._print_violations(team_df, violations)
+        return violations == 0
+    
+    @staticmethod
+    def _print_violations(team_df: pd.DataFrame, violations: int) -> None:
+        """Print the details of each broken rule."""
+        if violations & VIOLATION_SQUAD_SIZE:
+            print(f"Invalid squad size: {len(team_df)} (should be {SQUAD_SIZE})")
+        
+        if violations & VIOLATION_POSITIONS:
+            position_counts = team_df['position'].value_counts()
+            for pos, required in SQUAD_REQUIREMENTS.items():
+                if position_counts.get(pos, 0) != required:
+                    print(f"Invalid {pos} count: {position_counts.get(pos, 0)} (should be {required})")
+        
+        if violations & VIOLATION_TEAM_LIMIT:
+            team_counts = team_df['team'].value_counts()
+            print(f"Too many players from same team: {team_counts[team_counts > MAX_PER_TEAM].to_dict()}")
+        
+        if violations & VIOLATION_BUDGET:
+            print(f"Budget exceeded: £{team_df['price'].sum():.1f}m (max £{BUDGET_TENTHS / 10:.1f}m)")
     
     @staticmethod
     def calculate_team_points(team_df: pd.DataFrame) -> float:
-        """Calculate total predicted points for starting XI."""
-        starters = team_df[team_df['is_starter'] == True]
-        return starters['predicted_points'].sum()
+        """Calculate total predicted points for starting XI (memoized per squad hash)."""
+        def compute():
+            starters = team_df[team_df['is_starter'] == True]
+            return starters['predicted_points'].sum()
+        return _TEAM_POINTS_MEMO.get_or_compute(squad_hash(team_df), compute)
+    
+    @staticmethod
+    def best_xi_points(points: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Points of the best valid starting XI, for one squad or a batch of squads.
+        
+        Formations are small enough to solve in closed form: every position
+        fields its minimum number of best players, and the remaining places go
+        to the best of the leftover players, at most (max - min) per position.
+        
+        Args:
+            points: Predicted points, shape (15,) or (n_squads, 15)
+            positions: Position of each squad slot, shape (15,)
+        
+        Returns:
+            Best XI points, a scalar for one squad or shape (n_squads,)
+        """
+        points = np.asarray(points, dtype=float)
+        batch = np.atleast_2d(points)
+        positions = np.asarray(positions)
+        
+        total = np.zeros(len(batch))
+        extras = []
+        for pos, (minimum, maximum) in STARTING_LIMITS.items():
+            block = -np.sort(-batch[:, positions == pos], axis=1)  # Best first
+            total += block[:, :minimum].sum(axis=1)
+            extras.append(block[:, minimum:maximum])
+        
+        n_flexible = STARTING_SIZE - sum(minimum for minimum, _ in STARTING_LIMITS.values())
+        extras = -np.sort(-np.concatenate(extras, axis=1), axis=1)
+        total += extras[:, :n_flexible].sum(axis=1)
+        return total if points.ndim > 1 else total[0]
     
     @staticmethod
     def parse_current_team(team_json: Dict, database_df: pd.DataFrame) -> pd.DataFrame:
@@ -71,9 +194,10 @@ class FPLValidator:
             if missing_ids:
                 raise ValueError(f"Player IDs not found in database: {sorted(list(missing_ids))}")
             
-            # Merge with database to get missing fields
+            # Merge with database to get missing fields (cost: integer tenths, when loaded)
+            value_columns = ['cost', 'price', 'predicted_points'] if 'cost' in database_df else ['price', 'predicted_points']
             merged_df = current_team_df.merge(
-                database_df[['id', 'name', 'position', 'team', 'price', 'predicted_points']], 
+                database_df[['id', 'name', 'position', 'team'] + value_columns], 
                 on='id', 
                 how='left',
                 suffixes=('_input', '_db')
@@ -104,7 +228,7 @@ class FPLValidator:
                 raise ValueError(f"Data mismatches found between input team and database:\n" + "\n".join(mismatches))
             
             # Use database values (more reliable)
-            current_team_df = merged_df[['id', 'name_db', 'position_db', 'team_db', 'is_starter', 'price', 'predicted_points']].copy()
+            current_team_df = merged_df[['id', 'name_db', 'position_db', 'team_db', 'is_starter'] + value_columns].copy()
             current_team_df.rename(columns={
                 'name_db': 'name',
                 'position_db': 'position', 
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Bulk Squad Analysis
+
+Analyzes many squads (league rivals, client teams) in one run: checks each
+squad against the FPL rules, compares its saved starting XI with the best
+XI, and finds its best single transfer. The player pool is loaded once and
+transfer searches run in parallel. Results are written column-wise to .npz
+(one array per column) or .csv, and throughput is reported in squads/sec.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from fpl_agent.batch import analyze_squads, load_squads, write_columns
+
+
+def main():
+    """Main function to analyze a file of squads."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='FPL Bulk Squad Analysis')
+    parser.add_argument(
+        'squads',
+        help='Squads file: .jsonl (one team JSON per line) or .json (list of team JSONs)'
+    )
+    parser.add_argument(
+        '--output',
+        default='squad_analysis.npz',
+        help='Results file, .npz (columnar arrays) or .csv (default: squad_analysis.npz)'
+    )
+    parser.add_argument(
+        '--db',
+        default="/workspaces/FPL_agent/data/fpl_agent.db",
+        help='Path to the SQLite database'
+    )
+    parser.add_argument(
+        '--weeks',
+        type=int,
+        default=3,
+        help='Number of weeks to consider for predictions (default: 3)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes for transfer searches (default: CPU count; 1 runs in-process)'
+    )
+    args = parser.parse_args()
+    
+    squads = load_squads(args.squads)
+    print(f"Analyzing {len(squads)} squads (next {args.weeks} weeks)...")
+    result = analyze_squads(args.db, squads, num_weeks=args.weeks, max_workers=args.workers)
+    columns = result['columns']
+    write_columns(columns, args.output)
+    
+    n_valid = int(columns['valid'].sum())
+    n_transfers = int((columns['transfer_in_id'] >= 0).sum())
+    print(f"Valid squads: {n_valid}/{len(squads)}")
+    if n_valid:
+        print(f"Mean lineup gain: {np.nanmean(columns['lineup_gain']):.2f} pts")
+    if n_transfers:
+        print(f"Squads with a transfer: {n_transfers}, mean gain "
+              f"{np.nanmean(columns['transfer_points_gain']):.2f} pts")
+    print(f"Wrote {args.output}")
+    print(f"Throughput: {result['squads_per_second']:.1f} squads/sec ({result['elapsed']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+UI Startup Benchmark
+
+Measures how long the Dash UI takes to become ready in a fresh interpreter:
+importing ui/app.py, building the app with create_app and serving the page
+and its layout. The database is warmed first (player_summary built for the
+requested horizon), and the web framework (dash, pandas) is imported before
+the clock starts, so the budget covers the app's own startup work. Exits
+non-zero if that is slower than --max-seconds, or if startup imported the
+solver or loaded player data.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import statistics
+import subprocess
+
+from fpl_agent import FPLDatabase
+
+UI_APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ui', 'app.py')
+
+# Runs in a fresh interpreter so module imports are part of the measurement
+STARTUP_PROBE = """
+import importlib.util, json, sys, time
+framework_start = time.perf_counter()
+import dash, dash_bootstrap_components, pandas
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('fpl_ui_app', sys.argv[1])
+ui_app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ui_app)
+imported = time.perf_counter()
+app = ui_app.create_app(sys.argv[2], num_weeks=int(sys.argv[3]))
+created = time.perf_counter()
+client = app.server.test_client()
+statuses = [client.get('/').status_code, client.get('/_dash-layout').status_code]
+ready = time.perf_counter()
+print(json.dumps({
+    'framework_import': start - framework_start,
+    'import': imported - start,
+    'create_app': created - imported,
+    'first_request': ready - created,
+    'total': ready - start,
+    'statuses': statuses,
+    'solver_imported': 'ortools' in sys.modules,
+    'players_loaded': bool(ui_app._players_cache)
+}))
+"""
+
+
+def measure_startup(db_path: str, num_weeks: int) -> dict:
+    """Time one UI startup in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, '-c', STARTUP_PROBE, UI_APP_PATH, db_path, str(num_weeks)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Main function to run the UI startup benchmark."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='FPL UI Startup Benchmark')
+    parser.add_argument(
+        '--db',
+        default="/workspaces/FPL_agent/data/fpl_agent.db",
+        help='Path to the SQLite database'
+    )
+    parser.add_argument(
+        '--weeks',
+        type=int,
+        default=3,
+        help='Number of weeks to consider for predictions (default: 3)'
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=5,
+        help='Number of startups to time (default: 5)'
+    )
+    parser.add_argument(
+        '--max-seconds',
+        type=float,
+        default=1.0,
+        help='Startup budget for the median run in seconds (default: 1.0)'
+    )
+    args = parser.parse_args()
+    
+    # Warm the database so a player_summary rebuild is not part of the timing
+    FPLDatabase(args.db).load_player_data(num_weeks=args.weeks)
+    
+    runs = []
+    for run in range(args.runs):
+        timing = measure_startup(args.db, args.weeks)
+        runs.append(timing)
+        print(f"Run {run + 1}: framework import {timing['framework_import']:.3f}s, app import {timing['import']:.3f}s, "
+              f"create_app {timing['create_app']:.3f}s, first request {timing['first_request']:.3f}s, "
+              f"total {timing['total']:.3f}s")
+    
+    median_total = statistics.median(timing['total'] for timing in runs)
+    print(f"\nMedian startup: {median_total:.3f}s (budget {args.max_seconds:.1f}s)")
+    
+    failures = []
+    if median_total > args.max_seconds:
+        failures.append(f"median startup {median_total:.3f}s exceeds {args.max_seconds:.1f}s")
+    if any(status != 200 for timing in runs for status in timing['statuses']):
+        failures.append("page or layout request failed")
+    if any(timing['solver_imported'] for timing in runs):
+        failures.append("OR-Tools was imported during startup")
+    if any(timing['players_loaded'] for timing in runs):
+        failures.append("player data was loaded during startup")
+    
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK: UI is ready within budget")
+
+
+if __name__ == "__main__":
+    main()
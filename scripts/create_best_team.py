@@ -13,13 +13,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import sqlite3
 import pandas as pd
 import requests
-from ortools.linear_solver import pywraplp
 from typing import Dict, List, Tuple, Optional
-from fpl_agent import FPLDatabase
+from fpl_agent.optimizer import FPLSquadOptimizer as BaseSquadOptimizer
 
 
-class FPLSquadOptimizer:
-    """Integer Linear Program solver for FPL squad optimization."""
+class FPLSquadOptimizer(BaseSquadOptimizer):
+    """FPL squad optimizer restricted to frequent starters for the current gameweek.
+    
+    The ILP model and solve come from fpl_agent.optimizer; this script only
+    customizes candidate loading and result formatting.
+    """
     
     def __init__(self, db_path: str, epsilon: float = 0.001, num_weeks: int = 3):
         """
@@ -30,11 +33,7 @@ class FPLSquadOptimizer:
             epsilon: Weight for bench cost penalty (should be small)
             num_weeks: Number of upcoming weeks to consider for predictions (default: 3)
         """
-        self.db_path = db_path
-        self.epsilon = epsilon
-        self.num_weeks = num_weeks
-        self.solver = None
-        self.players_df = None
+        super().__init__(db_path, epsilon=epsilon, num_weeks=num_weeks)
         self.current_gameweek = self._get_current_gameweek()
     
     def _get_current_gameweek(self) -> int:
@@ -50,11 +49,10 @@ class FPLSquadOptimizer:
             print(f"Warning: Could not fetch current gameweek: {e}")
             print("Defaulting to gameweek 1")
             return 1
-        
+    
     def load_player_data(self) -> pd.DataFrame:
         """Load player data from player_summary table."""
-        db = FPLDatabase(self.db_path)
-        df = db.load_player_data(num_weeks=self.num_weeks)
+        df = self.db.load_player_data(num_weeks=self.num_weeks)
         
         print(f"Loaded {len(df)} players from player_summary table")
         print(f"Players with predictions (>0 points): {(df['predicted_points'] > 0).sum()}")
@@ -92,143 +90,6 @@ class FPLSquadOptimizer:
         
         return df_filtered
     
-    def create_optimization_model(self) -> pywraplp.Solver:
-        """Create and configure the ILP model."""
-        self.players_df = self.load_player_data()
-        n_players = len(self.players_df)
-        
-        # Create solver
-        solver = pywraplp.Solver.CreateSolver('SCIP')
-        if not solver:
-            raise RuntimeError("Could not create solver")
-        
-        # Decision variables
-        squad = {}  # squad_i ∈ {0,1} - player i in 15-man squad
-        start = {}  # start_i ∈ {0,1} - player i in starting 11
-        
-        for i in range(n_players):
-            squad[i] = solver.IntVar(0, 1, f'squad_{i}')
-            start[i] = solver.IntVar(0, 1, f'start_{i}')
-        
-        # Objective: Maximize predicted points of starting 11, minimize bench cost
-        objective = solver.Objective()
-        for i in range(n_players):
-            predicted_points = self.players_df.iloc[i]['predicted_points']
-            price = self.players_df.iloc[i]['price']
-            
-            # Primary: maximize starting XI points (no cost penalty for starters)
-            objective.SetCoefficient(start[i], predicted_points)
-            
-            # Secondary: minimize bench cost (bench = squad - start)
-            # This penalizes expensive bench players only
-            objective.SetCoefficient(squad[i], -self.epsilon * price)
-        
-        objective.SetMaximization()
-        
-        # CONSTRAINTS
-        
-        # 1. Squad size = 15
-        solver.Add(solver.Sum([squad[i] for i in range(n_players)]) == 15)
-        
-        # 2. Starting XI size = 11
-        solver.Add(solver.Sum([start[i] for i in range(n_players)]) == 11)
-        
-        # 3. Link constraints: start_i <= squad_i
-        for i in range(n_players):
-            solver.Add(start[i] <= squad[i])
-        
-        # 4. Squad position requirements (exact)
-        positions = ['GK', 'DEF', 'MID', 'FWD']
-        squad_requirements = {'GK': 2, 'DEF': 5, 'MID': 5, 'FWD': 3}
-        
-        for pos in positions:
-            pos_players = self.players_df[self.players_df['position'] == pos].index
-            solver.Add(
-                solver.Sum([squad[i] for i in pos_players]) == squad_requirements[pos]
-            )
-        
-        # 5. Starting XI position bounds
-        gk_players = self.players_df[self.players_df['position'] == 'GK'].index
-        def_players = self.players_df[self.players_df['position'] == 'DEF'].index
-        mid_players = self.players_df[self.players_df['position'] == 'MID'].index
-        fwd_players = self.players_df[self.players_df['position'] == 'FWD'].index
-        
-        solver.Add(solver.Sum([start[i] for i in gk_players]) == 1)
-        solver.Add(solver.Sum([start[i] for i in def_players]) >= 3)
-        solver.Add(solver.Sum([start[i] for i in def_players]) <= 5)
-        solver.Add(solver.Sum([start[i] for i in mid_players]) >= 3)
-        solver.Add(solver.Sum([start[i] for i in mid_players]) <= 5)
-        solver.Add(solver.Sum([start[i] for i in fwd_players]) >= 1)
-        solver.Add(solver.Sum([start[i] for i in fwd_players]) <= 3)
-        
-        # 6. Team cap: max 3 players from any team
-        teams = self.players_df['team'].unique()
-        for team in teams:
-            team_players = self.players_df[self.players_df['team'] == team].index
-            if len(team_players) > 0:
-                solver.Add(solver.Sum([squad[i] for i in team_players]) <= 3)
-        
-        # 7. Budget constraint: total cost <= 100.0
-        solver.Add(
-            solver.Sum([
-                squad[i] * self.players_df.iloc[i]['price'] 
-                for i in range(n_players)
-            ]) <= 100.0
-        )
-        
-        self.solver = solver
-        self.squad_vars = squad
-        self.start_vars = start
-        
-        return solver
-    
-    def solve(self) -> Dict:
-        """Solve the optimization problem and return results."""
-        if not self.solver:
-            self.create_optimization_model()
-        
-        print("Solving optimization problem...")
-        status = self.solver.Solve()
-        
-        if status != pywraplp.Solver.OPTIMAL:
-            if status == pywraplp.Solver.INFEASIBLE:
-                raise RuntimeError("Problem is infeasible - no valid solution exists")
-            elif status == pywraplp.Solver.UNBOUNDED:
-                raise RuntimeError("Problem is unbounded")
-            else:
-                raise RuntimeError(f"Solver failed with status: {status}")
-        
-        # Extract solution
-        squad_indices = []
-        start_indices = []
-        
-        for i in range(len(self.players_df)):
-            if self.squad_vars[i].solution_value() > 0.5:
-                squad_indices.append(i)
-            if self.start_vars[i].solution_value() > 0.5:
-                start_indices.append(i)
-        
-        squad_players = self.players_df.iloc[squad_indices].copy()
-        start_players = self.players_df.iloc[start_indices].copy()
-        bench_players = squad_players[~squad_players.index.isin(start_indices)].copy()
-        
-        # Calculate metrics
-        total_predicted_points = start_players['predicted_points'].sum()
-        total_cost = squad_players['price'].sum()
-        bench_cost = bench_players['price'].sum()
-        objective_value = self.solver.Objective().Value()
-        
-        return {
-            'squad': squad_players,
-            'starting_xi': start_players,
-            'bench': bench_players,
-            'total_predicted_points': total_predicted_points,
-            'total_cost': total_cost,
-            'bench_cost': bench_cost,
-            'objective_value': objective_value,
-            'epsilon': self.epsilon
-        }
-    
     def format_results(self, results: Dict) -> str:
         """Format the optimization results for display."""
         output = []
@@ -245,6 +106,7 @@ class FPLSquadOptimizer:
         output.append(f"TOTAL PREDICTED POINTS (Starting XI): {results['total_predicted_points']:.2f}")
         output.append(f"TOTAL SQUAD COST: £{results['total_cost']:.1f}m")
         output.append(f"BENCH COST: £{results['bench_cost']:.1f}m")
+        output.append(f"MODEL BUILD TIME: {results['build_time']:.3f}s, SOLVE TIME: {results['solve_time']:.3f}s")
         
         # Starting XI
         output.append(f"\n{'='*30} STARTING XI {'='*30}")
@@ -327,7 +189,7 @@ def main():
         print(f"Starting positions: {start['position'].value_counts().to_dict()}")
         print(f"Teams with 3+ players: {squad.groupby('team').size()[squad.groupby('team').size() >= 3].to_dict()}")
         print(f"Budget used: £{squad['price'].sum():.1f}m / £100.0m")
-        
+    
     except Exception as e:
         print(f"Error: {e}")
         print("\nPossible solutions:")
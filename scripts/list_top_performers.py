@@ -19,9 +19,9 @@ def main():
     
     db_path = "/workspaces/FPL_agent/data/fpl_agent.db"
     
-    # Load player data
+    # Load the top players per position (from the precomputed leaderboard when current)
     db = FPLDatabase(db_path)
-    df = db.load_top_performers_for_weeks(num_weeks=args.weeks)
+    df = db.load_top_performers_for_weeks(num_weeks=args.weeks, top_n=5)
     
     # Format and display results
     formatter = FPLFormatter()
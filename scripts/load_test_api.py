@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+API Load Test
+
+Sends concurrent requests to a running FPL Agent API (backend/app.py) and
+reports throughput (requests/sec) and latency percentiles per endpoint. Each
+worker thread keeps one HTTP session, so connections are reused as a real
+client would. With --db, a local instance is started in-process on a free
+port instead of using --url.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from fpl_agent.validation import POSITIONS
+
+ENDPOINTS = ('health', 'players', 'player', 'squad', 'transfers')
+
+
+def start_local_server(db_path: str, num_weeks: int):
+    """Start the API on a free local port in a background thread; returns (url, server)."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from backend.app import create_app
+    
+    class QuietKeepAliveHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep client connections open, like the API's main()
+        
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    server = make_server('127.0.0.1', 0, create_app(db_path, num_weeks=num_weeks), threaded=True,
+                         request_handler=QuietKeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def team_json_from_squad(squad: dict) -> dict:
+    """Team JSON (as posted to /api/transfers) from an /api/squad/optimal squad payload."""
+    columns = squad['columns']
+    players = [dict(zip(columns, row)) for row in squad['rows']]
+    return {
+        'team': [
+            {
+                'position': position,
+                'players': [
+                    {'id': player['id'], 'name': player['name'], 'team': player['team'],
+                     'is_starter': player['is_starter']}
+                    for player in players if player['position'] == position
+                ]
+            }
+            for position in POSITIONS
+        ]
+    }
+
+
+def make_requests(base_url: str, session: requests.Session) -> dict:
+    """Request functions by endpoint name, sharing warm-up data fetched once."""
+    squad = session.get(f"{base_url}/api/squad/optimal", timeout=120)
+    squad.raise_for_status()
+    team_json = team_json_from_squad(squad.json()['squad'])
+    player_id = team_json['team'][3]['players'][0]['id']
+    
+    return {
+        'health': lambda s: s.get(f"{base_url}/api/health"),
+        'players': lambda s: s.get(f"{base_url}/api/players", params={'position': 'MID', 'limit': 50}),
+        'player': lambda s: s.get(f"{base_url}/api/players/{player_id}"),
+        'squad': lambda s: s.get(f"{base_url}/api/squad/optimal"),
+        'transfers': lambda s: s.post(f"{base_url}/api/transfers", json=team_json)
+    }
+
+
+def run_load(base_url: str, endpoints: list, total: int, concurrency: int) -> tuple:
+    """Send total requests cycling over endpoints from concurrency threads.
+    
+    Returns:
+        (latencies in seconds by endpoint, failed request count, wall time in seconds)
+    """
+    request_functions = make_requests(base_url, requests.Session())
+    local = threading.local()
+    latencies = defaultdict(list)
+    failures = []
+    lock = threading.Lock()
+    
+    def send(i):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        name = endpoints[i % len(endpoints)]
+        start = time.perf_counter()
+        response = request_functions[name](local.session)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[name].append(elapsed)
+            if response.status_code != 200:
+                failures.append(name)
+    
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(total)))
+    return latencies, len(failures), time.perf_counter() - wall_start
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def main():
+    """Main function to run the API load test."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='FPL Agent API Load Test')
+    parser.add_argument(
+        '--url',
+        default='http://127.0.0.1:5000',
+        help='Base URL of a running API (default: http://127.0.0.1:5000)'
+    )
+    parser.add_argument(
+        '--db',
+        help='Start a local API on this database instead of using --url'
+    )
+    parser.add_argument(
+        '--weeks',
+        type=int,
+        default=3,
+        help='Number of weeks to consider for predictions, with --db (default: 3)'
+    )
+    parser.add_argument(
+        '--endpoints',
+        default='players,player,transfers',
+        help=f"Comma-separated endpoints to cycle through, from {', '.join(ENDPOINTS)} "
+             f"(default: players,player,transfers)"
+    )
+    parser.add_argument(
+        '--requests',
+        type=int,
+        default=2000,
+        help='Total number of requests (default: 2000)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='Number of concurrent clients (default: 8)'
+    )
+    args = parser.parse_args()
+    
+    endpoints = args.endpoints.split(',')
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    
+    base_url, server = args.url, None
+    if args.db:
+        base_url, server = start_local_server(args.db, args.weeks)
+        print(f"Started local API at {base_url}")
+    
+    try:
+        latencies, failures, wall_time = run_load(base_url, endpoints, args.requests, args.concurrency)
+    finally:
+        if server is not None:
+            server.shutdown()
+    
+    print(f"\n{args.requests} requests, {args.concurrency} clients, {wall_time:.2f}s")
+    print(f"{'Endpoint':<12} {'Count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name in endpoints:
+        values = latencies[name]
+        print(f"{name:<12} {len(values):>7} {statistics.median(values) * 1000:>9.2f} "
+              f"{percentile(values, 99) * 1000:>9.2f} {max(values) * 1000:>9.2f}")
+    all_values = [value for values in latencies.values() for value in values]
+    print(f"\nThroughput: {args.requests / wall_time:.1f} requests/sec")
+    print(f"Latency: p50 {statistics.median(all_values) * 1000:.2f}ms, p99 {percentile(all_values, 99) * 1000:.2f}ms")
+    if failures:
+        print(f"FAILED: {failures} requests returned a non-200 status")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,12 @@ def main():
         default=3,
         help='Number of weeks to consider for predictions (default: 3)'
     )
+    parser.add_argument(
+        '--transfers',
+        type=int,
+        default=1,
+        help='Number of transfers to make together (default: 1)'
+    )
     args = parser.parse_args()
     
     db_path = "/workspaces/FPL_agent/data/fpl_agent.db"
@@ -79,12 +85,20 @@ def main():
     optimizer = FPLTransferOptimizer(db_path)
     
     try:
+        formatter = FPLFormatter()
+        
+        if args.transfers > 1:
+            # Find best combinations of several transfers
+            print(f"Analyzing current team and finding best {args.transfers} transfers (next {args.weeks} weeks)...")
+            result = optimizer.find_best_transfers(current_team, k=args.transfers, num_weeks=args.weeks)
+            print(formatter.format_multi_transfer_recommendation(result))
+            return
+        
         # Find best transfer
         print(f"Analyzing current team and finding best transfer (next {args.weeks} weeks)...")
         result = optimizer.find_best_transfer(current_team, num_weeks=args.weeks)
         
         # Display recommendation
-        formatter = FPLFormatter()
         print(formatter.format_transfer_recommendation(result))
         
     except Exception as e:
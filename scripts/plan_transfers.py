@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+FPL Transfer Planner
+
+Plans transfers over the next few gameweeks with a multi-period ILP, taking
+free-transfer banking, -4 hits and the bank balance into account.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fpl_agent import FPLTransferPlanner, FPLFormatter
+from optimize_transfers import get_dummy_team
+
+
+def main():
+    """Main function to run the multi-gameweek transfer planner."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='FPL Transfer Planner')
+    parser.add_argument(
+        '--horizon',
+        type=int,
+        default=4,
+        help='Number of gameweeks to plan (default: 4)'
+    )
+    parser.add_argument(
+        '--window',
+        type=int,
+        default=None,
+        help='Rolling-horizon look-ahead in gameweeks (default: solve the whole horizon at once)'
+    )
+    parser.add_argument(
+        '--free-transfers',
+        type=int,
+        default=1,
+        help='Free transfers available this gameweek (default: 1)'
+    )
+    parser.add_argument(
+        '--bank',
+        type=float,
+        default=None,
+        help='Money in the bank in £m (default: £100.0m minus squad cost)'
+    )
+    parser.add_argument(
+        '--candidates',
+        type=int,
+        default=None,
+        help='Only consider the current squad plus this many top players per position (default: all)'
+    )
+    parser.add_argument(
+        '--time-limit',
+        type=float,
+        default=None,
+        help='Time limit in seconds for each solve (default: none)'
+    )
+    args = parser.parse_args()
+    
+    db_path = "/workspaces/FPL_agent/data/fpl_agent.db"
+    
+    # Get dummy team (in future, this will be user input)
+    current_team = get_dummy_team()
+    
+    planner = FPLTransferPlanner(db_path)
+    
+    try:
+        print(f"Planning transfers for the next {args.horizon} gameweeks...")
+        plan = planner.plan(
+            current_team,
+            horizon=args.horizon,
+            free_transfers=args.free_transfers,
+            bank=None if args.bank is None else int(round(args.bank * 10)),
+            window=args.window,
+            candidates_per_position=args.candidates,
+            time_limit=args.time_limit
+        )
+        
+        print(FPLFormatter.format_transfer_plan(plan))
+    
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
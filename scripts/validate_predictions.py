@@ -12,18 +12,24 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import argparse
+import json
 import numpy as np
 from pathlib import Path
 from fpl_agent.database import FPLDatabase
 from fpl_agent.pipeline import PointsPredictor
+from fpl_agent.backtest import (
+    MatchHistory, ModelSnapshotCache, WalkForwardBacktest, compute_validation_metrics, expand_grid,
+    run_backtest_grid, training_data_hash
+)
 
 
 class TestPredictionsGenerator:
     """Generate test predictions for past gameweeks to validate model accuracy."""
     
-    def __init__(self, db: FPLDatabase):
+    def __init__(self, db: FPLDatabase, snapshot_cache: ModelSnapshotCache = None):
         self.db = db
         self.test_gameweeks = []
+        self.snapshot_cache = snapshot_cache  # Opt-in reuse of trained models across runs
     
     def get_available_gameweeks(self, season: str = "2025-26"):
         """Get list of gameweeks with data."""
@@ -35,65 +41,31 @@ class TestPredictionsGenerator:
             """, (season,))
             return [row[0] for row in cursor]
     
-    def train_predictor_up_to_gw(self, max_gw: int):
-        """Train a predictor using only data up to max_gw with hierarchical models."""
-        predictor = PointsPredictor(self.db, model_path=f"models/test_predictor_gw{max_gw}.pkl")
+    def train_predictor_up_to_gw(self, max_gw: int, config: dict = None):
+        """Train a predictor using only data up to max_gw with hierarchical models.
         
-        # Load training data filtered by gameweek with position info
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT pmc.element, pmc.name, pmc.team_attack_value, pmc.team_defense_value,
-                       pmc.opponent_attack_value, pmc.opponent_defense_value, pmc.was_home, 
-                       pmc.total_points, e.element_type_name
-                FROM player_match_context pmc
-                JOIN elements e ON pmc.element = e.id
-                WHERE pmc.gw <= ?
-                  AND pmc.team_attack_value IS NOT NULL AND pmc.team_defense_value IS NOT NULL
-                  AND pmc.opponent_attack_value IS NOT NULL AND pmc.opponent_defense_value IS NOT NULL
-                  AND pmc.was_home IS NOT NULL AND pmc.total_points IS NOT NULL
-                  AND e.element_type_name IS NOT NULL
-            """, (max_gw,))
-            data = cursor.fetchall()
-        
-        if not data:
+        The predictor lives in memory only. With a snapshot cache, models trained
+        for the same cutoff, config and data by an earlier run are reused.
+        """
+        config = config or {}
+        predictor = PointsPredictor(self.db, model_path=None, **config)
+        
+        # Load training data filtered by gameweek (shared feature builder)
+        try:
+            player_data, position_data = predictor.load_training_data(max_gw=max_gw)
+        except ValueError:
             return None
         
-        # Group by player and position
-        player_data = {}
-        position_data = {}
-        
-        for row in data:
-            element = row[0]
-            team_attack = row[2]
-            team_defense = row[3]
-            opp_attack = row[4]
-            opp_defense = row[5]
-            was_home = row[6]
-            total_points = row[7]
-            position = row[8]
-            
-            # Calculate differential features
-            attack_advantage = team_attack - opp_defense
-            defense_advantage = team_defense - opp_attack
-            
-            # Group by player
-            if element not in player_data:
-                player_data[element] = {'name': row[1], 'position': position, 'X': [], 'y': []}
-            player_data[element]['X'].append([attack_advantage, defense_advantage, was_home])
-            player_data[element]['y'].append(total_points)
-            
-            # Group by position
-            if position not in position_data:
-                position_data[position] = {'X': [], 'y': []}
-            position_data[position]['X'].append([attack_advantage, defense_advantage, was_home])
-            position_data[position]['y'].append(total_points)
+        if self.snapshot_cache is not None:
+            data_hash = training_data_hash(player_data, position_data)
+            snapshot = self.snapshot_cache.load(max_gw, config, data_hash)
+            if snapshot is not None:
+                predictor.models = snapshot['players']
+                predictor.position_models = snapshot['positions']
+                return predictor
         
         # Train position models first
         for position in position_data:
-            position_data[position]['X'] = np.array(position_data[position]['X'])
-            position_data[position]['y'] = np.array(position_data[position]['y'])
-            
             result = predictor.train_position_model(position_data[position]['X'], position_data[position]['y'])
             if result is not None:
                 model_dict, mae = result
@@ -106,9 +78,6 @@ class TestPredictionsGenerator:
         
         # Then train player-specific models
         for element in player_data:
-            player_data[element]['X'] = np.array(player_data[element]['X'])
-            player_data[element]['y'] = np.array(player_data[element]['y'])
-            
             result = predictor.train_model(player_data[element]['X'], player_data[element]['y'])
             if result is not None:
                 model_dict, mae = result
@@ -121,18 +90,44 @@ class TestPredictionsGenerator:
                     'mae': mae
                 }
         
+        if self.snapshot_cache is not None:
+            self.snapshot_cache.save(max_gw, config, data_hash, predictor.models, predictor.position_models)
+        
         return predictor
     
-    def get_team_valuations_up_to_gw(self, max_gw: int):
-        """Get team valuations using only data up to max_gw."""
-        with self.db.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT team, AVG(attack_value), AVG(defense_value)
-                FROM team_fixture_valuations
-                WHERE gw <= ?
-                GROUP BY team
-            """, (max_gw,))
-            return {row[0]: {'attack': row[1], 'defense': row[2]} for row in cursor}
+    def predict_gameweek_full_retrain(self, history: MatchHistory, test_gw: int, season: str, config: dict = None):
+        """Reference path: retrain from scratch on data before test_gw and predict row by row.
+        
+        Returns:
+            (predictions, predictor) with predictions in the WalkForwardBacktest
+            column format, or None if no training data is available
+        """
+        predictor = self.train_predictor_up_to_gw(test_gw - 1, config)
+        if predictor is None:
+            return None
+        
+        rows, team_attack, team_defense, opp_attack, opp_defense = history.gameweek_inputs(
+            test_gw, season, test_gw - 1
+        )
+        predicted = np.array([
+            predictor.predict(element, *values)
+            for element, *values in zip(history.element[rows].tolist(), team_attack, team_defense,
+                                        opp_attack, opp_defense, history.was_home[rows])
+        ], dtype=float)
+        actual = history.total_points[rows]
+        
+        predictions = {
+            'element': history.element[rows],
+            'name': history.name[rows],
+            'team': history.team[rows],
+            'opponent': history.opponent[rows],
+            'was_home': history.was_home[rows],
+            'position': history.positions[history.position_code[rows]],
+            'predicted_points': predicted,
+            'actual_points': actual,
+            'error': predicted - actual
+        }
+        return predictions, predictor
     
     def create_table(self):
         """Create test predictions table."""
@@ -157,8 +152,15 @@ class TestPredictionsGenerator:
             conn.execute("CREATE INDEX idx_test_player ON test_predictions(player_id)")
             conn.commit()
     
-    def run(self, season: str = "2025-26"):
-        """Generate test predictions and validate."""
+    def run(self, season: str = "2025-26", config: dict = None, full_retrain: bool = False):
+        """Generate test predictions and validate.
+        
+        Args:
+            season: Season to validate
+            config: WalkForwardBacktest hyperparameters (player_weight, lambda_penalty, min_samples)
+            full_retrain: Retrain a PointsPredictor from scratch for every gameweek
+                instead of using the incremental engine (slow reference path)
+        """
         print(f"\n{'='*60}")
         print("GENERATING TEST PREDICTIONS FOR VALIDATION")
         print(f"{'='*60}")
@@ -174,147 +176,236 @@ class TestPredictionsGenerator:
         test_gws = [gw for gw in available_gws if gw > 1]
         print(f"  ✓ Will test predictions for GW: {test_gws}")
         
-        all_predictions = []
+        # Load history once; the engine slices it per training cutoff
+        history = MatchHistory(self.db)
+        engine = WalkForwardBacktest(history, **(config or {}))
+        
+        chunks = []
         
         for test_gw in test_gws:
             print(f"\n  Testing GW {test_gw}:")
             
-            # Train on data up to previous gameweek
-            train_up_to = test_gw - 1
-            print(f"    Training on data up to GW {train_up_to}...")
-            predictor = self.train_predictor_up_to_gw(train_up_to)
+            # Train on data up to previous gameweek (only new matches are folded in)
+            print(f"    Training on data up to GW {test_gw - 1}...")
+            if full_retrain:
+                result = self.predict_gameweek_full_retrain(history, test_gw, season, config)
+                predictions, predictor = result if result is not None else (None, None)
+                n_position_models = len(predictor.position_models) if predictor else 0
+                n_player_models = len(predictor.models) if predictor else 0
+            else:
+                predictions = engine.predict_gameweek(test_gw, season)
+                n_position_models, n_player_models = engine.n_position_models, engine.n_player_models
             
-            if predictor is None or (not predictor.models and not predictor.position_models):
+            if predictions is None:
                 print(f"    ✗ No training data available")
                 continue
             
-            print(f"    ✓ Trained {len(predictor.position_models)} position models, {len(predictor.models)} player models")
-            
-            # Get team valuations up to training cutoff
-            team_valuations = self.get_team_valuations_up_to_gw(train_up_to)
-            
-            # Get actual matches from test gameweek
-            with self.db.get_connection() as conn:
-                matches = conn.execute("""
-                    SELECT element, name, team, opponent_team, was_home, total_points,
-                           team_attack_value, team_defense_value,
-                           opponent_attack_value, opponent_defense_value
-                    FROM player_match_context
-                    WHERE gw = ? AND season = ?
-                """, (test_gw, season)).fetchall()
+            print(f"    ✓ Trained {n_position_models} position models, {n_player_models} player models")
             
-            if not matches:
+            n_matches = len(predictions['element'])
+            if n_matches == 0:
                 print(f"    ✗ No match data found for GW {test_gw}")
                 continue
             
-            # Generate predictions
-            for match in matches:
-                player_id, name, team, opp, is_home, actual_pts, t_atk, t_def, o_atk, o_def = match
-                
-                # Use historic valuations if available, otherwise current
-                if team in team_valuations:
-                    team_attack = team_valuations[team]['attack']
-                    team_defense = team_valuations[team]['defense']
-                else:
-                    team_attack, team_defense = t_atk, t_def
-                
-                if opp in team_valuations:
-                    opp_attack = team_valuations[opp]['attack']
-                    opp_defense = team_valuations[opp]['defense']
-                else:
-                    opp_attack, opp_defense = o_atk, o_def
-                
-                pred_pts = predictor.predict(player_id, team_attack, team_defense, opp_attack, opp_defense, is_home)
-                error = pred_pts - actual_pts
-                
-                all_predictions.append((test_gw, player_id, name, team, opp, is_home, pred_pts, actual_pts, error))
+            predictions['test_gw'] = np.full(n_matches, test_gw)
+            chunks.append(predictions)
             
-            print(f"    ✓ Generated {len(matches)} predictions")
+            print(f"    ✓ Generated {n_matches} predictions")
+        
+        # Keep predictions as column arrays for metrics; rows are only built for the insert
+        all_predictions = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]} \
+            if chunks else {}
+        n_predictions = len(all_predictions['error']) if chunks else 0
         
         # Insert all predictions
-        if all_predictions:
+        if n_predictions:
             with self.db.get_connection() as conn:
                 conn.executemany("""
                     INSERT INTO test_predictions (
                         test_gw, player_id, player_name, team_name, opponent_name,
                         was_home, predicted_points, actual_points, error
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, all_predictions)
+                """, zip(
+                    all_predictions['test_gw'].tolist(),
+                    all_predictions['element'].tolist(),
+                    all_predictions['name'].tolist(),
+                    all_predictions['team'].tolist(),
+                    all_predictions['opponent'].tolist(),
+                    all_predictions['was_home'].astype(int).tolist(),
+                    all_predictions['predicted_points'].tolist(),
+                    all_predictions['actual_points'].astype(int).tolist(),
+                    all_predictions['error'].tolist()
+                ))
                 conn.commit()
         
-        print(f"\n  ✓ Generated {len(all_predictions)} test predictions")
+        print(f"\n  ✓ Generated {n_predictions} test predictions")
         
-        # Calculate validation metrics
-        self.display_validation_summary()
+        # Calculate validation metrics from the arrays and persist a compact record
+        if n_predictions:
+            metrics = compute_validation_metrics(all_predictions)
+            self.save_validation_metrics(metrics, season, config)
+            self.display_validation_summary(metrics)
         
-        return {'test_gameweeks': len(test_gws), 'predictions': len(all_predictions)}
+        return {'test_gameweeks': len(test_gws), 'predictions': n_predictions}
     
-    def display_validation_summary(self):
-        """Display validation metrics."""
-        print(f"\n{'='*60}")
-        print("VALIDATION SUMMARY")
-        print(f"{'='*60}")
-        
+    def save_validation_metrics(self, metrics: dict, season: str, config: dict = None):
+        """Append a compact metrics record so summaries never need to rescan test_predictions."""
         with self.db.get_connection() as conn:
-            # Overall metrics
-            cursor = conn.execute("""
-                SELECT 
-                    COUNT(*) as n,
-                    AVG(ABS(error)) as mae,
-                    AVG(error * error) as mse,
-                    AVG(predicted_points) as avg_pred,
-                    AVG(actual_points) as avg_actual
-                FROM test_predictions
-            """)
-            row = cursor.fetchone()
-            n, mae, mse, avg_pred, avg_actual = row
-            rmse = np.sqrt(mse) if mse else 0
-            
-            print(f"\nOverall Metrics ({n} predictions):")
-            print(f"  MAE (Mean Absolute Error):  {mae:.2f} points")
-            print(f"  RMSE (Root Mean Squared):   {rmse:.2f} points")
-            print(f"  Average Predicted Points:   {avg_pred:.2f}")
-            print(f"  Average Actual Points:      {avg_actual:.2f}")
-            
-            # Per gameweek breakdown
-            print(f"\nPer Gameweek Breakdown:")
-            cursor = conn.execute("""
-                SELECT 
-                    test_gw,
-                    COUNT(*) as n,
-                    AVG(ABS(error)) as mae,
-                    AVG(predicted_points) as avg_pred,
-                    AVG(actual_points) as avg_actual
-                FROM test_predictions
-                GROUP BY test_gw
-                ORDER BY test_gw
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS validation_metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    season TEXT NOT NULL,
+                    config TEXT,
+                    predictions INTEGER NOT NULL,
+                    mae REAL,
+                    rmse REAL,
+                    metrics TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
             """)
-            for row in cursor:
-                gw, n, mae, avg_pred, avg_actual = row
-                print(f"  GW {gw:2d}: MAE={mae:.2f}, Pred={avg_pred:.2f}, Actual={avg_actual:.2f} ({n} predictions)")
-            
-            # Best and worst predictions
-            print(f"\nBest Predictions (smallest error):")
+            overall = metrics['overall']
+            conn.execute("""
+                INSERT INTO validation_metrics (season, config, predictions, mae, rmse, metrics)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (season, json.dumps(config or {}), overall['n'], overall['mae'], overall['rmse'],
+                  json.dumps(metrics)))
+            conn.commit()
+    
+    def load_latest_validation_metrics(self):
+        """Load the most recently saved metrics record (None if there is none)."""
+        with self.db.get_connection() as conn:
             cursor = conn.execute("""
-                SELECT player_name, team_name, test_gw, predicted_points, actual_points, ABS(error) as abs_error
-                FROM test_predictions
-                ORDER BY abs_error ASC
-                LIMIT 5
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name='validation_metrics'
             """)
-            for row in cursor:
-                name, team, gw, pred, actual, err = row
-                print(f"  {name:20s} ({team:15s}) GW{gw}: Pred={pred:4.1f}, Actual={actual:2d}, Error={err:.1f}")
-            
-            print(f"\nWorst Predictions (largest error):")
-            cursor = conn.execute("""
-                SELECT player_name, team_name, test_gw, predicted_points, actual_points, ABS(error) as abs_error
-                FROM test_predictions
-                ORDER BY abs_error DESC
-                LIMIT 5
+            if cursor.fetchone() is None:
+                return None
+            row = conn.execute("SELECT metrics FROM validation_metrics ORDER BY id DESC LIMIT 1").fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def create_grid_table(self):
+        """Create backtest results table for hyperparameter grid runs."""
+        with self.db.get_connection() as conn:
+            conn.execute("DROP TABLE IF EXISTS backtest_results")
+            conn.execute("""
+                CREATE TABLE backtest_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    config_id INTEGER NOT NULL,
+                    player_weight REAL NOT NULL,
+                    lambda_penalty REAL NOT NULL,
+                    min_samples INTEGER NOT NULL,
+                    test_gw INTEGER NOT NULL,
+                    predictions INTEGER NOT NULL,
+                    mae REAL,
+                    rmse REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
             """)
-            for row in cursor:
-                name, team, gw, pred, actual, err = row
-                print(f"  {name:20s} ({team:15s}) GW{gw}: Pred={pred:4.1f}, Actual={actual:2d}, Error={err:.1f}")
+            conn.execute("CREATE INDEX idx_backtest_config ON backtest_results(config_id)")
+            conn.commit()
+    
+    def run_grid(self, grid: dict, season: str = "2025-26", max_workers: int = None):
+        """Backtest every hyperparameter combination in grid across a process pool.
+        
+        Args:
+            grid: Mapping of player_weight / lambda_penalty / min_samples to candidate values
+            season: Season to validate
+            max_workers: Worker processes (default: CPU count)
+        """
+        print(f"\n{'='*60}")
+        print("BACKTESTING HYPERPARAMETER GRID")
+        print(f"{'='*60}")
+        
+        self.create_grid_table()
+        
+        available_gws = self.get_available_gameweeks(season)
+        test_gws = [gw for gw in available_gws if gw > 1]
+        if not test_gws:
+            print("  ⚠ Not enough gameweeks for testing (need at least 2)")
+            return {'configs': 0, 'runs': 0}
+        
+        configs = expand_grid(grid)
+        print(f"  ✓ {len(configs)} configs x {len(test_gws)} gameweeks = {len(configs) * len(test_gws)} runs, one task per config")
+        
+        history = MatchHistory(self.db)
+        results = run_backtest_grid(history, configs, test_gws, season, max_workers=max_workers)
+        
+        with self.db.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO backtest_results (
+                    config_id, player_weight, lambda_penalty, min_samples,
+                    test_gw, predictions, mae, rmse
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (run['config_id'], run['player_weight'], run['lambda_penalty'], run['min_samples'],
+                 run['test_gw'], run['predictions'], run['mae'], run['rmse'])
+                for run in results['runs']
+            ])
+            conn.commit()
+        
+        summary = results['summary']
+        print(f"\n{'Weight':>8} {'Lambda':>8} {'MinN':>6} {'MAE':>7} {'RMSE':>7}")
+        for row in summary:
+            print(f"{row['player_weight']:8.2f} {row['lambda_penalty']:8.2f} {row['min_samples']:6d} "
+                  f"{row['mae']:7.3f} {row['rmse']:7.3f}")
+        
+        if summary:
+            best_mae = summary[0]
+            best_rmse = min(summary, key=lambda row: row['rmse'])
+            for label, best in (('MAE', best_mae), ('RMSE', best_rmse)):
+                print(f"\n  ✓ Best by {label}: player_weight={best['player_weight']}, "
+                      f"lambda_penalty={best['lambda_penalty']}, min_samples={best['min_samples']} "
+                      f"(MAE={best['mae']:.3f}, RMSE={best['rmse']:.3f})")
+        
+        return {'configs': len(configs), 'runs': len(results['runs']), 'summary': summary}
+    
+    def display_validation_summary(self, metrics: dict = None):
+        """Display validation metrics.
+        
+        Args:
+            metrics: Output of compute_validation_metrics (default: latest saved record)
+        """
+        if metrics is None:
+            metrics = self.load_latest_validation_metrics()
+            if metrics is None:
+                print("  ⚠ No validation metrics saved yet - run the validation first")
+                return
+        
+        print(f"\n{'='*60}")
+        print("VALIDATION SUMMARY")
+        print(f"{'='*60}")
+        
+        # Overall metrics
+        overall = metrics['overall']
+        print(f"\nOverall Metrics ({overall['n']} predictions):")
+        print(f"  MAE (Mean Absolute Error):  {overall['mae']:.2f} points")
+        print(f"  RMSE (Root Mean Squared):   {overall['rmse']:.2f} points")
+        print(f"  Average Predicted Points:   {overall['avg_pred']:.2f}")
+        print(f"  Average Actual Points:      {overall['avg_actual']:.2f}")
+        
+        # Per gameweek breakdown
+        print(f"\nPer Gameweek Breakdown:")
+        for row in metrics['by_gameweek']:
+            print(f"  GW {row['gw']:2d}: MAE={row['mae']:.2f}, Pred={row['avg_pred']:.2f}, "
+                  f"Actual={row['avg_actual']:.2f} ({row['n']} predictions)")
+        
+        # Per position breakdown
+        print(f"\nPer Position Breakdown:")
+        for row in metrics['by_position']:
+            label = row['position'] or 'UNK'
+            print(f"  {label:3s}: MAE={row['mae']:.2f}, RMSE={row['rmse']:.2f}, Pred={row['avg_pred']:.2f}, "
+                  f"Actual={row['avg_actual']:.2f} ({row['n']} predictions)")
+        
+        # Best and worst predictions
+        print(f"\nBest Predictions (smallest error):")
+        for row in metrics['best']:
+            print(f"  {row['name']:20s} ({row['team']:15s}) GW{row['gw']}: Pred={row['predicted']:4.1f}, "
+                  f"Actual={row['actual']:2d}, Error={row['abs_error']:.1f}")
+        
+        print(f"\nWorst Predictions (largest error):")
+        for row in metrics['worst']:
+            print(f"  {row['name']:20s} ({row['team']:15s}) GW{row['gw']}: Pred={row['predicted']:4.1f}, "
+                  f"Actual={row['actual']:2d}, Error={row['abs_error']:.1f}")
         
         print(f"{'='*60}\n")
 
@@ -337,18 +428,82 @@ def main():
         help='Season to validate (default: 2025-26)'
     )
     
+    parser.add_argument(
+        '--player-weight',
+        type=float,
+        nargs='+',
+        default=[0.75],
+        help='Player model blend weight(s) (default: 0.75)'
+    )
+    parser.add_argument(
+        '--lambda-penalty',
+        type=float,
+        nargs='+',
+        default=[1.0],
+        help='Variance penalty strength(s) for player models (default: 1.0)'
+    )
+    parser.add_argument(
+        '--min-samples',
+        type=int,
+        nargs='+',
+        default=[5],
+        help='Minimum matches before a player gets their own model (default: 5)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes for grid backtests (default: CPU count)'
+    )
+    parser.add_argument(
+        '--full-retrain',
+        action='store_true',
+        help='Retrain from scratch for every gameweek instead of the incremental engine (slow reference path)'
+    )
+    parser.add_argument(
+        '--snapshot-dir',
+        type=str,
+        default=None,
+        help='With --full-retrain, reuse models trained by earlier runs on unchanged data (default: no caching)'
+    )
+    
     args = parser.parse_args()
     
+    grid = {
+        'player_weight': args.player_weight,
+        'lambda_penalty': args.lambda_penalty,
+        'min_samples': args.min_samples
+    }
+    
+    # Only the full-retrain path trains PointsPredictor models that can be snapshotted
+    if args.full_retrain and any(len(values) > 1 for values in grid.values()):
+        parser.error("--full-retrain runs a single config; grid backtests always use the incremental engine")
+    if args.snapshot_dir and not args.full_retrain:
+        parser.error("--snapshot-dir requires --full-retrain (the incremental engine trains in memory)")
+    
     # Initialize database
     db = FPLDatabase(args.db_path)
+    snapshot_cache = ModelSnapshotCache(args.snapshot_dir) if args.snapshot_dir else None
+    validator = TestPredictionsGenerator(db, snapshot_cache=snapshot_cache)
+    
+    # Several values for any hyperparameter: run the parallel grid backtest
+    if any(len(values) > 1 for values in grid.values()):
+        results = validator.run_grid(grid, season=args.season, max_workers=args.workers)
+        print(f"\nGrid backtest complete!")
+        print(f"  Configs: {results['configs']}")
+        print(f"  Runs: {results['runs']}")
+        print(f"  Results saved to: backtest_results table in {args.db_path}\n")
+        return results
     
     # Run validation
-    validator = TestPredictionsGenerator(db)
-    results = validator.run(season=args.season)
+    config = {key: values[0] for key, values in grid.items()}
+    results = validator.run(season=args.season, config=config, full_retrain=args.full_retrain)
     
     print(f"\nValidation complete!")
     print(f"  Test gameweeks: {results['test_gameweeks']}")
     print(f"  Total predictions: {results['predictions']}")
+    if snapshot_cache is not None:
+        print(f"  Model snapshots: {snapshot_cache.hits} reused, {snapshot_cache.misses} trained")
     print(f"  Results saved to: test_predictions table in {args.db_path}\n")
     
     return results
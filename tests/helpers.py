@@ -0,0 +1,198 @@
+"""
+Synthetic FPL data for the tests.
+
+Everything is generated from a NumPy Generator, so each test controls its own
+seed and the data stays small enough for exhaustive reference checks.
+"""
+
+import io
+import contextlib
+import numpy as np
+import pandas as pd
+from fpl_agent.database import FPLDatabase
+from fpl_agent.pipeline import TeamValuationCalculator, PlayerMatchContextBuilder
+from fpl_agent.validation import POSITIONS, SQUAD_REQUIREMENTS, MAX_PER_TEAM, BUDGET_TENTHS
+
+SEASON = '2025-26'
+
+# (position, element_type, players per team) for generated match histories
+HISTORY_SQUAD = (('GK', 1, 2), ('DEF', 2, 4), ('MID', 3, 4), ('FWD', 4, 3))
+
+
+def quiet():
+    """Swallow the progress output of the code under test."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def make_players(rng: np.random.Generator, per_position: int = 10, n_clubs: int = 8,
+                 cost_range=(35, 90), cost_step: int = 1, points_step: float = 0.0) -> pd.DataFrame:
+    """Candidate players in the player_summary layout (cost in tenths, price in £m).
+    
+    Args:
+        rng: Random generator
+        per_position: Players generated for each position
+        n_clubs: Clubs (team ids 1..n_clubs) players are spread over
+        cost_range: Inclusive cost range in tenths of £1m
+        cost_step: Costs are multiples of this, so larger steps give more price ties
+        points_step: Round predicted points to multiples of this (0 = no rounding)
+    """
+    n = per_position * len(POSITIONS)
+    low, high = cost_range
+    costs = rng.integers(low // cost_step, high // cost_step + 1, n) * cost_step
+    points = rng.gamma(2.0, 3.0, n)
+    if points_step:
+        points = np.round(points / points_step) * points_step
+    ids = np.arange(1, n + 1)
+    return pd.DataFrame({
+        'id': ids,
+        'name': [f"P{player_id}" for player_id in ids],
+        'position': np.repeat(POSITIONS, per_position),
+        'team': rng.integers(1, n_clubs + 1, n),
+        'cost': costs,
+        'price': costs / 10,
+        'predicted_points': points
+    })
+
+
+def make_squad(rng: np.random.Generator, players: pd.DataFrame) -> pd.DataFrame:
+    """A random valid squad drawn from players, rows in random order."""
+    for _ in range(1000):
+        picks = np.concatenate([
+            rng.choice(np.flatnonzero(players['position'] == pos), SQUAD_REQUIREMENTS[pos], replace=False)
+            for pos in POSITIONS
+        ])
+        squad = players.iloc[rng.permutation(picks)].reset_index(drop=True)
+        if squad['team'].value_counts().max() <= MAX_PER_TEAM and squad['cost'].sum() <= BUDGET_TENTHS:
+            return squad
+    raise ValueError("No valid squad found in the player pool")
+
+
+def team_json(squad: pd.DataFrame) -> dict:
+    """A squad DataFrame in the current-team JSON layout."""
+    return {'team': [
+        {'position': pos, 'players': [
+            {'id': int(player_id), 'name': name, 'team': int(team)}
+            for player_id, name, team in zip(group['id'], group['name'], group['team'])
+        ]}
+        for pos, group in ((pos, squad[squad['position'] == pos]) for pos in POSITIONS)
+    ]}
+
+
+def build_prediction_db(path: str, players: pd.DataFrame, weekly_points: np.ndarray, next_gw: int = 5,
+                        num_weeks: int = None) -> FPLDatabase:
+    """Create a database whose upcoming predictions are the given players and points.
+    
+    Only the tables the loaders read are filled: teams, elements, one finished
+    fixture before next_gw, a minimal final_predictions table and
+    player_summary.
+    
+    Args:
+        path: SQLite database file to create
+        players: Players as returned by make_players
+        weekly_points: Predicted points, shape (n_players, n_weeks), for gameweeks from next_gw
+        next_gw: First upcoming gameweek
+        num_weeks: Weeks player_summary sums over (default: all of weekly_points)
+    """
+    db = FPLDatabase(path)
+    db.create_elements_table()
+    db.create_teams_table()
+    db.create_fixtures_table()
+    
+    n_weeks = weekly_points.shape[1]
+    clubs = sorted(set(players['team'].tolist()))
+    with db.get_connection() as conn:
+        conn.executemany("INSERT INTO teams (id, name, short_name) VALUES (?, ?, ?)",
+                         [(club, f"Club{club}", f"C{club}") for club in clubs])
+        conn.executemany("""
+            INSERT INTO elements (id, web_name, element_type_name, element_type, team, team_name, now_cost, can_select)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+        """, [(int(player_id), name, position, POSITIONS.index(position) + 1, int(team), f"Club{team}", int(cost))
+              for player_id, name, position, team, cost in zip(
+                  players['id'], players['name'], players['position'], players['team'], players['cost'])])
+        conn.execute("""
+            INSERT INTO fixtures (id, event, finished, kickoff_time, team_h, team_a)
+            VALUES (1, ?, 1, '2025-08-01', ?, ?)
+        """, (next_gw - 1, clubs[0], clubs[1]))
+        conn.execute("DROP TABLE IF EXISTS final_predictions")
+        conn.execute("CREATE TABLE final_predictions (player_id INTEGER, gameweek INTEGER, predicted_points REAL)")
+        conn.executemany("INSERT INTO final_predictions VALUES (?, ?, ?)", [
+            (int(player_id), next_gw + week, float(weekly_points[row, week]))
+            for row, player_id in enumerate(players['id']) for week in range(n_weeks)
+        ])
+        conn.commit()
+    
+    db.create_player_summary_table()
+    db.populate_player_summary(num_weeks=num_weeks or n_weeks)
+    return db
+
+
+def build_history_db(path: str, rng: np.random.Generator, n_teams: int = 6, n_gws: int = 8) -> FPLDatabase:
+    """Create a database with a played round robin and its derived match context.
+    
+    Points are Poisson draws scaled by the relative strength of the two teams,
+    so the prediction models have something to fit. Team valuations and
+    player_match_context are built by the pipeline steps themselves.
+    
+    Args:
+        path: SQLite database file to create
+        rng: Random generator
+        n_teams: Number of teams (even)
+        n_gws: Number of finished gameweeks
+    """
+    db = FPLDatabase(path)
+    db.create_elements_table()
+    db.create_teams_table()
+    db.create_fixtures_table()
+    db.create_player_gameweek_history_table()
+    
+    teams = [(team_id, f"Team{team_id}") for team_id in range(1, n_teams + 1)]
+    players = []
+    for team_id, team_name in teams:
+        for position, element_type, count in HISTORY_SQUAD:
+            for _ in range(count):
+                player_id = len(players) + 1
+                players.append((player_id, f"P{player_id}", position, element_type, team_id, team_name,
+                                int(rng.integers(40, 110))))
+    
+    # Circle-method round robin: team 1 stays put, the others rotate each gameweek
+    fixtures = []
+    others = [team_id for team_id, _ in teams[1:]]
+    for gw in range(1, n_gws + 1):
+        shift = gw % len(others)
+        order = [teams[0][0]] + others[shift:] + others[:shift]
+        for k in range(n_teams // 2):
+            fixtures.append((len(fixtures) + 1, gw, 1, f"2025-08-{gw:02d}", order[k], order[-1 - k]))
+    
+    with db.get_connection() as conn:
+        conn.executemany("INSERT INTO teams (id, name, short_name) VALUES (?, ?, ?)",
+                         [(team_id, name, name[:3]) for team_id, name in teams])
+        conn.executemany("""
+            INSERT INTO elements (id, web_name, element_type_name, element_type, team, team_name, now_cost, can_select)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+        """, players)
+        conn.executemany("""
+            INSERT INTO fixtures (id, event, finished, kickoff_time, team_h, team_a)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, fixtures)
+        conn.commit()
+    
+    strength = rng.uniform(0.5, 1.5, n_teams + 1)
+    for gw in range(1, n_gws + 1):
+        rows = []
+        for fixture_id, _, _, _, home, away in (f for f in fixtures if f[1] == gw):
+            for was_home, team, opponent in ((True, home, away), (False, away, home)):
+                for player_id, name, position, _, team_id, team_name, cost in players:
+                    if team_id != team:
+                        continue
+                    rows.append({
+                        'element': player_id, 'name': name, 'position': position, 'team': team_name,
+                        'fixture': fixture_id, 'opponent_team': opponent,
+                        'total_points': int(rng.poisson(3 * strength[team] / strength[opponent])),
+                        'was_home': was_home, 'starts': 1, 'value': cost, 'minutes': 90
+                    })
+        db.insert_gameweek_data(SEASON, gw, pd.DataFrame(rows))
+    
+    with quiet():
+        TeamValuationCalculator(db).run()
+        PlayerMatchContextBuilder(db).run()
+    return db
@@ -0,0 +1,105 @@
+"""
+JSON API responses against calling the library directly.
+"""
+
+import numpy as np
+import pytest
+from backend.app import create_app
+from fpl_agent import FPLDatabase, FPLSquadOptimizer, FPLTransferOptimizer
+from tests.helpers import build_prediction_db, make_players, make_squad, quiet, team_json
+
+NUM_WEEKS = 3
+
+
+@pytest.fixture
+def api(tmp_path):
+    """Test client over a fresh prediction database, with the pieces needed to check its answers."""
+    rng = np.random.default_rng(47)
+    players = make_players(rng, per_position=20, n_clubs=10, cost_range=(40, 110))
+    db_path = str(tmp_path / 'fpl.db')
+    build_prediction_db(db_path, players, rng.gamma(2.0, 2.0, (len(players), NUM_WEEKS + 1)), num_weeks=NUM_WEEKS)
+    with quiet():
+        app = create_app(db_path, num_weeks=NUM_WEEKS, pool_size=2)
+    client = app.test_client()
+    client.rng, client.players, client.db_path = rng, players, db_path
+    return client
+
+
+def summary(db_path):
+    """Player rows for the API's horizon, as the library loads them."""
+    with quiet():
+        return FPLDatabase(db_path).load_player_data(num_weeks=NUM_WEEKS)
+
+
+def test_players_are_ranked_and_filtered_like_the_summary(api):
+    expected = summary(api.db_path).sort_values(['predicted_points', 'id'], ascending=[False, True])
+    
+    top = api.get('/api/players?limit=10').get_json()
+    assert [row[0] for row in top['rows']] == expected['id'].head(10).tolist()
+    assert top['num_weeks'] == NUM_WEEKS
+    
+    midfielders = api.get('/api/players?position=MID&limit=1000').get_json()
+    assert [row[0] for row in midfielders['rows']] == expected.loc[expected['position'] == 'MID', 'id'].tolist()
+    
+    club = int(expected['team'].iloc[0])
+    from_club = api.get(f'/api/players?team={club}&limit=1000').get_json()
+    assert [row[0] for row in from_club['rows']] == expected.loc[expected['team'] == club, 'id'].tolist()
+
+
+def test_single_player_and_errors(api):
+    expected = summary(api.db_path).set_index('id')
+    player_id = int(expected.index[0])
+    
+    player = api.get(f'/api/players/{player_id}').get_json()
+    
+    assert player['predicted_points'] == pytest.approx(expected.loc[player_id, 'predicted_points'])
+    assert api.get('/api/players/999999').status_code == 404
+    assert api.get('/api/players?position=GKP').status_code == 400
+    assert api.get('/api/players?limit=0').status_code == 400
+
+
+def test_points_stay_on_the_service_horizon(api):
+    """After another process rebuilds player_summary for one week, the API still serves three-week sums."""
+    player_id = int(summary(api.db_path)['id'].iloc[0])
+    expected = api.get(f'/api/players/{player_id}').get_json()['predicted_points']
+    
+    with quiet():
+        FPLDatabase(api.db_path).populate_player_summary(num_weeks=1)
+        player = api.get(f'/api/players/{player_id}').get_json()
+    
+    assert player['predicted_points'] == pytest.approx(expected)
+
+
+def test_optimal_squad_is_resolved_for_new_data(api):
+    """The squad matches a direct solve, is served from cache, and is solved again after new predictions."""
+    for _ in range(2):
+        with quiet():
+            response = api.get('/api/squad/optimal').get_json()
+            cached = api.get('/api/squad/optimal').get_json()
+            expected = FPLSquadOptimizer(api.db_path, num_weeks=NUM_WEEKS).solve()
+        
+        assert cached == response
+        assert response['total_predicted_points'] == pytest.approx(expected['total_predicted_points'], rel=1e-4)
+        assert len(response['squad']['rows']) == 15
+        
+        build_prediction_db(api.db_path, api.players, api.rng.gamma(2.0, 2.0, (len(api.players), NUM_WEEKS + 1)),
+                            num_weeks=NUM_WEEKS)
+
+
+@pytest.mark.parametrize('k', [1, 2])
+def test_transfers_match_the_optimizer(api, k):
+    team = team_json(make_squad(api.rng, api.players))
+    
+    with quiet():
+        response = api.post(f'/api/transfers?k={k}&top_n=3', json=team).get_json()
+        optimizer = FPLTransferOptimizer(api.db_path)
+        if k == 1:
+            expected = [t['points_gain'] for t in optimizer.find_best_transfer(team, num_weeks=NUM_WEEKS)['best_transfers']]
+            found = [t['points_gain'] for t in response['best_transfers']]
+        else:
+            plans = optimizer.find_best_transfers(team, k=k, num_weeks=NUM_WEEKS, top_n=3)['best_plans']
+            expected = [plan['points_gain'] for plan in plans]
+            found = [plan['points_gain'] for plan in response['best_plans']]
+    
+    assert found == pytest.approx(expected)
+    assert api.post('/api/transfers', json={'players': []}).status_code == 400
@@ -0,0 +1,67 @@
+"""
+The incremental walk-forward engine against the full-retrain reference path,
+and the grid runner against walking each config by hand.
+"""
+
+import numpy as np
+import pytest
+from fpl_agent.backtest import MatchHistory, WalkForwardBacktest, expand_grid, run_backtest_grid
+from scripts import validate_predictions
+from tests.helpers import SEASON, build_history_db, quiet
+
+N_GWS = 8
+
+
+@pytest.fixture(scope='module')
+def history_db(tmp_path_factory):
+    return build_history_db(str(tmp_path_factory.mktemp('backtest') / 'history.db'),
+                            np.random.default_rng(27), n_gws=N_GWS)
+
+
+@pytest.mark.parametrize('config', [
+    {},
+    {'min_samples': 3, 'player_weight': 0.5},
+    {'min_samples': 2, 'lambda_penalty': 2.0, 'player_weight': 1.0}
+])
+def test_incremental_predictions_match_full_retrain(history_db, config):
+    """Walking one engine forward predicts what a fresh PointsPredictor per gameweek predicts."""
+    history = MatchHistory(history_db)
+    engine = WalkForwardBacktest(history, **config)
+    reference = validate_predictions.TestPredictionsGenerator(history_db)
+    
+    for test_gw in range(2, N_GWS + 1):
+        incremental = engine.predict_gameweek(test_gw, SEASON)
+        with quiet():
+            full, _ = reference.predict_gameweek_full_retrain(history, test_gw, SEASON, config)
+        
+        assert len(incremental['element']) > 0
+        np.testing.assert_array_equal(incremental['element'], full['element'])
+        np.testing.assert_allclose(incremental['predicted_points'], full['predicted_points'],
+                                   rtol=1e-9, atol=1e-9)
+
+
+def test_cutoff_cannot_move_back(history_db):
+    engine = WalkForwardBacktest(MatchHistory(history_db))
+    engine.advance_to(5)
+    with pytest.raises(ValueError):
+        engine.advance_to(4)
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_grid_summary_matches_single_engine_runs(history_db, max_workers):
+    """Pooled grid errors equal the errors of each config walked forward on its own."""
+    history = MatchHistory(history_db)
+    configs = expand_grid({'player_weight': [0.5, 1.0], 'min_samples': [2, 4]})
+    test_gws = list(range(3, N_GWS + 1))
+    
+    result = run_backtest_grid(history, configs, test_gws, SEASON, max_workers=max_workers)
+    
+    assert len(result['runs']) == len(configs) * len(test_gws)
+    summary = {row['config_id']: row for row in result['summary']}
+    for config_id, config in enumerate(configs):
+        engine = WalkForwardBacktest(history, **config)
+        errors = np.concatenate([engine.predict_gameweek(test_gw, SEASON)['error'] for test_gw in test_gws])
+        assert summary[config_id]['predictions'] == len(errors)
+        assert summary[config_id]['mae'] == pytest.approx(np.abs(errors).mean())
+        assert summary[config_id]['rmse'] == pytest.approx(np.sqrt(np.square(errors).mean()))
+    assert [row['mae'] for row in result['summary']] == sorted(row['mae'] for row in result['summary'])
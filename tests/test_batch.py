@@ -0,0 +1,104 @@
+"""
+Bulk squad analysis against analysing each squad on its own.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from fpl_agent.batch import RESULT_COLUMNS, analyze_squads, load_squads, write_columns
+from fpl_agent.transfers import FPLTransferOptimizer
+from fpl_agent.validation import FPLValidator, POSITIONS, SQUAD_REQUIREMENTS, VIOLATION_SQUAD_SIZE
+from tests.helpers import build_prediction_db, make_players, quiet, team_json
+
+
+@pytest.fixture(scope='module')
+def league(tmp_path_factory):
+    """A prediction database and squads of every kind: valid, rule-breaking, short and unknown players."""
+    rng = np.random.default_rng(50)
+    players = make_players(rng, per_position=15, n_clubs=8, cost_range=(35, 85))
+    db_path = str(tmp_path_factory.mktemp('batch') / 'fpl.db')
+    weekly_points = rng.gamma(2.0, 2.0, (len(players), 3))
+    build_prediction_db(db_path, players, weekly_points)
+    players['predicted_points'] = weekly_points.sum(axis=1)  # What player_summary holds
+    
+    squads = []
+    for entry in range(60):
+        # Right position counts, but club cap and budget unchecked
+        picks = np.concatenate([rng.choice(np.flatnonzero(players['position'] == pos), SQUAD_REQUIREMENTS[pos],
+                                           replace=False) for pos in POSITIONS])
+        team = team_json(players.iloc[rng.permutation(picks)])
+        starters = set(rng.choice(picks, 11, replace=False).tolist())
+        for group in team['team']:
+            for player in group['players']:
+                player['is_starter'] = player['id'] - 1 in starters
+        squads.append({'entry': f"team{entry}", **team})
+    short = json.loads(json.dumps(squads[0]))
+    short['team'][1]['players'].pop()
+    unknown = json.loads(json.dumps(squads[1]))
+    unknown['team'][0]['players'][0]['id'] = 999999
+    squads += [short, unknown]
+    return db_path, players, squads
+
+
+def analyze_one(db_path, players, squad):
+    """Violations, saved and best XI points and best transfer gain of one squad, the single-squad way."""
+    ids = [player['id'] for group in squad['team'] for player in group['players']]
+    team = players.set_index('id').loc[ids].reset_index()
+    team['is_starter'] = [player['is_starter'] for group in squad['team'] for player in group['players']]
+    violations = FPLValidator.constraint_violations(*FPLValidator.encode_team(team))
+    if violations:
+        return violations, None, None, None
+    
+    optimizer = FPLTransferOptimizer(db_path)
+    with quiet():
+        result = optimizer._find_best_transfer(squad, 3, optimizer.candidate_pool(3), squad_key=None)
+    best = result['best_transfers'][0]['points_gain'] if result['best_transfers'] else np.nan
+    saved = team.loc[team['is_starter'], 'predicted_points'].sum()
+    return 0, saved, result['current_team_points'], best
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_batch_matches_single_squad_analysis(league, max_workers):
+    db_path, players, squads = league
+    
+    with quiet():
+        columns = analyze_squads(db_path, squads, num_weeks=3, max_workers=max_workers, chunk_size=16)['columns']
+    
+    assert list(columns) == list(RESULT_COLUMNS)
+    for index, squad in enumerate(squads[:-2]):
+        violations, saved, best_xi, gain = analyze_one(db_path, players, squad)
+        assert columns['entry'][index] == squad['entry']
+        assert columns['violations'][index] == violations
+        assert columns['valid'][index] == (violations == 0)
+        if violations:
+            assert np.isnan(columns['best_xi_points'][index]) and columns['transfer_in_id'][index] == -1
+            continue
+        assert columns['saved_xi_points'][index] == pytest.approx(saved)
+        assert columns['best_xi_points'][index] == pytest.approx(best_xi)
+        assert columns['transfer_points_gain'][index] == pytest.approx(gain)
+        
+        # The reported swap really gives the reported gain (ties may pick a different swap)
+        ids = [player['id'] for group in squad['team'] for player in group['players']]
+        ids[ids.index(columns['transfer_out_id'][index])] = columns['transfer_in_id'][index]
+        new_squad = players.set_index('id').loc[ids]
+        assert FPLValidator.best_xi_points(new_squad['predicted_points'], new_squad['position']) == \
+            pytest.approx(columns['new_xi_points'][index])
+    
+    assert 0 < columns['valid'].sum() < len(squads) - 2
+    assert columns['violations'][-2] == VIOLATION_SQUAD_SIZE
+    assert 'not found' in columns['error'][-1] and not columns['valid'][-1]
+
+
+def test_squads_and_results_round_trip_through_files(league, tmp_path):
+    db_path, _, squads = league
+    squads_path = tmp_path / 'squads.jsonl'
+    squads_path.write_text('\n'.join(json.dumps(squad) for squad in squads[:5]))
+    
+    with quiet():
+        columns = analyze_squads(db_path, load_squads(str(squads_path)), max_workers=1)['columns']
+    write_columns(columns, str(tmp_path / 'results.csv'))
+    written = pd.read_csv(tmp_path / 'results.csv')
+    
+    assert written['entry'].tolist() == [squad['entry'] for squad in squads[:5]]
+    np.testing.assert_allclose(written['best_xi_points'], columns['best_xi_points'])
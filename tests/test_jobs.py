@@ -0,0 +1,109 @@
+"""
+Background job queue: deduplication, caching, failures, and worker results
+that match solving in process.
+"""
+
+import time
+import numpy as np
+import pytest
+from fpl_agent.jobs import FPLJobQueue, JOB_DONE, JOB_FAILED, JOB_UNKNOWN, optimize_squad
+from fpl_agent.optimizer import FPLSquadOptimizer
+from tests.helpers import build_prediction_db, make_players, quiet
+
+
+def record_call(path, value, delay=0.0):
+    """Job: append value to a file (one line per run) and return it."""
+    time.sleep(delay)
+    with open(path, 'a') as f:
+        f.write(f"{value}\n")
+    return value
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def wait_for(queue, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while queue.status(job_id) not in (JOB_DONE, JOB_FAILED):
+        assert time.monotonic() < deadline, f"job {job_id} did not finish"
+        time.sleep(0.01)
+    return queue.status(job_id)
+
+
+@pytest.fixture
+def queue():
+    queue = FPLJobQueue(max_workers=2, max_results=2)
+    yield queue
+    queue.shutdown()
+
+
+def test_job_ids_depend_only_on_the_request():
+    assert FPLJobQueue.make_job_id('squad', db='a.db', weeks=3) == FPLJobQueue.make_job_id('squad', weeks=3, db='a.db')
+    assert FPLJobQueue.make_job_id('squad', db='a.db', weeks=3) != FPLJobQueue.make_job_id('squad', db='a.db', weeks=4)
+    assert FPLJobQueue.make_job_id('squad', weeks=3) != FPLJobQueue.make_job_id('transfer', weeks=3)
+
+
+def test_identical_submissions_run_once(queue, tmp_path):
+    """Resubmitting a running or finished job neither reruns it nor changes its result."""
+    log = tmp_path / 'calls.txt'
+    job_id = FPLJobQueue.make_job_id('record', value=1)
+    
+    for _ in range(3):
+        assert queue.submit(job_id, record_call, str(log), 1, 0.3) == job_id
+    assert wait_for(queue, job_id) == JOB_DONE
+    queue.submit(job_id, record_call, str(log), 1)
+    
+    assert queue.result(job_id) == 1
+    assert log.read_text().splitlines() == ['1']
+
+
+def test_failed_jobs_report_and_can_be_retried(queue, tmp_path):
+    job_id = FPLJobQueue.make_job_id('flaky')
+    queue.submit(job_id, fail, 'no solution')
+    
+    assert wait_for(queue, job_id) == JOB_FAILED
+    with pytest.raises(RuntimeError, match='ValueError: no solution'):
+        queue.result(job_id)
+    
+    queue.submit(job_id, record_call, str(tmp_path / 'calls.txt'), 'retried')
+    assert wait_for(queue, job_id) == JOB_DONE
+    assert queue.result(job_id) == 'retried'
+
+
+def test_result_cache_drops_the_least_recently_used(queue, tmp_path):
+    log = str(tmp_path / 'calls.txt')
+    first, second, third = (FPLJobQueue.make_job_id('record', value=value) for value in range(3))
+    for job_id, value in ((first, 0), (second, 1)):
+        queue.submit(job_id, record_call, log, value)
+        wait_for(queue, job_id)
+    
+    queue.result(first)  # Now second is the least recently used
+    queue.submit(third, record_call, log, 2)
+    wait_for(queue, third)
+    
+    assert queue.status(first) == JOB_DONE
+    assert queue.status(second) == JOB_UNKNOWN
+    with pytest.raises(RuntimeError):
+        queue.result(second)
+
+
+def test_worker_solve_matches_in_process_solve(tmp_path):
+    """A squad solved in a worker process (cold, then warm after new data) matches a direct solve."""
+    rng = np.random.default_rng(44)
+    players = make_players(rng, per_position=25, n_clubs=12, cost_range=(40, 120))
+    db_path = str(tmp_path / 'fpl.db')
+    queue = FPLJobQueue(max_workers=1)  # One worker, so the second job reuses its optimizer
+    
+    try:
+        for run in range(2):
+            build_prediction_db(db_path, players, rng.gamma(2.0, 2.0, (len(players), 3)))
+            job_id = FPLJobQueue.make_job_id('squad', db=db_path, run=run)
+            queue.submit(job_id, optimize_squad, db_path, 3)
+            assert wait_for(queue, job_id) == JOB_DONE
+            
+            with quiet():
+                expected = FPLSquadOptimizer(db_path, num_weeks=3).solve()
+            assert queue.result(job_id)['objective_value'] == pytest.approx(expected['objective_value'], rel=1e-4)
+    finally:
+        queue.shutdown()
@@ -0,0 +1,73 @@
+"""
+Squad memoization: canonical hashes, LRU behaviour, and memoized results that
+match uncached ones and never outlive the data generation.
+"""
+
+import copy
+import numpy as np
+import pandas as pd
+from fpl_agent.memo import SquadMemo, squad_hash
+from fpl_agent.transfers import FPLTransferOptimizer
+from tests.helpers import build_prediction_db, make_players, make_squad, quiet, team_json
+
+
+def test_squad_hash_ignores_player_order():
+    squad = make_squad(np.random.default_rng(0), make_players(np.random.default_rng(1)))
+    team = team_json(squad)
+    shuffled = copy.deepcopy(team)
+    shuffled['team'].reverse()
+    for group in shuffled['team']:
+        group['players'].reverse()
+    other = team_json(squad.assign(id=squad['id'] + 1000))
+    
+    assert squad_hash(team) == squad_hash(shuffled)
+    assert squad_hash(team) != squad_hash(other)
+
+
+def test_frame_hash_covers_lineup_and_points():
+    frame = pd.DataFrame({'id': [1, 2, 3], 'is_starter': [True, True, False], 'predicted_points': [1.0, 2.0, 3.0]})
+    
+    assert squad_hash(frame) == squad_hash(frame.iloc[::-1])
+    assert squad_hash(frame) != squad_hash(frame.assign(is_starter=[True, False, True]))
+    assert squad_hash(frame) != squad_hash(frame.assign(predicted_points=[1.0, 2.0, 3.5]))
+
+
+def test_memo_evicts_least_recently_used_and_counts():
+    memo = SquadMemo('test_lru', maxsize=2)
+    calls = []
+    
+    def compute(value):
+        calls.append(value)
+        return value * 10
+    
+    for key in ('a', 'b', 'a', 'c', 'b'):
+        memo.get_or_compute(key, lambda key=key: compute(key))
+    
+    # 'a' was used after 'b', so 'c' evicted 'b' and it had to be computed again
+    assert calls == ['a', 'b', 'c', 'b']
+    assert memo.stats() == {'hits': 1, 'misses': 4, 'hit_rate': 0.2, 'size': 2, 'maxsize': 2}
+
+
+def test_memoized_transfers_follow_the_data_generation(tmp_path):
+    """Cached suggestions equal an uncached search, are copies, and are recomputed after new predictions."""
+    rng = np.random.default_rng(46)
+    players = make_players(rng, per_position=12, n_clubs=10)
+    team = team_json(make_squad(rng, players))
+    db_path = str(tmp_path / 'fpl.db')
+    optimizer = FPLTransferOptimizer(db_path)
+    
+    def uncached():
+        pool = optimizer.candidate_pool(3)
+        result = optimizer._find_best_transfer(team, 3, pool, squad_key=None)
+        return [(t['out']['id'], t['in']['id'], t['points_gain']) for t in result['best_transfers']]
+    
+    for _ in range(2):
+        build_prediction_db(db_path, players, rng.gamma(2.0, 2.0, (len(players), 3)))
+        with quiet():
+            first = optimizer.find_best_transfer(team, num_weeks=3)
+            first['best_transfers'].clear()  # Must not reach the cache
+            second = optimizer.find_best_transfer(team, num_weeks=3)
+            expected = uncached()
+        
+        assert [(t['out']['id'], t['in']['id'], t['points_gain']) for t in second['best_transfers']] == expected
+        assert expected
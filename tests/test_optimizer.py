@@ -0,0 +1,82 @@
+"""
+Squad ILP: dominance pruning and warm refreshes must not change the optimal objective.
+"""
+
+import numpy as np
+import pytest
+from fpl_agent.optimizer import FPLSquadOptimizer, dominance_keep_mask, max_blocked_teams
+from fpl_agent.validation import FPLValidator, SQUAD_REQUIREMENTS
+from tests.helpers import make_players, quiet
+
+
+def solve(players, prune):
+    """Solve the squad ILP over an in-memory player table."""
+    optimizer = FPLSquadOptimizer(':memory:', prune=prune)
+    optimizer.load_player_data = lambda: players
+    with quiet():
+        return optimizer.solve()
+
+
+@pytest.mark.parametrize('seed, n_clubs', [(0, 8), (1, 10), (2, 12), (3, 20), (4, 20)])
+def test_pruning_keeps_the_optimal_objective(seed, n_clubs):
+    """Pruned and unpruned models reach the same objective, and pruning removes players."""
+    players = make_players(np.random.default_rng(seed), per_position=40, n_clubs=n_clubs,
+                           cost_range=(40, 130), cost_step=5, points_step=0.5)
+    
+    pruned = solve(players, prune=True)
+    full = solve(players, prune=False)
+    
+    assert pruned['pruned_players'] > 0
+    assert pruned['objective_value'] == pytest.approx(full['objective_value'], rel=1e-4)
+    assert FPLValidator.validate_team_constraints(pruned['squad'], verbose=False)
+
+
+def test_identical_players_are_ranked_by_index():
+    """Exact ties dominate by index: only the first players, up to what a squad can block, are kept."""
+    n = 30
+    points = np.full(n, 5.0)
+    costs = np.full(n, 50)
+    position_codes = np.zeros(n, dtype=np.int64)  # All goalkeepers
+    team_codes = np.arange(n)  # Each from a different team
+    
+    keep = dominance_keep_mask(points, costs, position_codes, team_codes)
+    
+    expected = np.arange(n) <= max_blocked_teams(SQUAD_REQUIREMENTS['GK'])
+    np.testing.assert_array_equal(keep, expected)
+
+
+@pytest.mark.parametrize('prune', [True, False])
+def test_refresh_matches_a_fresh_solve(prune):
+    """Updating the model in place solves to the same objective as building it again."""
+    rng = np.random.default_rng(33)
+    players = make_players(rng, per_position=30, n_clubs=12, cost_range=(40, 130), cost_step=5)
+    
+    optimizer = FPLSquadOptimizer(':memory:', prune=prune)
+    current = {'players': players}
+    optimizer.load_player_data = lambda: current['players']
+    with quiet():
+        optimizer.solve()
+    
+    for _ in range(4):
+        # New predictions and price changes for the same players
+        updated = current['players'].copy()
+        updated['predicted_points'] *= rng.uniform(0.7, 1.3, len(updated))
+        updated['cost'] = np.clip(updated['cost'] + rng.integers(-1, 2, len(updated)), 40, 130)
+        updated['price'] = updated['cost'] / 10
+        current['players'] = updated
+        
+        with quiet():
+            reused = optimizer.refresh()
+            warm = optimizer.solve()
+        
+        assert reused
+        assert warm['objective_value'] == pytest.approx(solve(updated, prune)['objective_value'], rel=1e-4)
+    
+    # A different player set cannot reuse the model
+    current['players'] = current['players'].iloc[1:].reset_index(drop=True)
+    with quiet():
+        reused = optimizer.refresh()
+        rebuilt = optimizer.solve()
+    
+    assert not reused
+    assert rebuilt['objective_value'] == pytest.approx(solve(current['players'], prune)['objective_value'], rel=1e-4)
@@ -0,0 +1,122 @@
+"""
+Multi-gameweek planner against exhaustive enumeration of two-week plans.
+"""
+
+import itertools
+import numpy as np
+import pytest
+from fpl_agent.planner import FPLTransferPlanner, HIT_COST, MAX_FREE_TRANSFERS
+from fpl_agent.validation import FPLValidator, POSITIONS, SQUAD_REQUIREMENTS, MAX_PER_TEAM
+from tests.helpers import make_players, quiet
+
+N_WEEKS = 2
+
+
+def small_pool(rng, n_clubs):
+    """A valid current squad (first rows of each position) plus one alternative per position."""
+    while True:
+        players = make_players(rng, per_position=6, n_clubs=n_clubs, cost_range=(40, 80))
+        keep = np.concatenate([
+            np.flatnonzero(players['position'] == pos)[:SQUAD_REQUIREMENTS[pos] + 1] for pos in POSITIONS
+        ])
+        players = players.iloc[keep].reset_index(drop=True)
+        held = np.zeros(len(players), dtype=bool)
+        for pos in POSITIONS:
+            held[np.flatnonzero(players['position'] == pos)[:SQUAD_REQUIREMENTS[pos]]] = True
+        if np.bincount(players['team'][held]).max() <= MAX_PER_TEAM:
+            return players, held
+
+
+def enumerate_best_plan(players, points, held, free_transfers, bank, epsilon):
+    """Best net objective over every pair of weekly squads, with the planner's transfer rules."""
+    positions = players['position'].to_numpy()
+    costs = players['cost'].to_numpy()
+    teams = players['team'].to_numpy()
+    
+    # Every squad with the right position counts, as (n_squads, 15) index rows in position order
+    per_position = [itertools.combinations(np.flatnonzero(positions == pos), SQUAD_REQUIREMENTS[pos])
+                    for pos in POSITIONS]
+    squads = np.array([np.concatenate(parts) for parts in itertools.product(*per_position)])
+    slot_positions = positions[squads[0]]
+    
+    # Sells and buys cancel in the bank, so a squad is affordable if it costs no more than held + bank
+    affordable = costs[squads].sum(axis=1) <= costs[held].sum() + bank
+    within_cap = np.array([np.bincount(teams[squad]).max() <= MAX_PER_TEAM for squad in squads])
+    squads = squads[affordable & within_cap]
+    assert len(squads)
+    
+    members = np.zeros((len(squads), len(players)), dtype=int)
+    np.put_along_axis(members, squads, 1, axis=1)
+    bench_penalty = epsilon * (members @ (costs / 10.0))
+    values = [FPLValidator.best_xi_points(points[squads, t], slot_positions) - bench_penalty for t in range(N_WEEKS)]
+    
+    # Week 1 from the held squad, then week 2 from every week-1 squad
+    buys_1 = members @ ~held
+    paid_1 = np.maximum(0, buys_1 - free_transfers)
+    free_2 = np.minimum(MAX_FREE_TRANSFERS, free_transfers - (buys_1 - paid_1) + 1)
+    buys_2 = (1 - members) @ members.T  # [i, j]: players of squad j not in squad i
+    paid_2 = np.maximum(0, buys_2 - free_2[:, None])
+    
+    total = (values[0] - HIT_COST * paid_1)[:, None] + values[1][None, :] - HIT_COST * paid_2
+    return total.max()
+
+
+def plan_value(planner, weeks, points):
+    """Objective of a planned sequence of weeks, recomputed from its decisions."""
+    return sum(
+        points[week['start'], t].sum() - planner.epsilon * planner.prices[week['squad']].sum()
+        - HIT_COST * week['hits']
+        for t, week in enumerate(weeks)
+    )
+
+
+def solve_two_weeks(players, held, points, free_transfers, bank):
+    planner = FPLTransferPlanner(':memory:')
+    planner.players_df = players
+    planner.points = points
+    planner._index_players()
+    with quiet():
+        weeks = planner._solve_window(held, free_transfers, bank, points)
+    return planner, weeks
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('free_transfers, bank', [(1, 0), (1, 25), (2, 10), (MAX_FREE_TRANSFERS, 10)])
+def test_two_week_plan_matches_enumeration(seed, free_transfers, bank):
+    """The ILP finds the best two-week plan, and its reported hits follow the transfer rules."""
+    rng = np.random.default_rng(seed)
+    players, held = small_pool(rng, n_clubs=8)
+    # Alternatives score well in one of the two weeks, so transfers, hits and banking all compete
+    points = rng.gamma(2.0, 2.5, (len(players), N_WEEKS))
+    points[~held] += rng.uniform(0, 6, ((~held).sum(), N_WEEKS)) * (rng.random(((~held).sum(), N_WEEKS)) < 0.5)
+    
+    planner, weeks = solve_two_weeks(players, held, points, free_transfers, bank)
+    
+    expected = enumerate_best_plan(players, points, held, free_transfers, bank, planner.epsilon)
+    assert plan_value(planner, weeks, points) == pytest.approx(expected, rel=1e-4)
+    
+    previous, free = held, free_transfers
+    for week in weeks:
+        buys = int((week['squad'] & ~previous).sum())
+        assert week['free_transfers'] == free
+        assert week['hits'] == max(0, buys - free)
+        assert not (week['buy'] & week['sell']).any()
+        previous, free = week['squad'], min(MAX_FREE_TRANSFERS, free - (buys - week['hits']) + 1)
+
+
+def test_free_transfers_stay_capped_when_saved():
+    """Holding with a full bank of free transfers keeps it at the cap instead of forcing a transfer."""
+    players, held = small_pool(np.random.default_rng(7), n_clubs=8)
+    # Every alternative costs more than anyone it could replace, and there is no money in the bank
+    for pos in POSITIONS:
+        in_position = (players['position'] == pos).to_numpy()
+        players.loc[in_position & ~held, 'cost'] = players['cost'][in_position & held].max() + 5
+    players['price'] = players['cost'] / 10
+    points = np.random.default_rng(8).gamma(2.0, 2.5, (len(players), N_WEEKS))
+    
+    planner, weeks = solve_two_weeks(players, held, points, MAX_FREE_TRANSFERS, bank=0)
+    
+    assert not any(week['buy'].any() for week in weeks)
+    assert [week['free_transfers'] for week in weeks] == [MAX_FREE_TRANSFERS] * N_WEEKS
+    expected = enumerate_best_plan(players, points, held, MAX_FREE_TRANSFERS, 0, planner.epsilon)
+    assert plan_value(planner, weeks, points) == pytest.approx(expected, rel=1e-4)
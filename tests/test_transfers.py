@@ -0,0 +1,112 @@
+"""
+Transfer searches against brute-force enumeration of every reachable squad.
+"""
+
+import itertools
+import numpy as np
+import pytest
+from fpl_agent.transfers import FPLTransferOptimizer, CandidatePool
+from fpl_agent.validation import FPLValidator, MAX_PER_TEAM, BUDGET_TENTHS
+from tests.helpers import make_players, make_squad
+
+
+def brute_force(squad, players, k):
+    """Gain of every distinct squad reachable with k same-position swaps, keyed by its player ids."""
+    positions = squad['position'].to_numpy()
+    squad_ids = squad['id'].to_numpy()
+    squad_points = squad['predicted_points'].to_numpy()
+    squad_clubs = squad['team'].to_numpy()
+    squad_costs = squad['cost'].to_numpy()
+    budget = BUDGET_TENTHS - int(squad_costs.sum())
+    ids, points = players['id'].to_numpy(), players['predicted_points'].to_numpy()
+    clubs, costs, player_positions = players['team'].to_numpy(), players['cost'].to_numpy(), players['position'].to_numpy()
+    outside = np.flatnonzero(~np.isin(ids, squad_ids))
+    n_clubs = int(max(clubs.max(), squad_clubs.max())) + 1
+    
+    keys, rows, seen = [], [], set()
+    for outs in itertools.combinations(range(len(squad)), k):
+        outs = list(outs)
+        keep = np.setdiff1d(np.arange(len(squad)), outs)
+        club_counts = np.bincount(squad_clubs[keep], minlength=n_clubs)
+        options = [outside[player_positions[outside] == positions[o]] for o in outs]
+        for ins in itertools.product(*options):
+            ins = list(ins)
+            if len(set(ins)) < k or costs[ins].sum() - squad_costs[outs].sum() > budget:
+                continue
+            if (club_counts + np.bincount(clubs[ins], minlength=n_clubs)).max() > MAX_PER_TEAM:
+                continue
+            key = frozenset(squad_ids[keep].tolist()) | frozenset(ids[ins].tolist())
+            if key in seen:
+                continue
+            seen.add(key)
+            new_points = squad_points.copy()
+            new_points[outs] = points[ins]
+            keys.append(key)
+            rows.append(new_points)
+    
+    if not rows:
+        return {}
+    base = FPLValidator.best_xi_points(squad_points, positions)
+    return dict(zip(keys, FPLValidator.best_xi_points(np.array(rows), positions) - base))
+
+
+def after_swaps(squad, swaps):
+    """Player ids of the squad after (outgoing squad row, incoming player id) swaps."""
+    ids = set(squad['id'].tolist())
+    for out_row, in_id in swaps:
+        ids.remove(squad['id'].iloc[out_row])
+        ids.add(in_id)
+    return frozenset(ids)
+
+
+def assert_matches_brute_force(found, expected, top_n):
+    """found: (resulting squad ids, gain) in rank order; expected: brute_force output."""
+    keys = [key for key, _ in found]
+    assert len(set(keys)) == len(keys), "the same squad was suggested twice"
+    assert len(found) == min(top_n, len(expected))
+    for key, gain in found:
+        assert gain == pytest.approx(expected[key])
+    np.testing.assert_allclose([gain for _, gain in found], sorted(expected.values(), reverse=True)[:top_n])
+
+
+def setup(seed, per_position=10, n_clubs=8):
+    rng = np.random.default_rng(seed)
+    players = make_players(rng, per_position=per_position, n_clubs=n_clubs)
+    squad = make_squad(rng, players)
+    return players, squad, CandidatePool(players, num_weeks=3, generation=1), BUDGET_TENTHS - int(squad['cost'].sum())
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_single_transfers_match_brute_force(seed):
+    players, squad, pool, budget = setup(seed)
+    current_points = FPLValidator.best_xi_points(squad['predicted_points'], squad['position'])
+    
+    transfers = FPLTransferOptimizer(':memory:')._rank_single_transfers(squad, current_points, budget, pool, top_k=8)
+    
+    out_rows = {player_id: row for row, player_id in enumerate(squad['id'].tolist())}
+    found = [(after_swaps(squad, [(out_rows[t['out']['id']], t['in']['id'])]), t['points_gain']) for t in transfers]
+    assert_matches_brute_force(found, brute_force(squad, players, 1), top_n=8)
+
+
+@pytest.mark.parametrize('k, seed', [(k, seed) for k in (1, 2) for seed in range(8)] + [(3, seed) for seed in range(4)])
+def test_k_transfer_search_matches_brute_force(k, seed):
+    """Exactly the top plans, each squad once, however the squad rows are ordered."""
+    players, squad, pool, budget = setup(seed)
+    
+    plans = FPLTransferOptimizer(':memory:')._search_k_transfers(squad, pool, k, 8, budget)
+    
+    found = [(after_swaps(squad, [(out_row, int(pool.ids[in_row])) for out_row, in_row in swaps]), gain)
+             for gain, _, swaps in plans]
+    assert_matches_brute_force(found, brute_force(squad, players, k), top_n=8)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_k_transfer_search_on_a_thin_pool(seed):
+    """With few candidates per position the search returns every plan there is."""
+    players, squad, pool, budget = setup(seed, per_position=7, n_clubs=8)
+    
+    plans = FPLTransferOptimizer(':memory:')._search_k_transfers(squad, pool, 2, 50, budget)
+    
+    found = [(after_swaps(squad, [(out_row, int(pool.ids[in_row])) for out_row, in_row in swaps]), gain)
+             for gain, _, swaps in plans]
+    assert_matches_brute_force(found, brute_force(squad, players, 2), top_n=50)
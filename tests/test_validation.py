@@ -0,0 +1,103 @@
+"""
+Closed-form best XI against enumerating every legal starting lineup, and the
+batched constraint kernel against checking one squad at a time.
+"""
+
+import itertools
+from collections import Counter
+import numpy as np
+import pytest
+from fpl_agent.validation import (
+    FPLValidator, POSITIONS, SQUAD_SIZE, SQUAD_REQUIREMENTS, MAX_PER_TEAM, BUDGET_TENTHS, STARTING_SIZE,
+    STARTING_LIMITS, VIOLATION_SQUAD_SIZE, VIOLATION_POSITIONS, VIOLATION_TEAM_LIMIT, VIOLATION_BUDGET
+)
+from tests.helpers import make_players
+
+SLOT_POSITIONS = np.repeat(POSITIONS, [SQUAD_REQUIREMENTS[pos] for pos in POSITIONS])
+
+
+def best_lineup_by_enumeration(points, positions):
+    """Best XI points per squad row, trying every 11 of 15 that fits the formation limits."""
+    lineups = []
+    for starters in itertools.combinations(range(len(positions)), STARTING_SIZE):
+        counts = {pos: 0 for pos in POSITIONS}
+        for slot in starters:
+            counts[positions[slot]] += 1
+        if all(low <= counts[pos] <= high for pos, (low, high) in STARTING_LIMITS.items()):
+            lineup = np.zeros(len(positions))
+            lineup[list(starters)] = 1.0
+            lineups.append(lineup)
+    return (np.atleast_2d(points) @ np.array(lineups).T).max(axis=1)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_best_xi_matches_enumeration(seed):
+    rng = np.random.default_rng(seed)
+    positions = rng.permutation(SLOT_POSITIONS)
+    # Rounded points give plenty of ties; a few squads have a zero-point block
+    points = np.round(rng.gamma(2.0, 3.0, (200, len(positions))))
+    points[:10, positions == POSITIONS[rng.integers(len(POSITIONS))]] = 0.0
+    
+    np.testing.assert_allclose(FPLValidator.best_xi_points(points, positions),
+                               best_lineup_by_enumeration(points, positions))
+
+
+def test_best_xi_of_one_squad_is_a_scalar():
+    rng = np.random.default_rng(0)
+    points = rng.gamma(2.0, 3.0, len(SLOT_POSITIONS))
+    
+    result = FPLValidator.best_xi_points(points, SLOT_POSITIONS)
+    
+    assert np.ndim(result) == 0
+    assert result == pytest.approx(best_lineup_by_enumeration(points, SLOT_POSITIONS)[0])
+
+
+def violations_one_by_one(positions, teams, costs):
+    """Violation bits of one squad, checked rule by rule."""
+    violations = 0
+    if len(positions) != SQUAD_SIZE:
+        violations |= VIOLATION_SQUAD_SIZE
+    position_counts = Counter(positions)
+    if any(position_counts[pos] != required for pos, required in SQUAD_REQUIREMENTS.items()):
+        violations |= VIOLATION_POSITIONS
+    if max(Counter(teams).values()) > MAX_PER_TEAM:
+        violations |= VIOLATION_TEAM_LIMIT
+    if sum(costs) > BUDGET_TENTHS:
+        violations |= VIOLATION_BUDGET
+    return violations
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_batched_violations_match_per_squad_checks(seed):
+    """Random 15-player draws break every rule in some squads; each bitmask matches the rule-by-rule check."""
+    rng = np.random.default_rng(seed)
+    players = make_players(rng, per_position=15, n_clubs=6, cost_range=(40, 90))
+    # Half drawn by position (right counts), half from anyone
+    by_position = [
+        np.concatenate([rng.choice(np.flatnonzero(players['position'] == pos), SQUAD_REQUIREMENTS[pos], replace=False)
+                        for pos in POSITIONS])
+        for _ in range(250)
+    ]
+    anyone = [rng.choice(len(players), SQUAD_SIZE, replace=False) for _ in range(250)]
+    squads = np.array(by_position + anyone)
+    
+    codes, teams, costs = FPLValidator.encode_team(players)
+    violations = FPLValidator.constraint_violations(codes[squads], teams[squads], costs[squads])
+    
+    positions = players['position'].to_numpy()
+    expected = [violations_one_by_one(positions[squad].tolist(), teams[squad].tolist(), costs[squad].tolist())
+                for squad in squads]
+    np.testing.assert_array_equal(violations, expected)
+    for bit in (VIOLATION_POSITIONS, VIOLATION_TEAM_LIMIT, VIOLATION_BUDGET):
+        assert (violations & bit).any() and not (violations & bit).all()
+    
+    # One squad at a time gives the same bits, as an int
+    for squad, bits in zip(squads[:20], violations[:20]):
+        assert FPLValidator.constraint_violations(codes[squad], teams[squad], costs[squad]) == bits
+
+
+def test_wrong_squad_size_is_flagged():
+    players = make_players(np.random.default_rng(0), per_position=4, n_clubs=20)
+    codes, teams, costs = FPLValidator.encode_team(players.iloc[:14])
+    
+    assert FPLValidator.constraint_violations(codes, teams, costs) & VIOLATION_SQUAD_SIZE
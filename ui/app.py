@@ -13,169 +13,183 @@ import dash
 from dash import dcc, html, dash_table, Input, Output, State, callback, ALL
 import dash_bootstrap_components as dbc
 import pandas as pd
-from fpl_agent import FPLTransferOptimizer, FPLDatabase
+import itertools
+import threading
+from fpl_agent import FPLDatabase, FPLJobQueue, FPLValidator, CurrentTeamRepository
+from fpl_agent.jobs import optimize_squad, search_transfers, JOB_RUNNING
+from fpl_agent.validation import POSITIONS, SQUAD_REQUIREMENTS, MAX_PER_TEAM, BUDGET_TENTHS
 import argparse
 import sys
 import os
 
-# Import the squad optimizer
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
-from create_best_team import FPLSquadOptimizer
+# Scripts directory, for the squad optimizer (imported only by job workers: it pulls in OR-Tools)
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+SQUAD_OPTIMIZER = 'create_best_team:FPLSquadOptimizer'
 
 # Constants
 DB_PATH = "/workspaces/FPL_agent/data/fpl_agent.db"
-POSITION_LIMITS = {'GK': 2, 'DEF': 5, 'MID': 5, 'FWD': 3}
-BUDGET = 100.0
+REPLACEMENT_OPTIONS_LIMIT = 50  # Options sent to the browser per search
+JOB_POLL_INTERVAL_MS = 500  # How often the UI polls background jobs
 
-# Global variable for num_weeks (will be set from command line args)
+# Global variable for num_weeks (set by create_app)
 NUM_WEEKS = 3
 
-# Initialize Dash app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+# Dash app, built by create_app
+app = None
 
-# Load available players
-db = FPLDatabase(DB_PATH)
-all_players = db.load_player_data(num_weeks=NUM_WEEKS)
+# Lazy data providers: nothing touches the database until a callback needs it
+db = None
+_players_cache = {}
+_team_names_cache = {}
 
-# Load team names mapping
-with db.get_connection() as conn:
-    teams_df = pd.read_sql_query("SELECT DISTINCT team, team_name FROM elements ORDER BY team", conn)
-    team_id_to_name = dict(zip(teams_df['team'], teams_df['team_name']))
-    team_name_to_id = dict(zip(teams_df['team_name'], teams_df['team']))
+def get_db():
+    """Return the shared database handle."""
+    global db
+    if db is None:
+        db = FPLDatabase(DB_PATH)
+    return db
+
+def get_players():
+    """Return available players with predictions summed over the next NUM_WEEKS.
+    
+    Loaded on first use and cached until NUM_WEEKS or the data generation changes.
+    """
+    key = (NUM_WEEKS, get_db().get_data_generation())
+    if _players_cache.get('key') != key:
+        players = get_db().load_player_data(num_weeks=NUM_WEEKS)
+        _players_cache['players'] = players
+        _players_cache['by_id'] = players.set_index('id')
+        _players_cache['key'] = key
+        print(f"Loaded {len(players)} players with predictions ({NUM_WEEKS}w)")
+    return _players_cache['players']
+
+def get_players_by_id():
+    """Return the players table indexed by player id (same cache as get_players)."""
+    get_players()
+    return _players_cache['by_id']
+
+def get_replacement_options():
+    """Return replacement dropdown options for all players, sorted by position then price.
+    
+    Labels are built once per horizon and data generation (same cache as
+    get_players); callbacks only filter these lists.
+    """
+    get_players()
+    if _players_cache.get('options_key') != _players_cache['key']:
+        team_id_to_name = get_team_names()
+        available = _players_cache['players'].sort_values(['position', 'price'], ascending=[True, True])
+        labels = [
+            f"{name} ({position}) - {team_id_to_name.get(team, 'Unknown')} - £{price:.1f}m, {points:.2f}pts ({NUM_WEEKS}w)"
+            for name, position, team, price, points in zip(
+                available['name'], available['position'], available['team'], available['price'], available['predicted_points']
+            )
+        ]
+        ids = available['id'].tolist()
+        _players_cache['options'] = {
+            'ids': ids,
+            'positions': available['position'].tolist(),
+            'labels': labels,
+            'search': [label.lower() for label in labels],
+            'row_of': {player_id: row for row, player_id in enumerate(ids)}
+        }
+        _players_cache['options_key'] = _players_cache['key']
+    return _players_cache['options']
+
+def get_team_names():
+    """Return the team id to team name mapping, cached per data generation."""
+    generation = get_db().get_data_generation()
+    if _team_names_cache.get('generation') != generation:
+        with get_db().get_connection() as conn:
+            teams_df = pd.read_sql_query("SELECT DISTINCT team, team_name FROM elements ORDER BY team", conn)
+        _team_names_cache['names'] = dict(zip(teams_df['team'], teams_df['team_name']))
+        _team_names_cache['generation'] = generation
+    return _team_names_cache['names']
 
 # Load team from database
 def load_team_from_db():
-    """Load current team from database or return empty team structure."""
+    """Load current team from database.
+    
+    Returns:
+        The team structure, None if no team has been saved yet, or an empty
+        team structure if loading failed
+    """
     try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if current_team table exists
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='current_team'
-            """)
-            
-            if not cursor.fetchone():
-                print("No current_team table found. Creating optimized team...")
-                return create_optimal_team()
-            
-            # Load team data
-            team_df = pd.read_sql_query("""
-                SELECT player_id, player_name, position, team_id, is_starter
-                FROM current_team
-                ORDER BY 
-                    CASE position 
-                        WHEN 'GK' THEN 1 
-                        WHEN 'DEF' THEN 2 
-                        WHEN 'MID' THEN 3 
-                        WHEN 'FWD' THEN 4 
-                    END,
-                    is_starter DESC
-            """, conn)
-            
-            if team_df.empty:
-                print("current_team table is empty. Creating optimized team...")
-                return create_optimal_team()
-            
-            # Convert to team structure
-            team_structure = {"team": []}
-            for position in ['GK', 'DEF', 'MID', 'FWD']:
-                pos_players = team_df[team_df['position'] == position]
-                if not pos_players.empty:
-                    team_structure["team"].append({
-                        "position": position,
-                        "players": [
-                            {
-                                "id": int(row['player_id']),
-                                "name": row['player_name'],
-                                "team": int(row['team_id']),
-                                "is_starter": bool(row['is_starter'])
-                            }
-                            for _, row in pos_players.iterrows()
-                        ]
-                    })
-            
-            return team_structure
-            
+        team_df = get_team_repository().load()
+        
+        if team_df.empty:
+            return None
+        
+        # Convert to team structure
+        team_structure = {"team": []}
+        for position in POSITIONS:
+            pos_players = team_df[team_df['position'] == position]
+            if not pos_players.empty:
+                team_structure["team"].append({
+                    "position": position,
+                    "players": [
+                        {
+                            "id": int(row['player_id']),
+                            "name": row['player_name'],
+                            "team": int(row['team_id']),
+                            "is_starter": bool(row['is_starter'])
+                        }
+                        for _, row in pos_players.iterrows()
+                    ]
+                })
+        
+        return team_structure
+    
     except Exception as e:
         print(f"Error loading team from database: {e}")
         return {"team": []}
 
-def create_optimal_team():
-    """Create an optimal team using the FPL Squad Optimizer."""
+# Saved squads (one snapshot per save)
+team_repository = None
+
+def get_team_repository():
+    """Return the shared current-team repository."""
+    global team_repository
+    if team_repository is None:
+        team_repository = CurrentTeamRepository(DB_PATH)
+    return team_repository
+
+# Background jobs: squad solves and transfer searches run in worker processes
+job_queue = None
+
+def get_job_queue():
+    """Return the shared job queue (worker processes start on the first job)."""
+    global job_queue
+    if job_queue is None:
+        job_queue = FPLJobQueue(max_workers=2)
+    return job_queue
+
+# Team structure saved for each finished squad job, so overlapping polls save it once
+_saved_squad_jobs = {}
+_saved_squad_jobs_lock = threading.Lock()
+
+
+def save_optimal_team(results):
+    """Save squad optimizer results as the current team and return the team structure."""
     try:
-        # Refresh all_players data to ensure we have latest predictions
-        global all_players
-        all_players = db.load_player_data(num_weeks=NUM_WEEKS)
-        print(f"Refreshed player data: {len(all_players)} players loaded")
-        
-        print(f"Running squad optimizer with {NUM_WEEKS} weeks of predictions...")
-        optimizer = FPLSquadOptimizer(DB_PATH, epsilon=0.001, num_weeks=NUM_WEEKS)
-        results = optimizer.solve()
-        
         # Convert optimizer results to team structure
         squad_df = results['squad']
         starting_df = results['starting_xi']
         
-        # Save to database
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Drop existing current_team table completely to ensure clean slate
-            cursor.execute("DROP TABLE IF EXISTS current_team")
-            
-            # Create current_team table fresh
-            cursor.execute("""
-                CREATE TABLE current_team (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    player_id INTEGER,
-                    player_name TEXT,
-                    position TEXT,
-                    team_id INTEGER,
-                    team_name TEXT,
-                    price REAL,
-                    predicted_points REAL,
-                    is_starter BOOLEAN,
-                    saved_at TIMESTAMP,
-                    team_cost REAL,
-                    team_points REAL
-                )
-            """)
-            
-            # Get team names
-            teams_df = pd.read_sql_query("SELECT DISTINCT team, team_name FROM elements ORDER BY team", conn)
-            team_id_to_name_local = dict(zip(teams_df['team'], teams_df['team_name']))
-            
-            total_cost = squad_df['price'].sum()
-            total_points = starting_df['predicted_points'].sum()
-            
-            # Insert new team data
-            for _, row in squad_df.iterrows():
-                is_starter = row['id'] in starting_df['id'].values
-                cursor.execute("""
-                    INSERT INTO current_team (
-                        player_id, player_name, position, team_id, team_name,
-                        price, predicted_points, is_starter, saved_at,
-                        team_cost, team_points
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    int(row['id']), row['name'], row['position'], int(row['team']),
-                    team_id_to_name_local.get(row['team'], f"Team {row['team']}"),
-                    row['price'], row['predicted_points'],
-                    is_starter, timestamp, total_cost, total_points
-                ))
-            
-            conn.commit()
+        # Save to database as a new snapshot
+        team_id_to_name = get_team_names()
+        saved_df = squad_df.assign(
+            team_name=[team_id_to_name.get(team, f"Team {team}") for team in squad_df['team']],
+            is_starter=squad_df['id'].isin(starting_df['id'])
+        )
+        repository = get_team_repository()
+        totals = repository.totals(repository.save(saved_df, source='optimizer'))
+        total_cost, total_points = totals['team_cost'], totals['team_points']
         
         print(f"✅ Optimized team created and saved! Cost: £{total_cost:.1f}m, Points: {total_points:.2f}")
         
         # Return team structure
         team_structure = {"team": []}
-        for position in ['GK', 'DEF', 'MID', 'FWD']:
+        for position in POSITIONS:
             pos_players = squad_df[squad_df['position'] == position]
             if not pos_players.empty:
                 team_structure["team"].append({
@@ -202,159 +216,270 @@ def create_optimal_team():
 def team_json_to_dataframe(team_json):
     """Convert team JSON to DataFrame with enriched data.
     
-    Note: predicted_points comes from all_players DataFrame, which contains
-    the SUM of predictions for the next NUM_WEEKS gameweeks.
+    Note: predicted_points comes from the id-indexed players table, which
+    contains the SUM of predictions for the next NUM_WEEKS gameweeks.
     """
-    if not team_json or not team_json.get('team'):
-        return pd.DataFrame(columns=['id', 'name', 'position', 'team', 'team_name', 'price', 'predicted_points', 'is_starter'])
-    
-    players_list = []
-    for pos_data in team_json['team']:
-        position = pos_data['position']
-        for player in pos_data['players']:
-            player_info = all_players[all_players['id'] == player['id']]
-            if not player_info.empty:
-                player_row = player_info.iloc[0]
-                players_list.append({
-                    'id': player['id'],
-                    'name': player_row['name'],
-                    'position': position,
-                    'team': player_row['team'],
-                    'team_name': team_id_to_name.get(player_row['team'], f"Team {player_row['team']}"),
-                    'price': player_row['price'],
-                    'predicted_points': player_row['predicted_points'],  # Sum of next NUM_WEEKS
-                    'is_starter': player.get('is_starter', True)
-                })
-            else:
-                print(f"Warning: Player ID {player['id']} not found in all_players DataFrame")
-    
+    columns = ['id', 'name', 'position', 'team', 'team_name', 'cost', 'price', 'predicted_points', 'is_starter']
+    players_list = [
+        {'id': player['id'], 'position': pos_data['position'], 'is_starter': player.get('is_starter', True)}
+        for pos_data in (team_json or {}).get('team', [])
+        for player in pos_data['players']
+    ]
     if not players_list:
-        return pd.DataFrame(columns=['id', 'name', 'position', 'team', 'team_name', 'price', 'predicted_points', 'is_starter'])
+        return pd.DataFrame(columns=columns)
+    
+    # One indexed join against the players table instead of a scan per player
+    players_by_id = get_players_by_id()
+    team_df = pd.DataFrame(players_list)
+    known = team_df['id'].isin(players_by_id.index)
+    for player_id in team_df.loc[~known, 'id']:
+        print(f"Warning: Player ID {player_id} not found in players table")
+    team_df = team_df[known].join(players_by_id[['name', 'team', 'cost', 'price', 'predicted_points']], on='id')
+    
+    if team_df.empty:
+        return pd.DataFrame(columns=columns)
     
-    return pd.DataFrame(players_list)
+    team_id_to_name = get_team_names()
+    team_df['team_name'] = [team_id_to_name.get(team, f"Team {team}") for team in team_df['team']]
+    return team_df[columns].reset_index(drop=True)
 
-# App layout
-app.layout = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            html.H1("⚽ FPL Transfer Optimizer", className="text-center my-4"),
-            html.Hr()
-        ])
-    ]),
-    
-    # Store for team data
-    dcc.Store(id='team-store', data=load_team_from_db()),
-    dcc.Interval(id='interval-reload', interval=1000, n_intervals=0, max_intervals=1),
-    dcc.Store(id='copy-notification', data=''),
-    
-    # Team Display Section
-    dbc.Row([
-        dbc.Col([
-            html.H3("Current Team", className="mb-3"),
-            dbc.Button("🔄 Create Optimal Team", id='create-optimal-button', color="secondary", className="mb-3"),
-            html.Div(id='team-summary', className="mb-3"),
-            html.Div(id='team-display')
-        ], width=12)
-    ]),
-    
-    # Replace Player Section
-    dbc.Row([
-        dbc.Col([
-            html.H3("Replace Player", className="mt-4 mb-3"),
-            dbc.Row([
-                dbc.Col([
-                    html.Label("Select Player to Replace:"),
-                    dcc.Dropdown(id='player-to-replace-dropdown', placeholder="Select player...")
-                ], width=6),
-                dbc.Col([
-                    html.Label("Replace With:"),
-                    dcc.Dropdown(id='replacement-player-dropdown', placeholder="Select replacement...")
-                ], width=6)
-            ]),
-            dbc.Button("Replace Player", id='replace-button', color="primary", className="mt-3"),
-            html.Div(id='edit-message', className="mt-2")
-        ], width=12)
-    ]),
-    
-    # Substitute Player Section
-    dbc.Row([
-        dbc.Col([
-            html.H3("Substitute Player", className="mt-4 mb-3"),
-            dbc.Row([
-                dbc.Col([
-                    html.Label("Remove from Starting XI:"),
-                    dcc.Dropdown(id='player-to-bench-dropdown', placeholder="Select starting player...")
-                ], width=6),
-                dbc.Col([
-                    html.Label("Add to Starting XI:"),
-                    dcc.Dropdown(id='player-to-start-dropdown', placeholder="Select bench player...")
-                ], width=6)
-            ]),
-            dbc.Button("Substitute Player", id='substitute-button', color="warning", className="mt-3"),
-            html.Div(id='substitute-message', className="mt-2")
-        ], width=12)
-    ]),
-    
-    # Save Section
-    dbc.Row([
-        dbc.Col([
-            html.Hr(className="my-4"),
-            dbc.Button("Save Team to Database", id='save-team-button', color="info", size="lg", className="w-100"),
-            html.Div(id='save-message', className="mt-3")
-        ], width=12)
-    ]),
-    
-    # LLM Analysis Section
-    dbc.Row([
-        dbc.Col([
-            html.Hr(),
-            html.H3("AI-Powered Team Analysis", className="mb-3"),
-            html.P("Copy the prompt with your team data to use with your favourite LLM (ChatGPT, Claude, etc.)", className="text-muted"),
-            dbc.Row([
-                dbc.Col([
-                    html.Label("Prompt + Team Data (Ready to Copy):", className="fw-bold"),
-                    dcc.Textarea(
-                        id='llm-combined-export',
-                        placeholder="Combined prompt and team data will appear here...",
-                        style={'width': '100%', 'height': '400px', 'fontFamily': 'monospace', 'fontSize': '12px'}
-                    )
-                ], width=12)
+def build_layout():
+    """Build the app layout.
+    
+    The team store starts empty; reload_team_on_startup fills it when the page loads.
+    """
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                html.H1("⚽ FPL Transfer Optimizer", className="text-center my-4"),
+                html.Hr()
             ])
-        ], width=12)
-    ]),
-    
-    # Optimize Section
-    dbc.Row([
-        dbc.Col([
-            html.Hr(),
-            html.H3("Transfer Suggestions", className="mb-3"),
-            dbc.Button("Optimize Transfers", id='optimize-button', color="success", size="lg", className="mb-3"),
-            html.Div(id='optimization-results')
-        ], width=12)
-    ])
-], fluid=True, className="p-4")
+        ]),
+        
+        # Store for team data
+        dcc.Store(id='team-store', data=None),
+        dcc.Interval(id='interval-reload', interval=1000, n_intervals=0, max_intervals=1),
+        dcc.Store(id='copy-notification', data=''),
+        
+        # Team Display Section
+        dbc.Row([
+            dbc.Col([
+                html.H3("Current Team", className="mb-3"),
+                dbc.Button("🔄 Create Optimal Team", id='create-optimal-button', color="secondary", className="mb-3"),
+                html.Div(id='create-optimal-status'),
+                dcc.Store(id='squad-job-store', data=None),
+                dcc.Interval(id='squad-job-poll', interval=JOB_POLL_INTERVAL_MS, disabled=True),
+                html.Div(id='team-summary', className="mb-3"),
+                html.Div(id='team-display')
+            ], width=12)
+        ]),
+        
+        # Replace Player Section
+        dbc.Row([
+            dbc.Col([
+                html.H3("Replace Player", className="mt-4 mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Select Player to Replace:"),
+                        dcc.Dropdown(id='player-to-replace-dropdown', placeholder="Select player...")
+                    ], width=6),
+                    dbc.Col([
+                        html.Label("Replace With:"),
+                        dcc.Dropdown(id='replacement-player-dropdown', placeholder="Type to search all players...")
+                    ], width=6)
+                ]),
+                dbc.Button("Replace Player", id='replace-button', color="primary", className="mt-3"),
+                html.Div(id='edit-message', className="mt-2")
+            ], width=12)
+        ]),
+        
+        # Substitute Player Section
+        dbc.Row([
+            dbc.Col([
+                html.H3("Substitute Player", className="mt-4 mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Remove from Starting XI:"),
+                        dcc.Dropdown(id='player-to-bench-dropdown', placeholder="Select starting player...")
+                    ], width=6),
+                    dbc.Col([
+                        html.Label("Add to Starting XI:"),
+                        dcc.Dropdown(id='player-to-start-dropdown', placeholder="Select bench player...")
+                    ], width=6)
+                ]),
+                dbc.Button("Substitute Player", id='substitute-button', color="warning", className="mt-3"),
+                html.Div(id='substitute-message', className="mt-2")
+            ], width=12)
+        ]),
+        
+        # Save Section
+        dbc.Row([
+            dbc.Col([
+                html.Hr(className="my-4"),
+                dbc.Button("Save Team to Database", id='save-team-button', color="info", size="lg", className="w-100"),
+                html.Div(id='save-message', className="mt-3")
+            ], width=12)
+        ]),
+        
+        # LLM Analysis Section
+        dbc.Row([
+            dbc.Col([
+                html.Hr(),
+                html.H3("AI-Powered Team Analysis", className="mb-3"),
+                html.P("Copy the prompt with your team data to use with your favourite LLM (ChatGPT, Claude, etc.)", className="text-muted"),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Prompt + Team Data (Ready to Copy):", className="fw-bold"),
+                        dcc.Textarea(
+                            id='llm-combined-export',
+                            placeholder="Combined prompt and team data will appear here...",
+                            style={'width': '100%', 'height': '400px', 'fontFamily': 'monospace', 'fontSize': '12px'}
+                        )
+                    ], width=12)
+                ])
+            ], width=12)
+        ]),
+        
+        # Optimize Section
+        dbc.Row([
+            dbc.Col([
+                html.Hr(),
+                html.H3("Transfer Suggestions", className="mb-3"),
+                dbc.Button("Optimize Transfers", id='optimize-button', color="success", size="lg", className="mb-3"),
+                html.Div(id='optimization-results'),
+                dcc.Store(id='transfer-job-store', data=None),
+                dcc.Interval(id='transfer-job-poll', interval=JOB_POLL_INTERVAL_MS, disabled=True)
+            ], width=12)
+        ])
+    ], fluid=True, className="p-4")
+
+def create_app(db_path: str = DB_PATH, num_weeks: int = 3):
+    """Create the Dash app.
+    
+    Cheap by design: the database, player data and optimizers are loaded
+    lazily by the first callback that needs them.
+    
+    Args:
+        db_path: Path to the SQLite database
+        num_weeks: Number of upcoming weeks to sum predictions over (default: 3)
+    
+    Returns:
+        The Dash app
+    """
+    global app, db, DB_PATH, NUM_WEEKS, team_repository
+    DB_PATH = db_path
+    NUM_WEEKS = num_weeks
+    db = team_repository = None
+    _players_cache.clear()
+    _team_names_cache.clear()
+    
+    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+    app.layout = build_layout()
+    return app
 
 @callback(
     Output('team-store', 'data', allow_duplicate=True),
+    Output('squad-job-store', 'data', allow_duplicate=True),
+    Output('squad-job-poll', 'disabled', allow_duplicate=True),
+    Output('create-optimal-status', 'children', allow_duplicate=True),
     Input('interval-reload', 'n_intervals'),
     prevent_initial_call='initial_duplicate'
 )
 def reload_team_on_startup(n):
-    """Reload team from database when page loads or refreshes."""
-    return load_team_from_db()
+    """Reload team from database when page loads or refreshes.
+    
+    With no saved team, an optimal squad is solved as a background job and
+    picked up by poll_squad_job, like the Create Optimal Team button.
+    """
+    team_data = load_team_from_db()
+    if team_data is not None:
+        return team_data, dash.no_update, dash.no_update, dash.no_update
+    
+    print("No saved team found. Creating optimized team...")
+    try:
+        job_id = submit_squad_job()
+    except Exception as e:
+        return {"team": []}, None, True, dbc.Alert(f"❌ Error creating optimal team: {str(e)}", color="danger")
+    team_data, poll_disabled, message = squad_job_outputs(job_id)
+    return team_data, job_id, poll_disabled, message
+
+def submit_squad_job():
+    """Submit a squad optimization; identical requests share one job."""
+    job_id = FPLJobQueue.make_job_id(
+        'squad', db_path=DB_PATH, num_weeks=NUM_WEEKS, generation=get_db().get_data_generation()
+    )
+    return get_job_queue().submit(job_id, optimize_squad, DB_PATH, NUM_WEEKS, 0.001, SQUAD_OPTIMIZER, SCRIPTS_DIR)
+
+def squad_job_outputs(job_id):
+    """(team data, poll disabled, status message) for the current state of a squad job.
+    
+    A finished job's team is saved once per job id; later calls for the same
+    job return the saved team structure without writing another snapshot.
+    """
+    status = get_job_queue().status(job_id)
+    if status == JOB_RUNNING:
+        return dash.no_update, False, dbc.Alert("⏳ Optimizing squad...", color="secondary")
+    try:
+        results = get_job_queue().result(job_id)
+    except Exception as e:
+        return dash.no_update, True, dbc.Alert(f"❌ Error creating optimal team: {str(e)}", color="danger")
+    with _saved_squad_jobs_lock:
+        team_data = _saved_squad_jobs.get(job_id)
+        if team_data is None:
+            team_data = save_optimal_team(results)
+            if team_data['team']:  # Failed saves are retried by the next call
+                _saved_squad_jobs[job_id] = team_data
+    return team_data, True, ""
 
 @callback(
     Output('team-store', 'data', allow_duplicate=True),
+    Output('squad-job-store', 'data'),
+    Output('squad-job-poll', 'disabled'),
+    Output('create-optimal-status', 'children'),
     Input('create-optimal-button', 'n_clicks'),
     prevent_initial_call=True
 )
 def create_new_optimal_team(n_clicks):
-    """Create a new optimal team when button is clicked."""
+    """Start a background squad optimization when the button is clicked."""
     if not n_clicks:
-        return dash.no_update
+        return dash.no_update, None, True, ""
     
     print("User requested new optimal team...")
-    return create_optimal_team()
+    try:
+        job_id = submit_squad_job()
+    except Exception as e:
+        return dash.no_update, None, True, dbc.Alert(f"❌ Error creating optimal team: {str(e)}", color="danger")
+    
+    # Every click saves the team again, even when an identical job was already saved
+    with _saved_squad_jobs_lock:
+        _saved_squad_jobs.pop(job_id, None)
+    
+    # Cached results apply right away; otherwise poll until the job finishes
+    team_data, poll_disabled, message = squad_job_outputs(job_id)
+    return team_data, job_id, poll_disabled, message
+
+@callback(
+    Output('team-store', 'data', allow_duplicate=True),
+    Output('squad-job-store', 'data', allow_duplicate=True),
+    Output('squad-job-poll', 'disabled', allow_duplicate=True),
+    Output('create-optimal-status', 'children', allow_duplicate=True),
+    Input('squad-job-poll', 'n_intervals'),
+    State('squad-job-store', 'data'),
+    prevent_initial_call=True
+)
+def poll_squad_job(n_intervals, job_id):
+    """Save and show the optimized team once its background job has finished.
+    
+    The job id is cleared and polling stops in the same update that saves,
+    so later ticks have nothing to pick up.
+    """
+    if not job_id:
+        return dash.no_update, dash.no_update, True, dash.no_update
+    
+    team_data, poll_disabled, message = squad_job_outputs(job_id)
+    if not poll_disabled:
+        return dash.no_update, dash.no_update, False, dash.no_update
+    return team_data, None, True, message
 
 @callback(
     Output('team-summary', 'children'),
@@ -376,21 +501,21 @@ def update_team_display(team_data):
         return dbc.Alert("No team loaded. Please create a team first.", color="warning"), "", [], [], []
     
     total_cost = team_df['price'].sum()
-    starting_points = team_df[team_df['is_starter']]['predicted_points'].sum()
+    starting_points = FPLValidator.calculate_team_points(team_df)
     
     # Summary
     summary = dbc.Alert([
-        html.H5(f"Total Cost: £{total_cost:.1f}m / £{BUDGET:.1f}m", className="mb-1"),
+        html.H5(f"Total Cost: £{total_cost:.1f}m / £{BUDGET_TENTHS / 10:.1f}m", className="mb-1"),
         html.H5(f"Starting XI Points (next {NUM_WEEKS} weeks): {starting_points:.2f}", className="mb-0")
     ], color="info")
     
     # Create tables by position
     tables = []
-    for position in ['GK', 'DEF', 'MID', 'FWD']:
+    for position in POSITIONS:
         pos_df = team_df[team_df['position'] == position].copy()
         if not pos_df.empty:
             pos_df = pos_df.sort_values('is_starter', ascending=False)
-            tables.append(html.H5(f"{position} ({len(pos_df)}/{POSITION_LIMITS[position]})", className="mt-3"))
+            tables.append(html.H5(f"{position} ({len(pos_df)}/{SQUAD_REQUIREMENTS[position]})", className="mt-3"))
             tables.append(dash_table.DataTable(
                 data=pos_df.to_dict('records'),
                 columns=[
@@ -451,33 +576,38 @@ def update_team_display(team_data):
 @callback(
     Output('replacement-player-dropdown', 'options'),
     Input('player-to-replace-dropdown', 'value'),
+    Input('replacement-player-dropdown', 'search_value'),
+    State('replacement-player-dropdown', 'value'),
     State('team-store', 'data')
 )
-def update_replacement_options(selected_player_id, team_data):
-    """Update replacement dropdown to show all available players from any position."""
+def update_replacement_options(selected_player_id, search_value, replacement_id, team_data):
+    """Serve replacement options for the dropdown from the server-side cache.
+    
+    Without a search, lists players in the position of the player being
+    replaced (cheapest first); a search matches players from any position.
+    Players already in the team are skipped and at most
+    REPLACEMENT_OPTIONS_LIMIT options are sent.
+    """
     if not team_data:
         return []
     
-    team_df = team_json_to_dataframe(team_data)
-    current_team_ids = team_df['id'].tolist()
-    
-    # Get all available players not in current team
-    available = all_players[
-        ~all_players['id'].isin(current_team_ids)
-    ].copy()
+    options = get_replacement_options()
+    team_players = {player['id']: pos_data['position'] for pos_data in team_data.get('team', []) for player in pos_data['players']}
     
-    # Sort by position then price
-    available = available.sort_values(['position', 'price'], ascending=[True, True])
+    if search_value:
+        query = search_value.lower()
+        matches = (row for row, text in enumerate(options['search']) if query in text)
+    else:
+        position = team_players.get(selected_player_id)
+        matches = (row for row, pos in enumerate(options['positions']) if position is None or pos == position)
+    rows = list(itertools.islice((row for row in matches if options['ids'][row] not in team_players), REPLACEMENT_OPTIONS_LIMIT))
     
-    replacement_options = [
-        {
-            'label': f"{row['name']} ({row['position']}) - {team_id_to_name.get(row['team'], 'Unknown')} - £{row['price']:.1f}m, {row['predicted_points']:.2f}pts ({NUM_WEEKS}w)",
-            'value': row['id']
-        }
-        for _, row in available.iterrows()
-    ]
+    # Keep the current selection listed so a new search does not clear it
+    selected_row = options['row_of'].get(replacement_id)
+    if selected_row is not None and selected_row not in rows:
+        rows.append(selected_row)
     
-    return replacement_options
+    return [{'label': options['labels'][row], 'value': options['ids'][row]} for row in rows]
 
 @callback(
     Output('team-store', 'data', allow_duplicate=True),
@@ -494,16 +624,17 @@ def replace_player(n_clicks, old_player_id, new_player_id, team_data):
         return team_data, ""
     
     team_df = team_json_to_dataframe(team_data)
+    team_id_to_name = get_team_names()
     old_player = team_df[team_df['id'] == old_player_id].iloc[0]
-    new_player = all_players[all_players['id'] == new_player_id].iloc[0]
+    new_player = get_players_by_id().loc[new_player_id]
     
-    # Validate budget
-    cost_change = new_player['price'] - old_player['price']
-    new_total_cost = team_df['price'].sum() + cost_change
+    # Validate budget (integer tenths of £1m, so the check is exact)
+    cost_change = int(new_player['cost']) - int(old_player['cost'])
+    new_total_cost = int(team_df['cost'].sum()) + cost_change
     
-    if new_total_cost > BUDGET:
+    if new_total_cost > BUDGET_TENTHS:
         return team_data, dbc.Alert(
-            f"❌ Cannot make transfer: Would exceed budget by £{new_total_cost - BUDGET:.1f}m",
+            f"❌ Cannot make transfer: Would exceed budget by £{(new_total_cost - BUDGET_TENTHS) / 10:.1f}m",
             color="danger"
         )
     
@@ -513,7 +644,7 @@ def replace_player(n_clicks, old_player_id, new_player_id, team_data):
         position_counts[old_player['position']] = position_counts.get(old_player['position'], 0) - 1
         position_counts[new_player['position']] = position_counts.get(new_player['position'], 0) + 1
         
-        for pos, limit in POSITION_LIMITS.items():
+        for pos, limit in SQUAD_REQUIREMENTS.items():
             if position_counts.get(pos, 0) > limit:
                 return team_data, dbc.Alert(
                     f"⚠️ Cannot make transfer: Would have {position_counts[pos]} {pos} players (max {limit})",
@@ -530,9 +661,9 @@ def replace_player(n_clicks, old_player_id, new_player_id, team_data):
     if new_player['team'] != old_player['team']:
         team_counts[old_player['team']] = team_counts.get(old_player['team'], 0) - 1
         team_counts[new_player['team']] = team_counts.get(new_player['team'], 0) + 1
-        if team_counts.get(new_player['team'], 0) > 3:
+        if team_counts.get(new_player['team'], 0) > MAX_PER_TEAM:
             return team_data, dbc.Alert(
-                f"⚠️ Cannot make transfer: Would have {team_counts[new_player['team']]} players from {team_id_to_name.get(new_player['team'], 'team')} (max 3 per team)",
+                f"⚠️ Cannot make transfer: Would have {team_counts[new_player['team']]} players from {team_id_to_name.get(new_player['team'], 'team')} (max {MAX_PER_TEAM} per team)",
                 color="warning"
             )
     
@@ -540,11 +671,12 @@ def replace_player(n_clicks, old_player_id, new_player_id, team_data):
     # Remove old player from team_df and add new player
     team_df = team_df[team_df['id'] != old_player_id]
     new_player_row = {
-        'id': int(new_player['id']),
+        'id': int(new_player_id),
         'name': new_player['name'],
         'position': new_player['position'],
         'team': int(new_player['team']),
         'team_name': team_id_to_name.get(new_player['team'], f"Team {new_player['team']}"),
+        'cost': int(new_player['cost']),
         'price': new_player['price'],
         'predicted_points': new_player['predicted_points'],
         'is_starter': old_player['is_starter']  # Keep starter status
@@ -553,7 +685,7 @@ def replace_player(n_clicks, old_player_id, new_player_id, team_data):
     
     # Rebuild team structure
     new_team_data = {'team': []}
-    for position in ['GK', 'DEF', 'MID', 'FWD']:
+    for position in POSITIONS:
         pos_players = team_df[team_df['position'] == position]
         if not pos_players.empty:
             new_team_data['team'].append({
@@ -570,7 +702,7 @@ def replace_player(n_clicks, old_player_id, new_player_id, team_data):
             })
     
     message = dbc.Alert(
-        f"✅ Replaced {old_player['name']} ({old_player['position']}) with {new_player['name']} ({new_player['position']}) | Cost: £{cost_change:+.1f}m",
+        f"✅ Replaced {old_player['name']} ({old_player['position']}) with {new_player['name']} ({new_player['position']}) | Cost: £{cost_change / 10:+.1f}m",
         color="success"
     )
     
@@ -618,7 +750,7 @@ def substitute_player(n_clicks, starter_id, bench_id, team_data):
     
     # Rebuild team structure
     new_team_data = {'team': []}
-    for position in ['GK', 'DEF', 'MID', 'FWD']:
+    for position in POSITIONS:
         pos_players = team_df[team_df['position'] == position]
         if not pos_players.empty:
             new_team_data['team'].append({
@@ -653,54 +785,10 @@ def save_team_to_db(n_clicks, team_data):
         return ""
     
     try:
-        from datetime import datetime
-        import sqlite3
-        
         team_df = team_json_to_dataframe(team_data)
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Create current_team table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS current_team (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    player_id INTEGER,
-                    player_name TEXT,
-                    position TEXT,
-                    team_id INTEGER,
-                    team_name TEXT,
-                    price REAL,
-                    predicted_points REAL,
-                    is_starter BOOLEAN,
-                    saved_at TIMESTAMP,
-                    team_cost REAL,
-                    team_points REAL
-                )
-            """)
-            
-            total_cost = team_df['price'].sum()
-            total_points = team_df[team_df['is_starter']]['predicted_points'].sum()
-            
-            # Delete existing team data
-            cursor.execute("DELETE FROM current_team")
-            
-            # Insert new team data
-            for _, row in team_df.iterrows():
-                cursor.execute("""
-                    INSERT INTO current_team (
-                        player_id, player_name, position, team_id, team_name,
-                        price, predicted_points, is_starter, saved_at,
-                        team_cost, team_points
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    row['id'], row['name'], row['position'], row['team'],
-                    row['team_name'], row['price'], row['predicted_points'],
-                    row['is_starter'], timestamp, total_cost, total_points
-                ))
-            
-            conn.commit()
+        repository = get_team_repository()
+        totals = repository.totals(repository.save(team_df, source='ui'))
+        timestamp, total_cost, total_points = totals['saved_at'], totals['team_cost'], totals['team_points']
         
         return dbc.Alert(
             f"✅ Team saved successfully at {timestamp}! Total Cost: £{total_cost:.1f}m, Starting XI Points: {total_points:.2f}",
@@ -710,82 +798,125 @@ def save_team_to_db(n_clicks, team_data):
     except Exception as e:
         return dbc.Alert(f"❌ Error saving team: {str(e)}", color="danger")
 
+def render_transfer_results(result):
+    """Render transfer search results as recommendation cards."""
+    team_id_to_name = get_team_names()
+    
+    if result['no_transfer_recommended']:
+        return dbc.Alert([
+            html.H4("🚫 No Transfers Recommended", className="mb-3"),
+            html.P("Your current team is already optimal or no beneficial transfers available within budget.")
+        ], color="info")
+    
+    transfers = result['best_transfers']
+    transfer_cards = []
+    
+    for idx, transfer in enumerate(transfers, 1):
+        card = dbc.Card([
+            dbc.CardHeader(f"Transfer #{idx}", className="bg-primary text-white"),
+            dbc.CardBody([
+                dbc.Row([
+                    dbc.Col([
+                        html.H6("OUT:", className="text-danger fw-bold"),
+                        html.P([
+                            html.Strong(f"{transfer['out']['name']}"),
+                            html.Br(),
+                            f"({transfer['out']['position']}) - {team_id_to_name.get(transfer['out']['team'], 'Unknown')}",
+                            html.Br(),
+                            f"£{transfer['out']['price']:.1f}m, {transfer['out']['predicted_points']:.2f} pts ({NUM_WEEKS}w)"
+                        ], className="mb-0 small")
+                    ], width=6),
+                    dbc.Col([
+                        html.H6("IN:", className="text-success fw-bold"),
+                        html.P([
+                            html.Strong(f"{transfer['in']['name']}"),
+                            html.Br(),
+                            f"({transfer['in']['position']}) - {team_id_to_name.get(transfer['in']['team'], 'Unknown')}",
+                            html.Br(),
+                            f"£{transfer['in']['price']:.1f}m, {transfer['in']['predicted_points']:.2f} pts ({NUM_WEEKS}w)"
+                        ], className="mb-0 small")
+                    ], width=6)
+                ]),
+                html.Hr(className="my-2"),
+                dbc.Row([
+                    dbc.Col([
+                        html.P([
+                            html.Strong("💰 Cost: "),
+                            f"£{transfer['cost_change']:+.1f}m"
+                        ], className="mb-1 small")
+                    ], width=6),
+                    dbc.Col([
+                        html.P([
+                            html.Strong("📈 Gain: "),
+                            f"{transfer['points_gain']:+.2f} pts ({NUM_WEEKS}w)"
+                        ], className="mb-0 small")
+                    ], width=6)
+                ])
+            ])
+        ], className="mb-2")
+        transfer_cards.append(card)
+    
+    return dbc.Container([
+        html.H4("✅ Top 5 Transfer Recommendations", className="mb-3 text-success"),
+        html.Div(transfer_cards)
+    ], fluid=True)
+
+def submit_transfer_job(team_data):
+    """Submit a transfer search for the team; identical requests share one job."""
+    job_id = FPLJobQueue.make_job_id(
+        'transfers', db_path=DB_PATH, num_weeks=NUM_WEEKS,
+        generation=get_db().get_data_generation(), team=FPLJobQueue.team_hash(team_data)
+    )
+    return get_job_queue().submit(job_id, search_transfers, DB_PATH, team_data, NUM_WEEKS)
+
+def transfer_job_outputs(job_id):
+    """(results, poll disabled) for the current state of a transfer job."""
+    status = get_job_queue().status(job_id)
+    if status == JOB_RUNNING:
+        return dbc.Alert("⏳ Searching transfers...", color="secondary"), False
+    try:
+        return render_transfer_results(get_job_queue().result(job_id)), True
+    except Exception as e:
+        return dbc.Alert(f"❌ Error: {str(e)}", color="danger"), True
+
 @callback(
     Output('optimization-results', 'children'),
+    Output('transfer-job-store', 'data'),
+    Output('transfer-job-poll', 'disabled'),
     Input('optimize-button', 'n_clicks'),
     State('team-store', 'data'),
     prevent_initial_call=True
 )
 def optimize_transfers(n_clicks, team_data):
-    """Run transfer optimization on current team to get top 5 transfers."""
+    """Start a background search for the top 5 transfers of the current team."""
     if not n_clicks:
-        return ""
+        return "", None, True
     
     try:
-        optimizer = FPLTransferOptimizer(DB_PATH)
-        result = optimizer.find_best_transfer(team_data, num_weeks=NUM_WEEKS)
-        
-        if result['no_transfer_recommended']:
-            return dbc.Alert([
-                html.H4("🚫 No Transfers Recommended", className="mb-3"),
-                html.P("Your current team is already optimal or no beneficial transfers available within budget.")
-            ], color="info")
-        
-        transfers = result['best_transfers']
-        transfer_cards = []
-        
-        for idx, transfer in enumerate(transfers, 1):
-            card = dbc.Card([
-                dbc.CardHeader(f"Transfer #{idx}", className="bg-primary text-white"),
-                dbc.CardBody([
-                    dbc.Row([
-                        dbc.Col([
-                            html.H6("OUT:", className="text-danger fw-bold"),
-                            html.P([
-                                html.Strong(f"{transfer['out']['name']}"),
-                                html.Br(),
-                                f"({transfer['out']['position']}) - {team_id_to_name.get(transfer['out']['team'], 'Unknown')}",
-                                html.Br(),
-                                f"£{transfer['out']['price']:.1f}m, {transfer['out']['predicted_points']:.2f} pts ({NUM_WEEKS}w)"
-                            ], className="mb-0 small")
-                        ], width=6),
-                        dbc.Col([
-                            html.H6("IN:", className="text-success fw-bold"),
-                            html.P([
-                                html.Strong(f"{transfer['in']['name']}"),
-                                html.Br(),
-                                f"({transfer['in']['position']}) - {team_id_to_name.get(transfer['in']['team'], 'Unknown')}",
-                                html.Br(),
-                                f"£{transfer['in']['price']:.1f}m, {transfer['in']['predicted_points']:.2f} pts ({NUM_WEEKS}w)"
-                            ], className="mb-0 small")
-                        ], width=6)
-                    ]),
-                    html.Hr(className="my-2"),
-                    dbc.Row([
-                        dbc.Col([
-                            html.P([
-                                html.Strong("💰 Cost: "),
-                                f"£{transfer['cost_change']:+.1f}m"
-                            ], className="mb-1 small")
-                        ], width=6),
-                        dbc.Col([
-                            html.P([
-                                html.Strong("📈 Gain: "),
-                                f"{transfer['points_gain']:+.2f} pts ({NUM_WEEKS}w)"
-                            ], className="mb-0 small")
-                        ], width=6)
-                    ])
-                ])
-            ], className="mb-2")
-            transfer_cards.append(card)
-        
-        return dbc.Container([
-            html.H4("✅ Top 5 Transfer Recommendations", className="mb-3 text-success"),
-            html.Div(transfer_cards)
-        ], fluid=True)
-        
+        job_id = submit_transfer_job(team_data)
     except Exception as e:
-        return dbc.Alert(f"❌ Error: {str(e)}", color="danger")
+        return dbc.Alert(f"❌ Error: {str(e)}", color="danger"), None, True
+    
+    # Cached results show right away; otherwise poll until the job finishes
+    results, poll_disabled = transfer_job_outputs(job_id)
+    return results, job_id, poll_disabled
+
+@callback(
+    Output('optimization-results', 'children', allow_duplicate=True),
+    Output('transfer-job-poll', 'disabled', allow_duplicate=True),
+    Input('transfer-job-poll', 'n_intervals'),
+    State('transfer-job-store', 'data'),
+    prevent_initial_call=True
+)
+def poll_transfer_job(n_intervals, job_id):
+    """Show transfer results once the background search has finished."""
+    if not job_id:
+        return dash.no_update, True
+    
+    results, poll_disabled = transfer_job_outputs(job_id)
+    if not poll_disabled:
+        return dash.no_update, False
+    return results, True
 
 @callback(
     Output('llm-combined-export', 'value'),
@@ -823,14 +954,9 @@ if __name__ == '__main__':
     )
     args = parser.parse_args()
     
-    # Update NUM_WEEKS from command line argument
-    NUM_WEEKS = args.weeks
-    
-    # Reload players with the specified number of weeks
-    all_players = db.load_player_data(num_weeks=NUM_WEEKS)
+    # Build the app for the requested horizon; player data loads on the first request
+    create_app(DB_PATH, num_weeks=args.weeks)
     
     print(f"Starting FPL Transfer Optimizer UI with {NUM_WEEKS} weeks of predictions...")
-    print(f"Loaded {len(all_players)} players with predictions")
-    print(f"Sample predicted points: {all_players['predicted_points'].describe()}")
     
     app.run(debug=args.debug, host='0.0.0.0', port=8050)